@@ -0,0 +1,89 @@
+import pandas as pd
+
+import db
+
+class CatalogoDispositivos:
+    """
+    Catálogo somente leitura dos dispositivos de um cliente, indexado por id_disp
+    
+    Oferece consulta de um dispositivo em O(1) (dicionário por id) e junções
+    vetorizadas com outros DataFrames (índice por id), sem varrer a lista de
+    pontos a cada consulta. Use obter_catalogo para reaproveitar a instância
+    em cache enquanto a lista de pontos do cliente não mudar.
+    """
+    
+    COLUNAS = ['descricao', 'type', 'action']
+    
+    def __init__(self, pontos):
+        """
+        Parâmetros:
+        pontos (DataFrame): Lista de pontos do cliente [id_disp, type, action, description]
+        """
+        tabela = pontos.rename(columns={'description': 'descricao'})
+        tabela = tabela.drop_duplicates('id_disp', keep='last').set_index('id_disp')
+        self._tabela = tabela.reindex(columns=self.COLUNAS)
+        self._registros = dict(zip(self._tabela.index, self._tabela.itertuples(index=False, name='Dispositivo')))
+    
+    def __len__(self):
+        return len(self._registros)
+    
+    def __contains__(self, id_disp):
+        return id_disp in self._registros
+    
+    def obter(self, id_disp, padrao=None):
+        """
+        Busca um dispositivo pelo id
+        
+        Retorna:
+        Dispositivo (namedtuple com descricao, type e action) ou padrao se o id não existir
+        """
+        return self._registros.get(id_disp, padrao)
+    
+    def descricao(self, id_disp, padrao="Sem descrição"):
+        """Retorna a descrição do dispositivo (ou padrao se o id não existir ou não tiver descrição)"""
+        dispositivo = self._registros.get(id_disp)
+        if dispositivo is None or pd.isna(dispositivo.descricao) or dispositivo.descricao == '':
+            return padrao
+        return dispositivo.descricao
+    
+    def juntar(self, df, coluna='id_disp', colunas=None, how='left'):
+        """
+        Acrescenta ao DataFrame as colunas do catálogo correspondentes a cada id
+        
+        Parâmetros:
+        df (DataFrame): DataFrame com uma coluna de ids de dispositivo
+        coluna (str): Nome da coluna de ids em df
+        colunas (list, opcional): Colunas do catálogo a acrescentar (padrão: todas)
+        how (str): Tipo de junção ('left' mantém todas as linhas de df, 'inner' só os ids do catálogo)
+        
+        Retorna:
+        DataFrame: Novo DataFrame com as colunas do catálogo
+        """
+        colunas = self.COLUNAS if colunas is None else colunas
+        return df.join(self._tabela[colunas], on=coluna, how=how)
+    
+    def filtrar(self, ids):
+        """
+        Retorna os dispositivos do catálogo com os ids informados
+        
+        Retorna:
+        DataFrame: [id_disp, descricao, type, action] na ordem do catálogo
+        """
+        return self._tabela[self._tabela.index.isin(ids)].reset_index()
+
+@db.instrumentada
+@db.consulta_cacheada('lista_de_pontos')
+def obter_catalogo(cliente):
+    """
+    Obtém o catálogo de dispositivos de um cliente
+    
+    A instância fica no cache de consultas do módulo db e é compartilhada entre as
+    sessões até a próxima gravação da lista de pontos do cliente (salvar_pontos).
+    
+    Parâmetros:
+    cliente (str): Nome do cliente
+    
+    Retorna:
+    CatalogoDispositivos: Catálogo do cliente (vazio se não houver dispositivos)
+    """
+    return CatalogoDispositivos(db.buscar_pontos(cliente))
@@ -1,24 +1,403 @@
 import sqlite3
 import os
+import copy
+import functools
+import logging
+import queue
+import random
+import threading
+import time
+from concurrent.futures import Future
 from datetime import datetime, timedelta
+import numpy as np
 import pandas as pd
-import random
+
+import processamento
+
+# Caminho do banco de dados (relativo à pasta src, de onde o app é executado)
+DB_PATH = os.path.join('..', 'data', 'db', 'dashboard.db')
+
+# Tempo que uma conexão espera por um bloqueio antes de desistir (busy timeout)
+TIMEOUT_BANCO_S = 5.0
+
+# Novas tentativas de uma transação de escrita quando o banco continua ocupado
+TENTATIVAS_ESCRITA = 5
+ESPERA_INICIAL_S = 0.05
+
+# Estado da configuração do banco e da fila única de escrita do processo
+_bancos_configurados = set()
+_configuracao_lock = threading.Lock()
+_fila_escrita = queue.Queue()
+_thread_escrita = None
+
+# Cache de consultas compartilhado por todas as sessões do Streamlit no mesmo processo.
+# As entradas são indexadas por (tabela, cliente) para que cada função de escrita
+# invalide apenas as consultas afetadas por ela.
+_cache_consultas = {}
+_cache_indice = {}
+_cache_versoes = {}
+_cache_lock = threading.RLock()
+_cache_local = threading.local()
+
+# Métricas de execução por função (chamadas, tempo, linhas e acertos de cache),
+# coletadas sempre e consultadas sob demanda pelo painel de depuração
+logger = logging.getLogger(__name__)
+_metricas = {}
+_metricas_lock = threading.Lock()
+
+# Transações de escrita do processo: concluídas, novas tentativas com o banco ocupado
+# e desistências depois de TENTATIVAS_ESCRITA (ver obter_contagem_transacoes)
+_contagem_transacoes = dict.fromkeys(['transacoes', 'tentativas_ocupado', 'falhas_ocupado'], 0)
+
+# Tipos das colunas devolvidas pelas funções de leitura em DataFrame
+TIPOS_COLUNAS = {
+    'type': 'category',
+    'action': 'category',
+    'prefixo': 'category',
+    'laco': 'category',
+    'modulo': 'int64',
+    'numero': 'int64',
+    'sub': 'int64',
+    'mes': 'int64',
+    'ano': 'int64',
+    'mes_manutencao': 'int64',
+    'resolvido': 'bool',
+    'valor': 'float64',
+    'bateria': 'float64',
+    'sinal': 'float64',
+}
+
+# Quantidade de linhas lidas do cursor por vez ao montar os DataFrames
+TAMANHO_LOTE = 5000
+
+# Quantidade de valores por consulta "IN (...)" (abaixo do limite de parâmetros do SQLite)
+TAMANHO_LOTE_CONSULTA = 500
+
+# Colunas comparadas (por hash) para decidir se um ponto mudou em um novo upload
+COLUNAS_COMPARADAS_PONTOS = ['type', 'action', 'description']
 
 def get_db_connection():
     """Estabelece conexão com o banco de dados SQLite"""
     # Verificar se o diretório data existe
-    if not os.path.exists('../data/db'):
-        os.makedirs('../data/db')
-    
-    # Caminho do banco de dados
-    db_path = '../data/db/dashboard.db'
+    diretorio = os.path.dirname(DB_PATH)
+    if diretorio and not os.path.exists(diretorio):
+        os.makedirs(diretorio, exist_ok=True)
     
-    # Conectar ao banco de dados
-    conn = sqlite3.connect(db_path)
+    # Conectar ao banco de dados esperando até TIMEOUT_BANCO_S se ele estiver ocupado
+    conn = sqlite3.connect(DB_PATH, timeout=TIMEOUT_BANCO_S)
     conn.row_factory = sqlite3.Row
     
+    _configurar_conexao(conn)
+    
     return conn
 
+def _configurar_conexao(conn):
+    """
+    Ativa o modo WAL (uma vez por arquivo) e ajusta a sincronização da conexão
+    
+    Com WAL, leituras não bloqueiam a escrita e vice-versa, o que evita os
+    erros "database is locked" quando várias sessões usam o painel ao mesmo tempo.
+    """
+    caminho = os.path.abspath(DB_PATH)
+    if caminho not in _bancos_configurados:
+        with _configuracao_lock:
+            if caminho not in _bancos_configurados:
+                try:
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    _bancos_configurados.add(caminho)
+                except sqlite3.OperationalError as e:
+                    # Banco ocupado por outro processo: o WAL fica gravado no arquivo
+                    # quando ativado, então basta tentar de novo na próxima conexão
+                    if not _banco_ocupado(e):
+                        raise
+    
+    # Em WAL, NORMAL mantém a consistência e evita um fsync por transação
+    conn.execute("PRAGMA synchronous=NORMAL")
+
+def _banco_ocupado(erro):
+    """Indica se o erro do SQLite é de banco bloqueado/ocupado (e pode ser repetido)"""
+    mensagem = str(erro).lower()
+    return isinstance(erro, sqlite3.OperationalError) and ('locked' in mensagem or 'busy' in mensagem)
+
+def executar_transacao(funcao, tentativas=TENTATIVAS_ESCRITA):
+    """
+    Executa uma transação de escrita curta, com novas tentativas se o banco estiver ocupado
+    
+    A transação começa com BEGIN IMMEDIATE para reservar a escrita logo no início
+    (em vez de falhar ao promover uma leitura) e é repetida com espera exponencial
+    quando outro processo mantém o banco bloqueado além do busy timeout.
+    
+    Parâmetros:
+    funcao (callable): Recebe o cursor e executa os comandos da transação
+    tentativas (int): Número máximo de tentativas
+    
+    Retorna:
+    O valor retornado por funcao
+    """
+    for tentativa in range(tentativas):
+        conn = None
+        try:
+            # A abertura da conexão também entra nas tentativas
+            conn = get_db_connection()
+            conn.execute("BEGIN IMMEDIATE")
+            resultado = funcao(conn.cursor())
+            conn.commit()
+            _contar_transacao('transacoes')
+            return resultado
+        except sqlite3.Error as e:
+            if conn is not None:
+                conn.rollback()
+            if not _banco_ocupado(e):
+                raise
+            if tentativa == tentativas - 1:
+                _contar_transacao('falhas_ocupado')
+                raise
+            _contar_transacao('tentativas_ocupado')
+            espera = ESPERA_INICIAL_S * (2 ** tentativa) * (1 + random.random())
+            logger.warning("Banco ocupado (%s), nova tentativa em %.2f s", e, espera)
+            time.sleep(espera)
+        finally:
+            if conn is not None:
+                conn.close()
+
+def _contar_transacao(evento):
+    """Soma um evento à contagem de transações de escrita"""
+    with _metricas_lock:
+        _contagem_transacoes[evento] += 1
+
+def obter_contagem_transacoes():
+    """
+    Obtém a contagem das transações de escrita do processo desde o início (ou resetar_metricas)
+    
+    Retorna:
+    dict: transacoes (concluídas), tentativas_ocupado (repetidas porque o banco
+    continuou bloqueado além do busy timeout) e falhas_ocupado (desistências)
+    """
+    with _metricas_lock:
+        return dict(_contagem_transacoes)
+
+def _processar_fila_escrita():
+    """Laço da thread de escrita: executa as gravações uma de cada vez, na ordem de chegada"""
+    while True:
+        func, args, kwargs, futuro = _fila_escrita.get()
+        if futuro.set_running_or_notify_cancel():
+            try:
+                futuro.set_result(func(*args, **kwargs))
+            except BaseException as e:
+                futuro.set_exception(e)
+        _fila_escrita.task_done()
+
+def escrita_serializada(func):
+    """
+    Decorador que envia a função para a fila única de escrita do processo
+    
+    Todas as sessões do Streamlit compartilham a mesma thread de escrita, então as
+    gravações deste processo nunca disputam o bloqueio do banco entre si. Quem
+    chama espera o resultado normalmente (incluindo exceções).
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        global _thread_escrita
+        
+        # Escritas aninhadas já estão na thread de escrita
+        if threading.current_thread() is _thread_escrita:
+            return func(*args, **kwargs)
+        
+        with _configuracao_lock:
+            if _thread_escrita is None or not _thread_escrita.is_alive():
+                _thread_escrita = threading.Thread(
+                    target=_processar_fila_escrita, name='escrita-db', daemon=True
+                )
+                _thread_escrita.start()
+        
+        futuro = Future()
+        _fila_escrita.put((func, args, kwargs, futuro))
+        return futuro.result()
+    return wrapper
+
+def _frame_da_consulta(cursor, tamanho_lote=TAMANHO_LOTE):
+    """
+    Monta um DataFrame coluna a coluna a partir de um cursor já executado
+    
+    As linhas são lidas em lotes com fetchmany e transpostas direto para listas
+    por coluna, sem criar um dicionário por linha. Os tipos seguem TIPOS_COLUNAS.
+    
+    Parâmetros:
+    cursor (sqlite3.Cursor): Cursor com a consulta executada
+    tamanho_lote (int): Quantidade de linhas lidas por vez
+    
+    Retorna:
+    DataFrame: Resultado da consulta com as colunas tipadas
+    """
+    # Tuplas simples são mais baratas que sqlite3.Row
+    cursor.row_factory = None
+    nomes = [descricao[0] for descricao in cursor.description]
+    colunas = [[] for _ in nomes]
+    
+    while True:
+        lote = cursor.fetchmany(tamanho_lote)
+        if not lote:
+            break
+        for coluna, valores in zip(colunas, zip(*lote)):
+            coluna.extend(valores)
+    
+    return _tipar_frame(pd.DataFrame(dict(zip(nomes, colunas)), columns=nomes))
+
+def _frame_vazio(colunas):
+    """Cria um DataFrame sem linhas com as colunas e tipos padronizados"""
+    return _tipar_frame(pd.DataFrame({coluna: pd.Series(dtype='object') for coluna in colunas}))
+
+def _tipar_frame(df):
+    """Aplica os tipos de TIPOS_COLUNAS às colunas presentes no DataFrame"""
+    tipos = {coluna: tipo for coluna, tipo in TIPOS_COLUNAS.items() if coluna in df.columns}
+    return df.astype(tipos) if tipos else df
+
+def _copiar_resultado(resultado):
+    """Devolve uma cópia do resultado para que quem chama não altere o valor em cache"""
+    if isinstance(resultado, pd.DataFrame):
+        return resultado.copy()
+    if isinstance(resultado, list):
+        return [dict(item) if isinstance(item, dict) else item for item in resultado]
+    if isinstance(resultado, dict):
+        return copy.deepcopy(resultado)
+    return resultado
+
+def consulta_cacheada(*tabelas):
+    """
+    Decorador que guarda em memória o resultado de uma função de leitura
+    
+    A chave do cache é (função, cliente, argumentos). O primeiro argumento da
+    função é tratado como o cliente; funções sem cliente ficam no escopo global
+    das tabelas e são invalidadas por qualquer escrita nelas.
+    
+    Parâmetros:
+    tabelas (str): Tabelas lidas pela função
+    """
+    def decorador(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cliente = args[0] if args else kwargs.get('cliente')
+            chave = (func.__name__, args, tuple(sorted(kwargs.items())))
+            escopos = [(tabela, cliente) for tabela in tabelas]
+            
+            with _cache_lock:
+                if chave in _cache_consultas:
+                    _cache_local.acerto = True
+                    return _copiar_resultado(_cache_consultas[chave])
+                versoes = [_cache_versoes.get(escopo, 0) for escopo in escopos]
+            
+            _cache_local.descartar = False
+            resultado = func(*args, **kwargs)
+            
+            with _cache_lock:
+                # Só guarda se nenhuma escrita aconteceu durante a consulta e se a
+                # função não sinalizou erro (ver descartar_resultado_do_cache)
+                versoes_atuais = [_cache_versoes.get(escopo, 0) for escopo in escopos]
+                if not _cache_local.descartar and versoes == versoes_atuais:
+                    _cache_consultas[chave] = resultado
+                    for escopo in escopos:
+                        _cache_indice.setdefault(escopo, set()).add(chave)
+            
+            return _copiar_resultado(resultado)
+        return wrapper
+    return decorador
+
+def descartar_resultado_do_cache():
+    """Marca o resultado da consulta em andamento como não cacheável (ex.: erro tratado)"""
+    _cache_local.descartar = True
+
+def invalidar_cache(cliente, *tabelas):
+    """
+    Remove do cache as consultas que dependem das tabelas de um cliente
+    
+    Parâmetros:
+    cliente (str): Nome do cliente afetado pela escrita
+    tabelas (str): Tabelas alteradas
+    """
+    with _cache_lock:
+        for tabela in tabelas:
+            # Consultas globais (sem cliente) também dependem dos dados do cliente
+            for escopo in ((tabela, cliente), (tabela, None)):
+                _cache_versoes[escopo] = _cache_versoes.get(escopo, 0) + 1
+                for chave in _cache_indice.pop(escopo, ()):
+                    _cache_consultas.pop(chave, None)
+
+def limpar_cache():
+    """Remove todas as consultas guardadas em cache"""
+    with _cache_lock:
+        for escopo in list(_cache_versoes) + list(_cache_indice):
+            _cache_versoes[escopo] = _cache_versoes.get(escopo, 0) + 1
+        _cache_consultas.clear()
+        _cache_indice.clear()
+
+def instrumentada(func):
+    """
+    Decorador que mede tempo, linhas devolvidas e número de chamadas da função
+    
+    Os valores são acumulados em memória (ver obter_metricas) e cada chamada é
+    registrada no logger do módulo em nível DEBUG.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        # Chamadas aninhadas (ex.: obter_dispositivos -> buscar_pontos) não devem
+        # contaminar o indicador de acerto de cache da função externa
+        acerto_anterior = getattr(_cache_local, 'acerto', False)
+        _cache_local.acerto = False
+        inicio = time.perf_counter()
+        resultado = func(*args, **kwargs)
+        duracao_ms = (time.perf_counter() - inicio) * 1000
+        acerto_cache = _cache_local.acerto
+        _cache_local.acerto = acerto_anterior
+        linhas = len(resultado) if isinstance(resultado, (pd.DataFrame, list)) else 0
+        
+        with _metricas_lock:
+            metrica = _metricas.setdefault(func.__name__, {
+                'chamadas': 0,
+                'acertos_cache': 0,
+                'linhas': 0,
+                'tempo_total_ms': 0.0,
+                'tempo_max_ms': 0.0,
+            })
+            metrica['chamadas'] += 1
+            metrica['acertos_cache'] += int(acerto_cache)
+            metrica['linhas'] += linhas
+            metrica['tempo_total_ms'] += duracao_ms
+            metrica['tempo_max_ms'] = max(metrica['tempo_max_ms'], duracao_ms)
+        
+        logger.debug(
+            "%s%s: %.2f ms, %d linhas%s",
+            func.__name__,
+            tuple(arg for arg in args if not isinstance(arg, pd.DataFrame)),
+            duracao_ms, linhas, " (cache)" if acerto_cache else ""
+        )
+        return resultado
+    return wrapper
+
+def obter_metricas():
+    """
+    Obtém as métricas acumuladas das funções do banco desde o início do processo
+    
+    Retorna:
+    DataFrame: Uma linha por função [funcao, chamadas, acertos_cache, linhas,
+    tempo_total_ms, tempo_medio_ms, tempo_max_ms]
+    """
+    with _metricas_lock:
+        linhas = [dict(funcao=nome, **valores) for nome, valores in _metricas.items()]
+    
+    df = pd.DataFrame(linhas, columns=['funcao', 'chamadas', 'acertos_cache', 'linhas',
+                                       'tempo_total_ms', 'tempo_max_ms'])
+    df['tempo_medio_ms'] = df['tempo_total_ms'] / df['chamadas']
+    return df.sort_values('tempo_total_ms', ascending=False).reset_index(drop=True)
+
+def resetar_metricas():
+    """Zera as métricas acumuladas"""
+    with _metricas_lock:
+        _metricas.clear()
+        for evento in _contagem_transacoes:
+            _contagem_transacoes[evento] = 0
+
+@instrumentada
+@escrita_serializada
 def init_db():
     """Inicializa o banco de dados com as tabelas necessárias"""
     conn = get_db_connection()
@@ -66,10 +445,18 @@ def init_db():
             description TEXT,
             cliente TEXT NOT NULL,
             cliente_id INTEGER,
+            prefixo TEXT,              -- Partes do id_disp (ver processamento.decompor_ids)
+            modulo INTEGER,
+            numero INTEGER,
+            sub INTEGER,
+            laco TEXT,
             FOREIGN KEY (cliente_id) REFERENCES clientes (id)
         )
         ''')
     
+    # Bancos anteriores: criar e preencher as colunas derivadas do id_disp
+    _migrar_colunas_id(c)
+    
     # Verificar se a tabela plano_manutencao já existe
     c.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='plano_manutencao'")
     tabela_plano_existe = c.fetchone()
@@ -149,6 +536,19 @@ def init_db():
         )
         ''')
     
+    # Índices usados pelas consultas por cliente (mantêm as transações de escrita curtas)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_pontos_cliente ON lista_de_pontos (cliente_id, id_disp)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_plano_cliente_mes ON plano_manutencao (cliente_id, mes_manutencao)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_testes_cliente_periodo ON testes_dispositivos (cliente, ano, mes, id_disp)")
+    
+    # Criar tabelas do histórico de leituras dos dispositivos
+    _criar_tabelas_leituras(c)
+    
+    # Criar as tabelas do resumo da frota, preenchendo-as a partir dos dados
+    # já gravados quando acabaram de ser criadas
+    if _criar_tabelas_resumo(c):
+        _reconstruir_resumos(c)
+    
     # Inserir clientes iniciais
     clientes = ['BRD', 'BYR', 'AERO', 'BSC']
     for cliente in clientes:
@@ -160,7 +560,12 @@ def init_db():
     
     conn.commit()
     conn.close()
+    
+    # A estrutura pode ter mudado, então nenhum resultado anterior é confiável
+    limpar_cache()
 
+@instrumentada
+@consulta_cacheada('clientes')
 def get_cliente_id(nome_cliente):
     """Obtém o ID do cliente pelo nome"""
     conn = get_db_connection()
@@ -172,41 +577,161 @@ def get_cliente_id(nome_cliente):
     conn.close()
     return result['id'] if result else None
 
-def salvar_pontos(cliente, dados_df):
-    """Salva os dados de pontos no banco para um cliente específico"""
-    conn = get_db_connection()
-    c = conn.cursor()
+def _migrar_colunas_id(c):
+    """
+    Acrescenta à lista_de_pontos as colunas derivadas do id_disp, se faltarem,
+    e preenche as linhas gravadas antes delas existirem
+    """
+    c.execute("PRAGMA table_info(lista_de_pontos)")
+    existentes = {col['name'] for col in c.fetchall()}
+    tipos_sql = {'prefixo': 'TEXT', 'modulo': 'INTEGER', 'numero': 'INTEGER', 'sub': 'INTEGER', 'laco': 'TEXT'}
+    for coluna in processamento.COLUNAS_ID:
+        if coluna not in existentes:
+            c.execute(f"ALTER TABLE lista_de_pontos ADD COLUMN {coluna} {tipos_sql[coluna]}")
+    
+    c.execute("SELECT id, id_disp FROM lista_de_pontos WHERE laco IS NULL")
+    pendentes = c.fetchall()
+    if pendentes:
+        ids = processamento.decompor_ids(pd.Series([linha['id_disp'] for linha in pendentes]))
+        c.executemany(
+            "UPDATE lista_de_pontos SET prefixo = ?, modulo = ?, numero = ?, sub = ?, laco = ? WHERE id = ?",
+            list(zip(*[ids[coluna].tolist() for coluna in processamento.COLUNAS_ID], [linha['id'] for linha in pendentes]))
+        )
+        logger.info("Colunas derivadas do id preenchidas para %d dispositivos", len(pendentes))
+
+def _pontos_alterados(resumo):
+    """Indica se a gravação da lista de pontos (resumo de salvar_pontos) mudou alguma linha"""
+    return bool(resumo['inseridos'] or resumo['atualizados'] or resumo['removidos'])
+
+def _hash_pontos(df):
+    """Hash de cada linha da lista de pontos, considerando as colunas COLUNAS_COMPARADAS_PONTOS"""
+    colunas = df[COLUNAS_COMPARADAS_PONTOS].astype(object).fillna('').astype(str)
+    return pd.util.hash_pandas_object(colunas, index=False).to_numpy()
+
+@instrumentada
+@escrita_serializada
+def salvar_pontos(cliente, dados_df, substituir=False):
+    """
+    Salva os dados de pontos no banco para um cliente específico
+    
+    A lista enviada é comparada com a gravada pelo id_disp (hash das colunas
+    type, action e description) e apenas as inserções, atualizações e remoções
+    necessárias são aplicadas, em uma única transação. Se houver id_disp
+    repetido (na lista enviada ou na gravada), ou com substituir=True, a lista
+    do cliente é apagada e inserida novamente por inteiro.
+    
+    Parâmetros:
+    cliente (str): Nome do cliente
+    dados_df (DataFrame): Lista de pontos [id_disp, type, action, description]
+    substituir (bool): Regravar a lista inteira em vez de sincronizar
+    
+    Retorna:
+    dict: Resumo da gravação {modo, inseridos, atualizados, removidos, inalterados}
+    """
+    # Preparar as linhas e os hashes antes de abrir a transação para mantê-la curta
+    linhas = list(zip(
+        dados_df['id_disp'].tolist(),
+        dados_df['type'].tolist(),
+        dados_df['action'].tolist(),
+        dados_df['description'].tolist()
+    ))
+    ids_enviados = pd.Index(dados_df['id_disp'])
+    hashes_enviados = _hash_pontos(dados_df)
+    
+    def linhas_para_inserir(posicoes, id_cliente):
+        # As partes do id só são decompostas para os pontos que serão inseridos
+        partes_id = processamento.decompor_ids(dados_df['id_disp'].iloc[posicoes])
+        partes = zip(*[partes_id[coluna].tolist() for coluna in processamento.COLUNAS_ID])
+        return [linhas[p] + parte + (cliente, id_cliente) for p, parte in zip(posicoes, partes)]
     
     # Obter ID do cliente
     cliente_id = get_cliente_id(cliente)
-    if not cliente_id:
-        # Se o cliente não existir, criar
-        c.execute("INSERT INTO clientes (nome) VALUES (?)", (cliente,))
-        cliente_id = c.lastrowid
-    
-    # Remover dados antigos deste cliente (opcional)
-    c.execute("DELETE FROM lista_de_pontos WHERE cliente_id = ?", (cliente_id,))
+    cliente_novo = not cliente_id
     
-    # Inserir novos dados
-    for _, row in dados_df.iterrows():
+    def gravar(c):
+        id_cliente = cliente_id
+        if not id_cliente:
+            # Se o cliente não existir, criar
+            c.execute("INSERT INTO clientes (nome) VALUES (?)", (cliente,))
+            id_cliente = c.lastrowid
+        
         c.execute('''
-        INSERT INTO lista_de_pontos (id_disp, type, action, description, cliente, cliente_id)
-        VALUES (?, ?, ?, ?, ?, ?)
-        ''', (
-            row['id_disp'],
-            row['type'],
-            row['action'],
-            row['description'],
-            cliente,
-            cliente_id
-        ))
-    
-    conn.commit()
-    conn.close()
-    return True
+        SELECT id, id_disp, type, action, description
+        FROM lista_de_pontos
+        WHERE cliente_id = ?
+        ''', (id_cliente,))
+        gravados = _frame_da_consulta(c)
+        
+        sql_inserir = '''
+        INSERT INTO lista_de_pontos (id_disp, type, action, description, prefixo, modulo, numero, sub, laco, cliente, cliente_id)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        '''
+        
+        if substituir or ids_enviados.has_duplicates or gravados['id_disp'].duplicated().any():
+            # Regravar a lista inteira
+            c.execute("DELETE FROM lista_de_pontos WHERE cliente_id = ?", (id_cliente,))
+            c.executemany(sql_inserir, linhas_para_inserir(list(range(len(linhas))), id_cliente))
+            resumo = {
+                'modo': 'substituir',
+                'inseridos': len(linhas),
+                'atualizados': 0,
+                'removidos': len(gravados),
+                'inalterados': 0,
+            }
+        else:
+            # Posição de cada dispositivo gravado na lista enviada (-1 se não está mais nela)
+            posicao = ids_enviados.get_indexer(gravados['id_disp'])
+            mantidos = posicao >= 0
+            alterados = np.zeros(len(gravados), dtype=bool)
+            alterados[mantidos] = hashes_enviados[posicao[mantidos]] != _hash_pontos(gravados)[mantidos]
+            novos = ~ids_enviados.isin(gravados['id_disp'])
+            
+            ids_linha = gravados['id'].to_numpy()
+            c.executemany(
+                "DELETE FROM lista_de_pontos WHERE id = ?",
+                [(id_linha,) for id_linha in ids_linha[~mantidos].tolist()]
+            )
+            c.executemany(
+                "UPDATE lista_de_pontos SET type = ?, action = ?, description = ? WHERE id = ?",
+                [linhas[p][1:] + (id_linha,) for p, id_linha in zip(posicao[alterados].tolist(), ids_linha[alterados].tolist())]
+            )
+            c.executemany(sql_inserir, linhas_para_inserir(np.flatnonzero(novos).tolist(), id_cliente))
+            
+            resumo = {
+                'modo': 'sincronizar',
+                'inseridos': int(novos.sum()),
+                'atualizados': int(alterados.sum()),
+                'removidos': int((~mantidos).sum()),
+                'inalterados': int((mantidos & ~alterados).sum()),
+            }
+        
+        if _pontos_alterados(resumo):
+            # O plano conta só os dispositivos que estão na lista de pontos
+            _atualizar_resumo_dispositivos(c, cliente, id_cliente)
+            _atualizar_resumo_plano(c, cliente, id_cliente)
+        return resumo
+    
+    resumo = executar_transacao(gravar)
+    
+    if _pontos_alterados(resumo):
+        invalidar_cache(cliente, 'lista_de_pontos')
+    if cliente_novo:
+        invalidar_cache(cliente, 'clientes')
+    return resumo
 
+@instrumentada
+@consulta_cacheada('lista_de_pontos')
 def buscar_pontos(cliente):
-    """Busca os dados de pontos para um cliente específico"""
+    """
+    Busca os dados de pontos para um cliente específico
+    
+    Parâmetros:
+    cliente (str): Nome do cliente
+    
+    Retorna:
+    DataFrame: Pontos do cliente [id_disp, type, action, description, prefixo, modulo,
+    numero, sub, laco, cliente]
+    """
     conn = get_db_connection()
     c = conn.cursor()
     
@@ -214,7 +739,7 @@ def buscar_pontos(cliente):
     cliente_id = get_cliente_id(cliente)
     if not cliente_id:
         conn.close()
-        return []
+        return _frame_vazio(['id_disp', 'type', 'action', 'description'] + processamento.COLUNAS_ID + ['cliente'])
     
     # Verificar se a coluna cliente existe na tabela
     c.execute("PRAGMA table_info(lista_de_pontos)")
@@ -223,9 +748,9 @@ def buscar_pontos(cliente):
     
     # Definir colunas a selecionar com base na existência da coluna cliente
     if tem_coluna_cliente:
-        colunas_select = "id_disp, type, action, description, cliente"
+        colunas_select = "id_disp, type, action, description, prefixo, modulo, numero, sub, laco, cliente"
     else:
-        colunas_select = "id_disp, type, action, description"
+        colunas_select = "id_disp, type, action, description, prefixo, modulo, numero, sub, laco"
     
     # Buscar dados
     c.execute(f'''
@@ -234,17 +759,17 @@ def buscar_pontos(cliente):
     WHERE cliente_id = ?
     ''', (cliente_id,))
     
-    # Converter para lista de dicionários
-    resultado = [dict(row) for row in c.fetchall()]
+    resultado = _frame_da_consulta(c)
     
     # Se a coluna cliente não existir, adicionar o nome do cliente manualmente
     if not tem_coluna_cliente:
-        for row in resultado:
-            row['cliente'] = cliente
+        resultado['cliente'] = cliente
     
     conn.close()
     return resultado
 
+@instrumentada
+@escrita_serializada
 def salvar_plano_manutencao(cliente, plano_df):
     """
     Salva o plano de manutenção para um cliente específico
@@ -256,35 +781,43 @@ def salvar_plano_manutencao(cliente, plano_df):
     Retorna:
     bool: True se salvo com sucesso
     """
-    conn = get_db_connection()
-    c = conn.cursor()
+    # Preparar as linhas antes de abrir a transação para mantê-la curta
+    linhas = list(zip(
+        plano_df['id_disp'].tolist(),
+        plano_df['mes_manutencao'].astype(int).tolist()
+    ))
     
     # Obter ID do cliente
     cliente_id = get_cliente_id(cliente)
-    if not cliente_id:
-        # Se o cliente não existir, criar
-        c.execute("INSERT INTO clientes (nome) VALUES (?)", (cliente,))
-        cliente_id = c.lastrowid
-    
-    # Remover plano antigo deste cliente
-    c.execute("DELETE FROM plano_manutencao WHERE cliente_id = ?", (cliente_id,))
+    cliente_novo = not cliente_id
     
-    # Inserir novos dados
-    for _, row in plano_df.iterrows():
-        c.execute('''
+    def gravar(c):
+        id_cliente = cliente_id
+        if not id_cliente:
+            # Se o cliente não existir, criar
+            c.execute("INSERT INTO clientes (nome) VALUES (?)", (cliente,))
+            id_cliente = c.lastrowid
+        
+        # Remover plano antigo deste cliente
+        c.execute("DELETE FROM plano_manutencao WHERE cliente_id = ?", (id_cliente,))
+        
+        # Inserir novos dados
+        c.executemany('''
         INSERT INTO plano_manutencao (id_disp, cliente, cliente_id, mes_manutencao)
         VALUES (?, ?, ?, ?)
-        ''', (
-            row['id_disp'],
-            cliente,
-            cliente_id,
-            row['mes_manutencao']
-        ))
+        ''', [(id_disp, cliente, id_cliente, mes) for id_disp, mes in linhas])
+        
+        _atualizar_resumo_plano(c, cliente, id_cliente)
     
-    conn.commit()
-    conn.close()
+    executar_transacao(gravar)
+    
+    invalidar_cache(cliente, 'plano_manutencao')
+    if cliente_novo:
+        invalidar_cache(cliente, 'clientes')
     return True
 
+@instrumentada
+@consulta_cacheada('plano_manutencao')
 def buscar_plano_manutencao(cliente):
     """
     Busca o plano de manutenção para um cliente específico
@@ -293,7 +826,7 @@ def buscar_plano_manutencao(cliente):
     cliente (str): Nome do cliente
     
     Retorna:
-    list: Lista de dicionários com o plano de manutenção
+    DataFrame: Plano de manutenção [id_disp, mes_manutencao]
     """
     conn = get_db_connection()
     c = conn.cursor()
@@ -302,7 +835,7 @@ def buscar_plano_manutencao(cliente):
     cliente_id = get_cliente_id(cliente)
     if not cliente_id:
         conn.close()
-        return []
+        return _frame_vazio(['id_disp', 'mes_manutencao'])
     
     # Buscar dados
     c.execute('''
@@ -311,12 +844,13 @@ def buscar_plano_manutencao(cliente):
     WHERE cliente_id = ?
     ''', (cliente_id,))
     
-    # Converter para lista de dicionários
-    resultado = [dict(row) for row in c.fetchall()]
+    resultado = _frame_da_consulta(c)
     
     conn.close()
     return resultado
 
+@instrumentada
+@consulta_cacheada('plano_manutencao', 'lista_de_pontos')
 def buscar_manutencao_mensal(cliente, mes):
     """
     Busca as manutenções programadas para um cliente em um mês específico
@@ -337,22 +871,6 @@ def buscar_manutencao_mensal(cliente, mes):
         conn.close()
         return []
     
-    # Debug: Verificar total de registros no plano de manutenção
-    c.execute('''
-    SELECT COUNT(*) FROM plano_manutencao WHERE cliente_id = ?
-    ''', (cliente_id,))
-    total_registros = c.fetchone()[0]
-    print(f"Total de registros no plano para cliente {cliente}: {total_registros}")
-    
-    # Debug: Verificar quantos meses diferentes estão registrados
-    c.execute('''
-    SELECT mes_manutencao, COUNT(*) FROM plano_manutencao 
-    WHERE cliente_id = ? GROUP BY mes_manutencao
-    ''', (cliente_id,))
-    meses_registrados = c.fetchall()
-    for mes_reg in meses_registrados:
-        print(f"Mês {mes_reg[0]}: {mes_reg[1]} dispositivos")
-    
     # Buscar dispositivos que devem ser testados no mês
     c.execute('''
     SELECT pm.id_disp, pm.mes_manutencao,
@@ -363,15 +881,18 @@ def buscar_manutencao_mensal(cliente, mes):
     ''', (cliente_id, mes))
     
     dispositivos_para_testar = [dict(row) for row in c.fetchall()]
-    print(f"Encontrados {len(dispositivos_para_testar)} dispositivos para testar em {mes}")
     
     conn.close()
     return dispositivos_para_testar
 
+@instrumentada
+@consulta_cacheada('plano_manutencao')
 def verificar_estado_plano(cliente):
     """
     Função de depuração para verificar o estado atual do plano de manutenção de um cliente
     
+    Chamada apenas pelo painel de depuração; não deve ser usada no fluxo normal das páginas.
+    
     Parâmetros:
     cliente (str): Nome do cliente
     
@@ -418,6 +939,8 @@ def verificar_estado_plano(cliente):
         "distribuicao_por_mes": distribuicao
     }
 
+@instrumentada
+@escrita_serializada
 def salvar_teste_dispositivos(cliente, mes, ano, df_resultados):
     """
     Salva os resultados dos testes de dispositivos no banco de dados.
@@ -433,61 +956,60 @@ def salvar_teste_dispositivos(cliente, mes, ano, df_resultados):
     - False em caso de erro
     """
     try:
-        # Garantir que a tabela existe
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        # Preparar os parâmetros antes de abrir a transação para mantê-la curta
+        ids = df_resultados['id_disp'].tolist()
+        status = df_resultados['status'].tolist()
+        observacoes = df_resultados['observacao'].tolist()
+        atualizacoes = [(s, o, cliente, mes, ano, i) for i, s, o in zip(ids, status, observacoes)]
+        insercoes = [(cliente, mes, ano, i, s, o, cliente, mes, ano, i)
+                     for i, s, o in zip(ids, status, observacoes)]
         
-        # Verificar se a tabela existe e criar se não existir
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS testes_dispositivos (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                cliente TEXT,
-                mes INTEGER,
-                ano INTEGER,
-                id_disp TEXT,
-                status TEXT,
-                observacao TEXT,
-                data_teste TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Para cada dispositivo no DataFrame
-        for _, row in df_resultados.iterrows():
-            id_disp = row['id_disp']
-            status = row['status']
-            observacao = row['observacao']
-            
-            # Verificar se já existe um registro para este dispositivo/cliente/mês/ano
+        def gravar(cursor):
+            # Verificar se a tabela existe e criar se não existir
             cursor.execute('''
-                SELECT id FROM testes_dispositivos 
-                WHERE cliente = ? AND mes = ? AND ano = ? AND id_disp = ?
-            ''', (cliente, mes, ano, id_disp))
+                CREATE TABLE IF NOT EXISTS testes_dispositivos (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    cliente TEXT,
+                    mes INTEGER,
+                    ano INTEGER,
+                    id_disp TEXT,
+                    status TEXT,
+                    observacao TEXT,
+                    data_teste TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
             
-            resultado = cursor.fetchone()
+            # Atualizar os registros que já existem para este cliente/mês/ano
+            cursor.executemany('''
+                UPDATE testes_dispositivos
+                SET status = ?, observacao = ?, data_teste = CURRENT_TIMESTAMP
+                WHERE cliente = ? AND mes = ? AND ano = ? AND id_disp = ?
+            ''', atualizacoes)
             
-            if resultado:
-                # Atualizar registro existente
-                cursor.execute('''
-                    UPDATE testes_dispositivos
-                    SET status = ?, observacao = ?, data_teste = CURRENT_TIMESTAMP
+            # Inserir apenas os dispositivos que ainda não têm registro
+            cursor.executemany('''
+                INSERT INTO testes_dispositivos
+                (cliente, mes, ano, id_disp, status, observacao)
+                SELECT ?, ?, ?, ?, ?, ?
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM testes_dispositivos
                     WHERE cliente = ? AND mes = ? AND ano = ? AND id_disp = ?
-                ''', (status, observacao, cliente, mes, ano, id_disp))
-            else:
-                # Inserir novo registro
-                cursor.execute('''
-                    INSERT INTO testes_dispositivos
-                    (cliente, mes, ano, id_disp, status, observacao)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (cliente, mes, ano, id_disp, status, observacao))
-        
-        conn.commit()
-        conn.close()
+                )
+            ''', insercoes)
+            
+            _atualizar_resumo_testes(cursor, cliente, ano, mes)
+        
+        executar_transacao(gravar)
+        
+        invalidar_cache(cliente, 'testes_dispositivos')
         return True
         
     except Exception as e:
         print(f"Erro ao salvar testes de dispositivos: {str(e)}")
         return False
 
+@instrumentada
+@consulta_cacheada('testes_dispositivos')
 def buscar_testes_dispositivos(cliente, mes, ano):
     """
     Busca os resultados de testes de dispositivos para um cliente/mês/ano.
@@ -498,8 +1020,10 @@ def buscar_testes_dispositivos(cliente, mes, ano):
     - ano: Ano do teste
     
     Retorna:
-    - Lista de dicionários com os testes realizados [id_disp, status, observacao]
+    - DataFrame com os testes realizados [id_disp, status, observacao, data_teste]
     """
+    colunas = ['id_disp', 'status', 'observacao', 'data_teste']
+    
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
@@ -511,9 +1035,9 @@ def buscar_testes_dispositivos(cliente, mes, ano):
         ''')
         
         if not cursor.fetchone():
-            # Se a tabela não existe, retorna lista vazia
+            # Se a tabela não existe, retorna DataFrame vazio
             conn.close()
-            return []
+            return _frame_vazio(colunas)
         
         # Buscar os testes para o cliente/mês/ano
         cursor.execute('''
@@ -522,26 +1046,57 @@ def buscar_testes_dispositivos(cliente, mes, ano):
             WHERE cliente = ? AND mes = ? AND ano = ?
         ''', (cliente, mes, ano))
         
-        resultados = cursor.fetchall()
+        testes = _frame_da_consulta(cursor)
         conn.close()
         
-        # Converter para lista de dicionários
-        testes = []
-        for resultado in resultados:
-            teste = {
-                'id_disp': resultado[0],
-                'status': resultado[1],
-                'observacao': resultado[2],
-                'data_teste': resultado[3]
-            }
-            testes.append(teste)
-        
         return testes
     
     except Exception as e:
         print(f"Erro ao buscar testes de dispositivos: {str(e)}")
-        return []
+        descartar_resultado_do_cache()
+        return _frame_vazio(colunas)
 
+@instrumentada
+@consulta_cacheada('testes_dispositivos')
+def buscar_ultimos_testes(cliente):
+    """
+    Busca o mês/ano do teste mais recente de cada dispositivo de um cliente.
+    
+    Parâmetros:
+    - cliente: Nome do cliente
+    
+    Retorna:
+    - DataFrame com o último teste de cada dispositivo [id_disp, ano, mes]
+    """
+    colunas = ['id_disp', 'ano', 'mes']
+    
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        # Período codificado como ano * 100 + mes para obter o máximo em uma única agregação
+        cursor.execute('''
+            SELECT id_disp, periodo / 100 AS ano, periodo % 100 AS mes
+            FROM (
+                SELECT id_disp, MAX(ano * 100 + mes) AS periodo
+                FROM testes_dispositivos
+                WHERE cliente = ? AND status != ''
+                GROUP BY id_disp
+            )
+        ''', (cliente,))
+        
+        testes = _frame_da_consulta(cursor)
+        conn.close()
+        
+        return testes
+    
+    except Exception as e:
+        print(f"Erro ao buscar últimos testes: {str(e)}")
+        descartar_resultado_do_cache()
+        return _frame_vazio(colunas)
+
+@instrumentada
+@consulta_cacheada('clientes')
 def obter_lista_clientes():
     """
     Obtém a lista de todos os clientes disponíveis no banco de dados.
@@ -563,8 +1118,10 @@ def obter_lista_clientes():
     
     except Exception as e:
         print(f"Erro ao obter lista de clientes: {str(e)}")
+        descartar_resultado_do_cache()
         return []
 
+@instrumentada
 def obter_dispositivos(cliente):
     """
     Obtém a lista de todos os dispositivos de um cliente.
@@ -579,14 +1136,11 @@ def obter_dispositivos(cliente):
         # Buscar dispositivos do cliente
         dispositivos = buscar_pontos(cliente)
         
-        if not dispositivos:
+        if dispositivos.empty:
             return pd.DataFrame(columns=['id', 'descricao', 'type', 'action'])
         
-        # Converter para DataFrame
-        df = pd.DataFrame(dispositivos)
-        
         # Renomear colunas para padronizar
-        df = df.rename(columns={
+        df = dispositivos.rename(columns={
             'id_disp': 'id',
             'description': 'descricao'
         })
@@ -601,10 +1155,11 @@ def obter_dispositivos(cliente):
         print(f"Erro ao obter dispositivos: {str(e)}")
         return None
 
+@instrumentada
+@consulta_cacheada('leituras_dispositivos')
 def obter_dados_dispositivos(cliente, mes, ano):
     """
-    Obtém os dados dos dispositivos para um cliente em um determinado mês/ano.
-    Simula uma consulta a um banco de dados de leituras de dispositivos.
+    Obtém as leituras dos dispositivos para um cliente em um determinado mês/ano.
     
     Parâmetros:
     - cliente: Nome do cliente
@@ -615,60 +1170,275 @@ def obter_dados_dispositivos(cliente, mes, ano):
     DataFrame: DataFrame com os dados dos dispositivos [id_disp, datahora, valor, bateria, sinal]
     """
     try:
-        # Obter lista de dispositivos do cliente
-        df_dispositivos = obter_dispositivos(cliente)
-        
-        if df_dispositivos is None or df_dispositivos.empty:
-            return pd.DataFrame()
-        
-        # Simular dados para cada dispositivo (em aplicações reais, isso seria uma consulta ao banco)
-        dados = []
-        
-        # Definir início e fim do mês
-        inicio_mes = datetime(ano, mes, 1)
-        if mes == 12:
-            fim_mes = datetime(ano + 1, 1, 1) - timedelta(days=1)
-        else:
-            fim_mes = datetime(ano, mes + 1, 1) - timedelta(days=1)
-        
-        # Para cada dispositivo, simular algumas leituras ao longo do mês
-        for _, dispositivo in df_dispositivos.iterrows():
-            # Simular 5 leituras ao longo do mês para cada dispositivo
-            for _ in range(5):
-                # Gerar data aleatória dentro do mês
-                dia = random.randint(1, fim_mes.day)
-                hora = random.randint(0, 23)
-                minuto = random.randint(0, 59)
-                datahora = datetime(ano, mes, dia, hora, minuto)
-                
-                # Simular valores de medição, bateria e sinal
-                valor = random.uniform(0, 100)
-                bateria = random.uniform(0, 100)
-                sinal = random.uniform(-100, -50)
-                
-                dados.append({
-                    'id_disp': dispositivo['id'],
-                    'datahora': datahora,
-                    'valor': round(valor, 2),
-                    'bateria': round(bateria, 2),
-                    'sinal': round(sinal, 2)
-                })
-        
-        # Excluir alguns dispositivos aleatoriamente para simular offline
-        dispositivos_online = random.sample(
-            list(df_dispositivos['id']), 
-            k=int(len(df_dispositivos) * 0.8)  # 80% online
-        )
-        
-        # Filtrar apenas dispositivos online
-        dados_filtrados = [d for d in dados if d['id_disp'] in dispositivos_online]
-        
-        return pd.DataFrame(dados_filtrados)
+        inicio, fim = _intervalo_mes(ano, mes)
+        return buscar_leituras(cliente, inicio, fim)
     
     except Exception as e:
         print(f"Erro ao obter dados dos dispositivos: {str(e)}")
+        descartar_resultado_do_cache()
         return None
 
+def _intervalo_mes(ano, mes):
+    """Retorna o início do mês e o início do mês seguinte como datetime"""
+    inicio = datetime(ano, mes, 1)
+    fim = datetime(ano + 1, 1, 1) if mes == 12 else datetime(ano, mes + 1, 1)
+    return inicio, fim
+
+def _criar_tabelas_leituras(c):
+    """
+    Cria as tabelas do histórico de leituras e os agregados diário e mensal
+    
+    As leituras são indexadas por (cliente, id_disp, datahora) e por
+    (cliente, datahora) para consultas por intervalo. Os agregados guardam somas
+    em vez de médias para que possam ser combinados (dia -> mês) sem perda.
+    """
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS leituras_dispositivos (
+        cliente TEXT NOT NULL,
+        id_disp TEXT NOT NULL,
+        datahora TEXT NOT NULL,    -- 'AAAA-MM-DD HH:MM:SS'
+        valor REAL,
+        bateria REAL,
+        sinal REAL,
+        PRIMARY KEY (cliente, id_disp, datahora)
+    ) WITHOUT ROWID
+    ''')
+    c.execute('''
+    CREATE INDEX IF NOT EXISTS idx_leituras_cliente_datahora
+    ON leituras_dispositivos (cliente, datahora)
+    ''')
+    
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS leituras_diarias (
+        cliente TEXT NOT NULL,
+        dia TEXT NOT NULL,         -- 'AAAA-MM-DD'
+        id_disp TEXT NOT NULL,
+        leituras INTEGER NOT NULL,
+        valor_soma REAL,
+        valor_min REAL,
+        valor_max REAL,
+        bateria_soma REAL,
+        bateria_min REAL,
+        sinal_soma REAL,
+        ultima_leitura TEXT,
+        PRIMARY KEY (cliente, dia, id_disp)
+    ) WITHOUT ROWID
+    ''')
+    
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS leituras_mensais (
+        cliente TEXT NOT NULL,
+        ano INTEGER NOT NULL,
+        mes INTEGER NOT NULL,
+        id_disp TEXT NOT NULL,
+        leituras INTEGER NOT NULL,
+        valor_soma REAL,
+        valor_min REAL,
+        valor_max REAL,
+        bateria_soma REAL,
+        bateria_min REAL,
+        sinal_soma REAL,
+        ultima_leitura TEXT,
+        PRIMARY KEY (cliente, ano, mes, id_disp)
+    ) WITHOUT ROWID
+    ''')
+
+@instrumentada
+@escrita_serializada
+def salvar_leituras(cliente, df_leituras, tamanho_lote=TAMANHO_LOTE):
+    """
+    Grava em lote leituras de dispositivos e atualiza os agregados afetados
+    
+    Leituras repetidas (mesmo cliente, id_disp e datahora) substituem as anteriores.
+    Apenas os dias e meses presentes no lote têm seus agregados recalculados.
+    
+    Parâmetros:
+    cliente (str): Nome do cliente
+    df_leituras (DataFrame): Leituras com as colunas [id_disp, datahora, valor, bateria, sinal]
+    tamanho_lote (int): Quantidade de linhas enviadas por executemany
+    
+    Retorna:
+    int: Quantidade de leituras gravadas
+    """
+    if df_leituras.empty:
+        return 0
+    
+    datahora = pd.to_datetime(df_leituras['datahora'])
+    colunas = (
+        df_leituras['id_disp'].astype(str).str.strip().tolist(),
+        datahora.dt.strftime('%Y-%m-%d %H:%M:%S').tolist(),
+        df_leituras['valor'].astype(float).tolist(),
+        df_leituras['bateria'].astype(float).tolist(),
+        df_leituras['sinal'].astype(float).tolist(),
+    )
+    linhas = [(cliente,) + linha for linha in zip(*colunas)]
+    dias_afetados = sorted(datahora.dt.strftime('%Y-%m-%d').unique())
+    meses_afetados = sorted({(int(dia[:4]), int(dia[5:7])) for dia in dias_afetados})
+    
+    def gravar(c):
+        for inicio in range(0, len(linhas), tamanho_lote):
+            c.executemany('''
+            INSERT OR REPLACE INTO leituras_dispositivos (cliente, id_disp, datahora, valor, bateria, sinal)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ''', linhas[inicio:inicio + tamanho_lote])
+        
+        # Recalcular os agregados diários apenas dos dias que receberam leituras
+        for dia in dias_afetados:
+            dia_seguinte = (datetime.strptime(dia, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
+            c.execute("DELETE FROM leituras_diarias WHERE cliente = ? AND dia = ?", (cliente, dia))
+            c.execute('''
+            INSERT INTO leituras_diarias
+            (cliente, dia, id_disp, leituras, valor_soma, valor_min, valor_max,
+             bateria_soma, bateria_min, sinal_soma, ultima_leitura)
+            SELECT cliente, ?, id_disp, COUNT(*), SUM(valor), MIN(valor), MAX(valor),
+                   SUM(bateria), MIN(bateria), SUM(sinal), MAX(datahora)
+            FROM leituras_dispositivos
+            WHERE cliente = ? AND datahora >= ? AND datahora < ?
+            GROUP BY id_disp
+            ''', (dia, cliente, dia, dia_seguinte))
+        
+        # Os agregados mensais são derivados dos diários
+        for ano, mes in meses_afetados:
+            inicio, fim = _intervalo_mes(ano, mes)
+            c.execute("DELETE FROM leituras_mensais WHERE cliente = ? AND ano = ? AND mes = ?",
+                      (cliente, ano, mes))
+            c.execute('''
+            INSERT INTO leituras_mensais
+            (cliente, ano, mes, id_disp, leituras, valor_soma, valor_min, valor_max,
+             bateria_soma, bateria_min, sinal_soma, ultima_leitura)
+            SELECT cliente, ?, ?, id_disp, SUM(leituras), SUM(valor_soma), MIN(valor_min), MAX(valor_max),
+                   SUM(bateria_soma), MIN(bateria_min), SUM(sinal_soma), MAX(ultima_leitura)
+            FROM leituras_diarias
+            WHERE cliente = ? AND dia >= ? AND dia < ?
+            GROUP BY id_disp
+            ''', (ano, mes, cliente, inicio.strftime('%Y-%m-%d'), fim.strftime('%Y-%m-%d')))
+    
+    executar_transacao(gravar)
+    
+    invalidar_cache(cliente, 'leituras_dispositivos')
+    return len(linhas)
+
+@instrumentada
+def buscar_leituras(cliente, inicio, fim, ids_disp=None):
+    """
+    Busca as leituras de um cliente em um intervalo de tempo
+    
+    Parâmetros:
+    cliente (str): Nome do cliente
+    inicio (datetime): Início do intervalo (inclusivo)
+    fim (datetime): Fim do intervalo (exclusivo)
+    ids_disp (list, opcional): Restringe a busca a estes dispositivos
+    
+    Retorna:
+    DataFrame: Leituras [id_disp, datahora, valor, bateria, sinal] ordenadas por datahora
+    """
+    sql = '''
+    SELECT id_disp, datahora, valor, bateria, sinal
+    FROM leituras_dispositivos
+    WHERE cliente = ? AND datahora >= ? AND datahora < ?
+    '''
+    params = [cliente, pd.Timestamp(inicio).strftime('%Y-%m-%d %H:%M:%S'),
+              pd.Timestamp(fim).strftime('%Y-%m-%d %H:%M:%S')]
+    
+    conn = get_db_connection()
+    c = conn.cursor()
+    
+    if ids_disp is None:
+        c.execute(sql + " ORDER BY datahora", params)
+        leituras = _frame_da_consulta(c)
+    else:
+        # Dispositivos filtrados no SQLite (chave primária cliente, id_disp, datahora),
+        # em lotes de TAMANHO_LOTE_CONSULTA ids
+        ids_disp = list(dict.fromkeys(ids_disp))
+        partes = []
+        for posicao in range(0, len(ids_disp), TAMANHO_LOTE_CONSULTA):
+            lote = ids_disp[posicao:posicao + TAMANHO_LOTE_CONSULTA]
+            c.execute(sql + f" AND id_disp IN ({', '.join('?' * len(lote))})", params + lote)
+            partes.append(_frame_da_consulta(c))
+        if partes:
+            leituras = pd.concat(partes, ignore_index=True)
+            leituras = leituras.sort_values('datahora', kind='stable', ignore_index=True)
+        else:
+            leituras = _frame_vazio(['id_disp', 'datahora', 'valor', 'bateria', 'sinal'])
+    conn.close()
+    
+    leituras['datahora'] = pd.to_datetime(leituras['datahora'], format='%Y-%m-%d %H:%M:%S')
+    return leituras
+
+def _frame_agregado(cursor):
+    """Converte as somas dos agregados de leituras em médias"""
+    df = _frame_da_consulta(cursor)
+    leituras = df['leituras'].astype(float)
+    for medida in ('valor', 'bateria', 'sinal'):
+        df[f'{medida}_medio'] = df.pop(f'{medida}_soma') / leituras
+    return df
+
+@instrumentada
+@consulta_cacheada('leituras_dispositivos')
+def buscar_leituras_diarias(cliente, inicio, fim):
+    """
+    Busca o agregado diário das leituras de um cliente
+    
+    Parâmetros:
+    cliente (str): Nome do cliente
+    inicio (date): Primeiro dia (inclusivo)
+    fim (date): Último dia (exclusivo)
+    
+    Retorna:
+    DataFrame: [dia, id_disp, leituras, valor_min, valor_max, bateria_min,
+    ultima_leitura, valor_medio, bateria_medio, sinal_medio]
+    """
+    conn = get_db_connection()
+    c = conn.cursor()
+    
+    c.execute('''
+    SELECT dia, id_disp, leituras, valor_soma, valor_min, valor_max,
+           bateria_soma, bateria_min, sinal_soma, ultima_leitura
+    FROM leituras_diarias
+    WHERE cliente = ? AND dia >= ? AND dia < ?
+    ''', (cliente, pd.Timestamp(inicio).strftime('%Y-%m-%d'), pd.Timestamp(fim).strftime('%Y-%m-%d')))
+    
+    df = _frame_agregado(c)
+    conn.close()
+    return df
+
+@instrumentada
+@consulta_cacheada('leituras_dispositivos')
+def buscar_leituras_mensais(cliente, ano, mes=None):
+    """
+    Busca o agregado mensal das leituras de um cliente
+    
+    Parâmetros:
+    cliente (str): Nome do cliente
+    ano (int): Ano das leituras
+    mes (int, opcional): Mês das leituras (se None, busca o ano inteiro)
+    
+    Retorna:
+    DataFrame: [ano, mes, id_disp, leituras, valor_min, valor_max, bateria_min,
+    ultima_leitura, valor_medio, bateria_medio, sinal_medio]
+    """
+    conn = get_db_connection()
+    c = conn.cursor()
+    
+    sql = '''
+    SELECT ano, mes, id_disp, leituras, valor_soma, valor_min, valor_max,
+           bateria_soma, bateria_min, sinal_soma, ultima_leitura
+    FROM leituras_mensais
+    WHERE cliente = ? AND ano = ?
+    '''
+    params = [cliente, ano]
+    
+    if mes is not None:
+        sql += " AND mes = ?"
+        params.append(mes)
+    
+    c.execute(sql, params)
+    df = _frame_agregado(c)
+    conn.close()
+    return df
+
+@instrumentada
+@consulta_cacheada('plano_manutencao', 'lista_de_pontos')
 def buscar_manutencao_anual(cliente, ano):
     """
     Busca as manutenções programadas para um cliente em todos os meses do ano
@@ -712,6 +1482,8 @@ def buscar_manutencao_anual(cliente, ano):
     conn.close()
     return dispositivos_planejados
 
+@instrumentada
+@escrita_serializada
 def salvar_acao_corretiva(cliente, mes, ano, id_disp, descricao_problema, acao_corretiva, resolvido):
     """
     Salva uma ação corretiva no banco de dados
@@ -728,10 +1500,10 @@ def salvar_acao_corretiva(cliente, mes, ano, id_disp, descricao_problema, acao_c
     Retorna:
     bool: True se a operação foi bem sucedida, False caso contrário
     """
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
+    # Converter boolean para inteiro (SQLite não tem tipo boolean)
+    resolvido_int = 1 if resolvido else 0
+    
+    def gravar(cursor):
         # Criar tabela se não existir
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS acoes_corretivas (
@@ -755,9 +1527,6 @@ def salvar_acao_corretiva(cliente, mes, ano, id_disp, descricao_problema, acao_c
         
         resultado = cursor.fetchone()
         
-        # Converter boolean para inteiro (SQLite não tem tipo boolean)
-        resolvido_int = 1 if resolvido else 0
-        
         if resultado:
             # Atualizar registro existente
             cursor.execute('''
@@ -775,14 +1544,20 @@ def salvar_acao_corretiva(cliente, mes, ano, id_disp, descricao_problema, acao_c
                 VALUES (?, ?, ?, ?, ?, ?, ?)
             ''', (cliente, mes, ano, id_disp, descricao_problema, acao_corretiva, resolvido_int))
         
-        conn.commit()
-        conn.close()
+        _atualizar_resumo_acoes(cursor, cliente)
+    
+    try:
+        executar_transacao(gravar)
+        
+        invalidar_cache(cliente, 'acoes_corretivas')
         return True
         
     except Exception as e:
         print(f"Erro ao salvar ação corretiva: {str(e)}")
         return False
 
+@instrumentada
+@consulta_cacheada('acoes_corretivas')
 def buscar_acoes_corretivas(cliente, mes=None, ano=None):
     """
     Busca ações corretivas para um cliente, opcionalmente filtradas por mês e ano
@@ -793,8 +1568,10 @@ def buscar_acoes_corretivas(cliente, mes=None, ano=None):
     ano (int, opcional): Ano das ações (se None, busca todos os anos)
     
     Retorna:
-    list: Lista de dicionários com as ações corretivas
+    DataFrame: Ações corretivas [id_disp, mes, ano, descricao_problema, acao_corretiva, resolvido, data_registro]
     """
+    colunas = ['id_disp', 'mes', 'ano', 'descricao_problema', 'acao_corretiva', 'resolvido', 'data_registro']
+    
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
@@ -806,9 +1583,9 @@ def buscar_acoes_corretivas(cliente, mes=None, ano=None):
         ''')
         
         if not cursor.fetchone():
-            # Se a tabela não existe, retorna lista vazia
+            # Se a tabela não existe, retorna DataFrame vazio
             conn.close()
-            return []
+            return _frame_vazio(colunas)
         
         # Construir a consulta SQL baseada nos parâmetros
         sql = '''
@@ -831,25 +1608,234 @@ def buscar_acoes_corretivas(cliente, mes=None, ano=None):
         
         # Executar a consulta
         cursor.execute(sql, params)
-        resultados = cursor.fetchall()
-        conn.close()
         
-        # Converter para lista de dicionários
-        acoes = []
-        for resultado in resultados:
-            acao = {
-                'id_disp': resultado[0],
-                'mes': resultado[1],
-                'ano': resultado[2],
-                'descricao_problema': resultado[3],
-                'acao_corretiva': resultado[4],
-                'resolvido': bool(resultado[5]),  # Converter int para boolean
-                'data_registro': resultado[6]
-            }
-            acoes.append(acao)
+        # resolvido é convertido de int para boolean pelos tipos padronizados
+        acoes = _frame_da_consulta(cursor)
+        conn.close()
         
         return acoes
     
     except Exception as e:
         print(f"Erro ao buscar ações corretivas: {str(e)}")
-        return [] 
\ No newline at end of file
+        descartar_resultado_do_cache()
+        return _frame_vazio(colunas)
+
+def _criar_tabelas_resumo(c):
+    """
+    Cria as tabelas do resumo da frota (agregados materializados por cliente)
+    
+    Cada tabela é mantida pelas funções de escrita na mesma transação que altera
+    os dados de origem, recalculando apenas a fatia do cliente (ou do mês) afetada.
+    Assim a visão da frota lê poucas linhas já agregadas, qualquer que seja o
+    número de clientes e dispositivos.
+    
+    Retorna:
+    bool: True se alguma das tabelas foi criada agora (e precisa ser preenchida)
+    """
+    c.execute('''
+    SELECT COUNT(*) FROM sqlite_master
+    WHERE type='table' AND name IN ('resumo_dispositivos', 'resumo_plano', 'resumo_testes', 'resumo_acoes')
+    ''')
+    existentes = c.fetchone()[0]
+    
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS resumo_dispositivos (
+        cliente TEXT NOT NULL,
+        type TEXT NOT NULL,
+        laco TEXT NOT NULL,
+        dispositivos INTEGER NOT NULL,
+        PRIMARY KEY (cliente, type, laco)
+    ) WITHOUT ROWID
+    ''')
+    
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS resumo_plano (
+        cliente TEXT NOT NULL,
+        mes INTEGER NOT NULL,
+        planejados INTEGER NOT NULL,
+        PRIMARY KEY (cliente, mes)
+    ) WITHOUT ROWID
+    ''')
+    
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS resumo_testes (
+        cliente TEXT NOT NULL,
+        ano INTEGER NOT NULL,
+        mes INTEGER NOT NULL,
+        testados INTEGER NOT NULL,
+        falhas INTEGER NOT NULL,
+        PRIMARY KEY (cliente, ano, mes)
+    ) WITHOUT ROWID
+    ''')
+    
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS resumo_acoes (
+        cliente TEXT NOT NULL PRIMARY KEY,
+        abertas INTEGER NOT NULL,
+        resolvidas INTEGER NOT NULL
+    ) WITHOUT ROWID
+    ''')
+    
+    return existentes < 4
+
+def _atualizar_resumo_dispositivos(c, cliente, cliente_id):
+    """Recalcula a quantidade de dispositivos por tipo e laço de um cliente"""
+    c.execute("DELETE FROM resumo_dispositivos WHERE cliente = ?", (cliente,))
+    c.execute('''
+    INSERT INTO resumo_dispositivos (cliente, type, laco, dispositivos)
+    SELECT ?, COALESCE(type, ''), COALESCE(laco, ''), COUNT(*)
+    FROM lista_de_pontos
+    WHERE cliente_id = ?
+    GROUP BY COALESCE(type, ''), COALESCE(laco, '')
+    ''', (cliente, cliente_id))
+
+def _atualizar_resumo_plano(c, cliente, cliente_id):
+    """Recalcula os dispositivos planejados por mês de um cliente (só os que estão na lista de pontos)"""
+    c.execute("DELETE FROM resumo_plano WHERE cliente = ?", (cliente,))
+    c.execute('''
+    INSERT INTO resumo_plano (cliente, mes, planejados)
+    SELECT ?, pm.mes_manutencao, COUNT(*)
+    FROM plano_manutencao pm
+    JOIN lista_de_pontos lp ON pm.id_disp = lp.id_disp AND pm.cliente_id = lp.cliente_id
+    WHERE pm.cliente_id = ? AND pm.mes_manutencao IS NOT NULL
+    GROUP BY pm.mes_manutencao
+    ''', (cliente, cliente_id))
+
+def _atualizar_resumo_testes(c, cliente, ano, mes):
+    """Recalcula os dispositivos testados e com falha de um cliente em um mês"""
+    c.execute("DELETE FROM resumo_testes WHERE cliente = ? AND ano = ? AND mes = ?", (cliente, ano, mes))
+    c.execute('''
+    INSERT INTO resumo_testes (cliente, ano, mes, testados, falhas)
+    SELECT cliente, ano, mes, COUNT(*), SUM(status = 'Teste Não OK')
+    FROM testes_dispositivos
+    WHERE cliente = ? AND ano = ? AND mes = ? AND status <> ''
+    GROUP BY cliente, ano, mes
+    ''', (cliente, ano, mes))
+
+def _atualizar_resumo_acoes(c, cliente):
+    """Recalcula as ações corretivas abertas e resolvidas de um cliente"""
+    c.execute("DELETE FROM resumo_acoes WHERE cliente = ?", (cliente,))
+    c.execute('''
+    INSERT INTO resumo_acoes (cliente, abertas, resolvidas)
+    SELECT cliente, SUM(resolvido = 0), SUM(resolvido <> 0)
+    FROM acoes_corretivas
+    WHERE cliente = ?
+    GROUP BY cliente
+    ''', (cliente,))
+
+def _reconstruir_resumos(c):
+    """Preenche todas as tabelas do resumo da frota a partir dos dados gravados"""
+    c.execute("SELECT nome, id FROM clientes")
+    for cliente, cliente_id in c.fetchall():
+        _atualizar_resumo_dispositivos(c, cliente, cliente_id)
+        _atualizar_resumo_plano(c, cliente, cliente_id)
+    
+    c.execute("SELECT DISTINCT cliente, ano, mes FROM testes_dispositivos")
+    for cliente, ano, mes in c.fetchall():
+        _atualizar_resumo_testes(c, cliente, ano, mes)
+    
+    # A tabela de ações corretivas só existe depois da primeira ação registrada
+    c.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='acoes_corretivas'")
+    if c.fetchone():
+        c.execute("SELECT DISTINCT cliente FROM acoes_corretivas")
+        for (cliente,) in c.fetchall():
+            _atualizar_resumo_acoes(c, cliente)
+    
+    logger.info("Resumo da frota reconstruído a partir dos dados gravados")
+
+@instrumentada
+@consulta_cacheada('lista_de_pontos')
+def buscar_resumo_dispositivos(cliente=None):
+    """
+    Busca a quantidade de dispositivos por tipo e laço no resumo da frota
+    
+    Parâmetros:
+    cliente (str, opcional): Nome do cliente (se None, busca todos os clientes)
+    
+    Retorna:
+    DataFrame: [cliente, type, laco, dispositivos]
+    """
+    sql = "SELECT cliente, type, laco, dispositivos FROM resumo_dispositivos"
+    params = []
+    if cliente is not None:
+        sql += " WHERE cliente = ?"
+        params.append(cliente)
+    sql += " ORDER BY cliente, type, laco"
+    
+    conn = get_db_connection()
+    c = conn.cursor()
+    c.execute(sql, params)
+    resultado = _frame_da_consulta(c)
+    conn.close()
+    return resultado
+
+@instrumentada
+def buscar_resumo_manutencao(cliente=None, ano=None):
+    """
+    Busca, por cliente e mês, os dispositivos planejados, testados e com falha
+    
+    Parâmetros:
+    cliente (str, opcional): Nome do cliente (se None, busca todos os clientes)
+    ano (int, opcional): Ano dos testes (se None, o ano atual)
+    
+    Retorna:
+    DataFrame: [cliente, mes, planejados, testados, falhas]
+    """
+    # O ano atual é resolvido antes da chave do cache: com None na chave, o resumo
+    # do ano anterior continuaria sendo servido depois da virada do ano
+    return _buscar_resumo_manutencao(cliente, datetime.now().year if ano is None else ano)
+
+@consulta_cacheada('plano_manutencao', 'testes_dispositivos', 'lista_de_pontos')
+def _buscar_resumo_manutencao(cliente, ano):
+    """Resumo de buscar_resumo_manutencao para um ano definido (cacheado por cliente e ano)"""
+    filtro_cliente = " AND cliente = ?" if cliente is not None else ""
+    params_cliente = [cliente] if cliente is not None else []
+    
+    # O plano se repete todo ano; os testes são do ano escolhido
+    sql = f'''
+    SELECT cliente, mes, SUM(planejados) AS planejados, SUM(testados) AS testados, SUM(falhas) AS falhas
+    FROM (
+        SELECT cliente, mes, planejados, 0 AS testados, 0 AS falhas
+        FROM resumo_plano
+        WHERE 1 = 1{filtro_cliente}
+        UNION ALL
+        SELECT cliente, mes, 0, testados, falhas
+        FROM resumo_testes
+        WHERE ano = ?{filtro_cliente}
+    )
+    GROUP BY cliente, mes
+    ORDER BY cliente, mes
+    '''
+    
+    conn = get_db_connection()
+    c = conn.cursor()
+    c.execute(sql, params_cliente + [ano] + params_cliente)
+    resultado = _frame_da_consulta(c)
+    conn.close()
+    return resultado
+
+@instrumentada
+@consulta_cacheada('acoes_corretivas')
+def buscar_resumo_acoes(cliente=None):
+    """
+    Busca as ações corretivas abertas e resolvidas por cliente
+    
+    Parâmetros:
+    cliente (str, opcional): Nome do cliente (se None, busca todos os clientes)
+    
+    Retorna:
+    DataFrame: [cliente, abertas, resolvidas]
+    """
+    sql = "SELECT cliente, abertas, resolvidas FROM resumo_acoes"
+    params = []
+    if cliente is not None:
+        sql += " WHERE cliente = ?"
+        params.append(cliente)
+    sql += " ORDER BY cliente"
+    
+    conn = get_db_connection()
+    c = conn.cursor()
+    c.execute(sql, params)
+    resultado = _frame_da_consulta(c)
+    conn.close()
+    return resultado
@@ -0,0 +1,120 @@
+"""
+Medição da inicialização do app e do custo de cada execução das páginas
+
+Compara a inicialização anterior (todos os imports no topo do app.py e init_db
+a cada execução do script) com a atual (páginas importadas sob demanda e
+init_db uma vez por processo):
+
+- importação a frio, em um processo novo por medição: os módulos que o app.py
+  anterior importava no topo contra os que o atual importa, e o que cada página
+  acrescenta quando é aberta pela primeira vez;
+- execução de cada página (rerun) no AppTest do Streamlit sobre uma cópia do
+  banco, com e sem um init_db antes de cada execução, como o app.py anterior
+  fazia.
+
+Uso (a partir da pasta src):
+    python medicao_inicializacao.py --cliente BSC --repeticoes 5
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import db
+
+PASTA = os.path.dirname(os.path.abspath(__file__))
+
+# Imports do topo do app.py anterior e do atual
+IMPORTS_ANTES = [
+    'streamlit', 'pandas', 'sqlite3', 'json', 'datetime', 'plotly.express', 'numpy',
+    'plotly.graph_objects', 'dash', 'dash_bootstrap_components', 'flask', 'dash.exceptions',
+    'calendar', 'base64', 'io', 'db', 'processamento',
+]
+IMPORTS_DEPOIS = ['streamlit', 'importlib', 'db']
+
+def tempo_importacao(modulos, ja_importados=(), repeticoes=5):
+    """
+    Mediana do tempo (ms) para importar os módulos em um processo Python novo
+    
+    Parâmetros:
+    modulos (list): Módulos medidos
+    ja_importados (list): Módulos importados antes do início da medição
+    repeticoes (int): Processos executados
+    
+    Retorna:
+    float: Mediana em ms, ou None se algum módulo não estiver instalado
+    """
+    codigo = (
+        "import time\n"
+        + "".join(f"import {modulo}\n" for modulo in ja_importados)
+        + "inicio = time.perf_counter()\n"
+        + "".join(f"import {modulo}\n" for modulo in modulos)
+        + "print((time.perf_counter() - inicio) * 1000)\n"
+    )
+    tempos = []
+    for _ in range(repeticoes):
+        processo = subprocess.run([sys.executable, '-c', codigo], capture_output=True, text=True, cwd=PASTA)
+        if processo.returncode != 0:
+            return None
+        tempos.append(float(processo.stdout.strip().splitlines()[-1]))
+    return statistics.median(tempos)
+
+def tempo_execucoes(cliente, opcao, repeticoes, init_db_a_cada_execucao):
+    """
+    Mediana do tempo (ms) de uma nova execução do app com a página aberta
+    
+    A primeira execução (imports e caches vazios) não entra na medição.
+    """
+    from streamlit.testing.v1 import AppTest
+    
+    db.limpar_cache()
+    app = AppTest.from_file(os.path.join(PASTA, 'app.py'), default_timeout=120)
+    app.run()
+    app.sidebar.selectbox[0].select(cliente).run()
+    app.sidebar.button(key=opcao).click().run()
+    
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        if init_db_a_cada_execucao:
+            db.init_db()
+        app.run()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    if app.exception:
+        raise RuntimeError(f"{opcao}: {app.exception[0].value}")
+    return statistics.median(tempos)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--cliente', default='BSC')
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+    
+    import app
+    
+    print("Importação a frio (mediana, ms)")
+    for nome, modulos in [('app.py anterior', IMPORTS_ANTES), ('app.py atual', IMPORTS_DEPOIS)]:
+        tempo = tempo_importacao(modulos, repeticoes=args.repeticoes)
+        print(f"  {nome:<28} {'não instalado' if tempo is None else f'{tempo:8.1f}'}")
+    for opcao, (modulo, _) in app.PAGINAS.items():
+        tempo = tempo_importacao([modulo], IMPORTS_DEPOIS, args.repeticoes)
+        print(f"  + {opcao:<26} {'não instalado' if tempo is None else f'{tempo:8.1f}'}")
+    
+    # Execuções sobre uma cópia do banco, para não alterar o original
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, 'dashboard.db')
+        if os.path.exists(db.DB_PATH):
+            shutil.copy(db.DB_PATH, caminho)
+        db.DB_PATH = caminho
+        db.init_db()
+        
+        print(f"\nExecução da página, cliente {args.cliente} (mediana, ms)")
+        print(f"  {'página':<26} {'init_db a cada execução':>24} {'init_db uma vez':>16}")
+        for opcao in app.PAGINAS:
+            antes = tempo_execucoes(args.cliente, opcao, args.repeticoes, True)
+            depois = tempo_execucoes(args.cliente, opcao, args.repeticoes, False)
+            print(f"  {opcao:<26} {antes:24.1f} {depois:16.1f}")
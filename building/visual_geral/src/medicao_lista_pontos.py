@@ -0,0 +1,76 @@
+"""
+Medição da leitura da lista de pontos
+
+Compara o leitor atual (processamento.ler_lista_pontos) com o leitor anterior
+(engine python, várias codificações e strip em todas as colunas) em listas de
+pontos sintéticas: colunas sem preenchimento, colunas preenchidas com espaços
+(exportações de largura fixa) e descrições entre aspas.
+
+Uso (a partir da pasta src):
+    python medicao_lista_pontos.py --linhas 100000 --preenchimento 40
+"""
+import argparse
+import io
+import time
+
+import numpy as np
+import pandas as pd
+
+import processamento
+
+def processar_arquivo_pontos_anterior(arquivo):
+    """Leitor anterior à detecção de codificação e à validação das linhas"""
+    for codificacao in ['latin1', 'cp1252', 'utf-8-sig', 'utf-8']:
+        try:
+            df = pd.read_csv(arquivo, sep=';', engine='python', encoding=codificacao)
+            break
+        except UnicodeDecodeError:
+            arquivo.seek(0)
+    if 'Column1' in df.columns:
+        df = df.rename(columns=processamento.CABECALHO_GENERICO)
+    # is_string_dtype: no pandas 3 as colunas de texto não são mais 'object'
+    for col in df.columns:
+        if pd.api.types.is_string_dtype(df[col]):
+            df[col] = df[col].str.strip()
+    return df[processamento.COLUNAS_PONTOS]
+
+def gerar_lista(total, preenchimento=0, aspas=False):
+    """Lista de pontos sintética em cp1252 (cabeçalho genérico)"""
+    rng = np.random.default_rng(0)
+    tipos = np.array(['PHOTO', 'HEAT', 'UNUSED', 'MBZAM', 'ADRPUL', 'IAM'])
+    espacos = ' ' * preenchimento
+    linhas = []
+    for modulo, numero, tipo in zip(rng.integers(1, 9, total), range(total), rng.choice(tipos, total)):
+        descricao = f"DETECTOR ÁREA TÉCNICA {numero} – LAÇO {modulo}"
+        if aspas:
+            descricao = f'"SALA ; {descricao}"'
+        linhas.append(f" M{modulo}-{numero}-0{espacos}; {tipo}{espacos}; SMOKE{espacos}; {descricao}{espacos}")
+    return ("Column1;Column2;Column3;Column4\n" + "\n".join(linhas) + "\n").encode('cp1252')
+
+def medir(funcao, dados, repeticoes):
+    """Menor tempo (s) de repeticoes leituras e o último resultado"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(io.BytesIO(dados))
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), resultado
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--linhas', type=int, default=100_000)
+    parser.add_argument('--preenchimento', type=int, default=40, help="Espaços após cada campo no arquivo preenchido")
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args()
+    
+    arquivos = [
+        ('sem preenchimento', gerar_lista(args.linhas)),
+        (f'{args.preenchimento} espaços', gerar_lista(args.linhas, args.preenchimento)),
+        ('com aspas', gerar_lista(args.linhas, aspas=True)),
+    ]
+    for nome_arquivo, dados in arquivos:
+        for nome, funcao in [('anterior', processar_arquivo_pontos_anterior),
+                             ('atual', processamento.processar_arquivo_pontos)]:
+            tempo, resultado = medir(funcao, dados, args.repeticoes)
+            print(f"{nome_arquivo:<18} {nome:<9} {tempo * 1000:8.1f} ms  ({len(resultado)} linhas, "
+                  f"descrição: {resultado['description'].iloc[0]!r})")
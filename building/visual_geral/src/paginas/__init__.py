@@ -0,0 +1,6 @@
+"""
+Páginas do painel de manutenção
+
+Cada módulo desenha uma página do menu e é importado pelo app.py apenas quando
+a página é aberta (ver PAGINAS e carregar_pagina em app.py).
+"""
@@ -0,0 +1,112 @@
+import streamlit as st
+from datetime import datetime, timedelta
+
+import db
+
+# Dispositivos com leituras acima dos quais o gráfico de valores não é desenhado
+MAXIMO_SERIES_GRAFICO = 10
+
+def pagina_dispositivos(cliente):
+    st.subheader(f"Lista de Dispositivos - {cliente}")
+    
+    # Buscar dados do banco de dados
+    df = db.buscar_pontos(cliente)
+    
+    if df.empty:
+        st.info(f"Nenhum dispositivo cadastrado para {cliente}. Use a página de Upload para adicionar.")
+        return
+    
+    # Adicionar opções de filtro
+    st.markdown("### Filtros")
+    col1, col2, col3, col4 = st.columns(4)
+    
+    # Filtro por tipo
+    with col1:
+        tipos_unicos = sorted(df['type'].unique())
+        tipo_selecionado = st.multiselect("Filtrar por Tipo:", tipos_unicos)
+    
+    # Filtro por laço
+    with col2:
+        lacos_unicos = sorted(df['laco'].unique())
+        laco_selecionado = st.multiselect("Filtrar por Laço:", lacos_unicos)
+    
+    # Filtro por texto na descrição
+    with col3:
+        texto_busca = st.text_input("Buscar na descrição:")
+    
+    # Opção para mostrar/ocultar UNUSED
+    with col4:
+        mostrar_unused = st.checkbox("Mostrar UNUSED", value=True)
+    
+    # Aplicar filtros
+    df_filtrado = df.copy()
+    
+    # Filtro por tipo
+    if tipo_selecionado:
+        df_filtrado = df_filtrado[df_filtrado['type'].isin(tipo_selecionado)]
+    
+    # Filtro por laço
+    if laco_selecionado:
+        df_filtrado = df_filtrado[df_filtrado['laco'].isin(laco_selecionado)]
+    
+    # Filtro por texto na descrição
+    if texto_busca:
+        df_filtrado = df_filtrado[df_filtrado['description'].str.contains(texto_busca, case=False, na=False)]
+    
+    # Filtro UNUSED
+    if not mostrar_unused:
+        df_filtrado = df_filtrado[df_filtrado['type'] != 'UNUSED']
+    
+    # Exibir estatísticas sobre os filtros
+    st.markdown(f"**Mostrando {len(df_filtrado)} de {len(df)} dispositivos.**")
+    
+    # Mostrar dataframe filtrado
+    st.dataframe(df_filtrado)
+    
+    # Adicionar análises e visualizações
+    if not df_filtrado.empty:
+        # Contagem por laço
+        st.subheader("Distribuição por Laço")
+        contagem_laco = df_filtrado['laco'].value_counts()
+        st.bar_chart(contagem_laco[contagem_laco > 0])
+        
+        # Contagem por tipo
+        st.subheader("Distribuição por Tipo")
+        # type e action são categóricas: descartar categorias fora do filtro
+        contagem_tipo = df_filtrado['type'].value_counts()
+        st.bar_chart(contagem_tipo[contagem_tipo > 0])
+        
+        # Contagem por ação
+        if 'action' in df_filtrado.columns and not df_filtrado['action'].isnull().all():
+            st.subheader("Distribuição por Ação")
+            contagem_acao = df_filtrado['action'].value_counts()
+            st.bar_chart(contagem_acao[contagem_acao > 0])
+    
+    # Leituras (valor, bateria e sinal) dos dispositivos filtrados em um período
+    if not df_filtrado.empty:
+        st.subheader("Leituras dos Dispositivos")
+        hoje = datetime.now().date()
+        periodo = st.date_input("Período das leituras:", value=(hoje - timedelta(days=30), hoje))
+        # Enquanto o período é escolhido o seletor devolve apenas a data inicial
+        if isinstance(periodo, (tuple, list)) and len(periodo) == 2:
+            inicio, fim = periodo
+            leituras = db.buscar_leituras(
+                cliente, inicio, fim + timedelta(days=1), ids_disp=df_filtrado['id_disp'].tolist()
+            )
+            
+            if leituras.empty:
+                st.info("Nenhuma leitura no período para os dispositivos filtrados. "
+                        "Use a aba Leituras da página de Upload para importar.")
+            else:
+                resumo = leituras.groupby('id_disp').agg(
+                    leituras=('valor', 'size'),
+                    ultima_leitura=('datahora', 'max'),
+                    valor_medio=('valor', 'mean'),
+                    valor_max=('valor', 'max'),
+                    bateria_min=('bateria', 'min'),
+                    sinal_medio=('sinal', 'mean'),
+                )
+                st.dataframe(resumo)
+                
+                if len(resumo) <= MAXIMO_SERIES_GRAFICO:
+                    st.line_chart(leituras.pivot_table(index='datahora', columns='id_disp', values='valor'))
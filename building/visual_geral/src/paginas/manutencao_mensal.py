@@ -0,0 +1,205 @@
+import streamlit as st
+import pandas as pd
+import calendar
+from datetime import datetime
+
+import catalogo
+import relatorios
+from db import buscar_manutencao_mensal, buscar_testes_dispositivos, salvar_teste_dispositivos, salvar_acao_corretiva
+
+def pagina_manutencao_mensal(cliente):
+    st.title("Relatório de Manutenção Mensal")
+    
+    # Selecionar apenas mês e ano (cliente já está definido pelo menu)
+    col1, col2 = st.columns(2)
+    with col1:
+        mes = st.selectbox("Mês", list(range(1, 13)), format_func=lambda x: calendar.month_name[x])
+    with col2:
+        ano = st.selectbox("Ano", list(range(datetime.now().year - 2, datetime.now().year + 1)))
+    
+    st.subheader(f"Cliente: {cliente}")
+    
+    # Obter dispositivos programados para este mês específico
+    dispositivos_planejados = buscar_manutencao_mensal(cliente, mes)
+    
+    if not dispositivos_planejados:
+        st.warning(f"Não há dispositivos programados para manutenção em {calendar.month_name[mes]} para o cliente {cliente}")
+        return
+    
+    # Catálogo de dispositivos do cliente para referência
+    catalogo_cliente = catalogo.obter_catalogo(cliente)
+    
+    # Filtrar apenas os dispositivos planejados para o mês
+    ids_planejados = [disp['id_disp'] for disp in dispositivos_planejados]
+    df_disp_mes = catalogo_cliente.filtrar(ids_planejados)
+    
+    # Obter testes já realizados
+    testes_anteriores = buscar_testes_dispositivos(cliente, mes, ano)
+    
+    # Construir relatório
+    with st.container():
+        st.header(f"Relatório para {cliente} - {calendar.month_name[mes]} de {ano}")
+        
+        # Métricas principais
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Total de Dispositivos Planejados", len(df_disp_mes))
+        with col2:
+            testes_realizados = int((testes_anteriores['status'] != '').sum())
+            percentual = (testes_realizados / len(df_disp_mes) * 100) if len(df_disp_mes) > 0 else 0
+            st.metric("Testes Realizados", f"{percentual:.1f}%")
+    
+    # Exportação: o relatório é montado no banco e gerado apenas quando solicitado
+    with st.expander("📊 Exportar Relatório"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            ano_inteiro = st.checkbox("Ano inteiro", value=False, key="relatorio_ano_inteiro")
+        with col2:
+            meses_relatorio = st.multiselect(
+                "Meses", list(range(1, 13)), default=[mes],
+                format_func=lambda x: calendar.month_name[x],
+                disabled=ano_inteiro, key="relatorio_meses"
+            )
+        with col3:
+            formato = st.selectbox("Formato", list(relatorios.FORMATOS), key="relatorio_formato")
+        
+        meses_exportados = None if ano_inteiro else sorted(meses_relatorio)
+        parametros = (cliente, ano, None if meses_exportados is None else tuple(meses_exportados), formato)
+        
+        if st.button("Gerar Relatório"):
+            if meses_exportados == []:
+                st.warning("Selecione ao menos um mês ou marque ano inteiro.")
+            else:
+                try:
+                    with relatorios.gerar_relatorio(cliente, ano, meses_exportados, formato) as arquivo:
+                        conteudo = arquivo.read()
+                    # Guardado na sessão (apenas o último relatório) para que o botão de
+                    # download continue disponível nas próximas execuções da página
+                    st.session_state['relatorio_gerado'] = {
+                        'parametros': parametros,
+                        'nome': relatorios.nome_arquivo_relatorio(cliente, ano, meses_exportados, formato),
+                        'mime': relatorios.FORMATOS[formato][0],
+                        'conteudo': conteudo,
+                    }
+                except ImportError as e:
+                    st.error(str(e))
+                except Exception as e:
+                    st.error(f"Erro ao gerar relatório: {str(e)}")
+        
+        # Download do relatório gerado, enquanto as opções de exportação não mudarem
+        relatorio = st.session_state.get('relatorio_gerado')
+        if relatorio is not None and relatorio['parametros'] == parametros:
+            st.download_button(
+                label="Baixar Relatório",
+                data=relatorio['conteudo'],
+                file_name=relatorio['nome'],
+                mime=relatorio['mime'],
+            )
+    
+    # Seção para checklist de testes
+    st.header("Checklist de Testes")
+    st.markdown("Registre abaixo os resultados dos testes para cada dispositivo:")
+    
+    # Criar DataFrame para os resultados dos testes (apenas dispositivos planejados para o mês)
+    # já preenchido com os testes anteriores, se existirem
+    df_testes = pd.merge(
+        df_disp_mes[['id_disp', 'descricao']],
+        testes_anteriores[['id_disp', 'status', 'observacao']],
+        on='id_disp',
+        how='left'
+    )
+    df_testes[['status', 'observacao']] = df_testes[['status', 'observacao']].fillna('')
+    
+    # Tabela editável única: as edições só são enviadas ao clicar em salvar
+    with st.form(key=f"checklist_{cliente}_{mes}_{ano}"):
+        df_editado = st.data_editor(
+            df_testes,
+            column_config={
+                'id_disp': st.column_config.TextColumn("Dispositivo"),
+                'descricao': st.column_config.TextColumn("Descrição"),
+                'status': st.column_config.SelectboxColumn(
+                    "Status", options=["Teste OK", "Teste Não OK"]
+                ),
+                'observacao': st.column_config.TextColumn("Observação"),
+            },
+            disabled=['id_disp', 'descricao'],
+            hide_index=True,
+            use_container_width=True,
+        )
+        
+        # Botão para salvar os testes
+        enviado = st.form_submit_button("Salvar Resultados dos Testes")
+    
+    if enviado:
+        # Salvar apenas as linhas alteradas que têm status
+        df_editado[['status', 'observacao']] = df_editado[['status', 'observacao']].fillna('')
+        alterados = (df_editado[['status', 'observacao']] != df_testes[['status', 'observacao']]).any(axis=1)
+        df_para_salvar = df_editado[alterados & (df_editado['status'] != '')]
+        
+        if df_para_salvar.empty:
+            st.warning("Nenhum resultado de teste alterado para salvar.")
+        else:
+            sucesso = salvar_teste_dispositivos(cliente, mes, ano, df_para_salvar)
+            if sucesso:
+                # O relatório gerado antes da gravação ficou desatualizado
+                st.session_state.pop('relatorio_gerado', None)
+                st.success(f"{len(df_para_salvar)} resultados de testes salvos com sucesso!")
+            else:
+                st.error("Erro ao salvar os resultados dos testes.")
+    
+    # Seção de Ações Corretivas - mostra dispositivos com problemas
+    if not testes_anteriores.empty:
+        # Filtrar apenas os testes com problemas (status "Teste Não OK")
+        problemas = testes_anteriores[testes_anteriores['status'] == 'Teste Não OK']
+        
+        if not problemas.empty:
+            st.header("Ações Corretivas Necessárias")
+            st.warning(f"{len(problemas)} dispositivos requerem ações corretivas")
+            
+            # Variável para controlar se alguma ação foi salva
+            acoes_salvas = False
+            
+            for problema in problemas.itertuples(index=False):
+                id_disp = problema.id_disp
+                observacao = problema.observacao
+                
+                # Buscar descrição do dispositivo
+                descricao = catalogo_cliente.descricao(id_disp)
+                
+                # Exibir detalhes do problema
+                with st.expander(f"**{id_disp}** - {descricao}"):
+                    st.write(f"**Problema relatado:** {observacao}")
+                    
+                    # Campo para ação corretiva
+                    acao = st.text_area(
+                        f"Ação corretiva para {id_disp}", 
+                        key=f"acao_{id_disp}", 
+                        placeholder="Descreva a ação corretiva a ser tomada..."
+                    )
+                    
+                    # Opções para marcar resolução
+                    resolvido = st.checkbox("Problema resolvido", key=f"resolvido_{id_disp}")
+                    
+                    # Botão para salvar a ação corretiva no banco
+                    if st.button("Registrar Ação", key=f"btn_{id_disp}"):
+                        if not acao:
+                            st.error("Por favor, descreva a ação corretiva antes de registrar.")
+                        else:
+                            # Salvar no banco de dados
+                            salvo = salvar_acao_corretiva(
+                                cliente, mes, ano, id_disp, 
+                                observacao, acao, resolvido
+                            )
+                            
+                            if salvo:
+                                st.success(f"Ação corretiva registrada para {id_disp}")
+                                acoes_salvas = True
+                            else:
+                                st.error("Erro ao registrar ação corretiva")
+            
+            # Mostrar mensagem se ações foram salvas
+            if acoes_salvas:
+                st.success("Ações corretivas registradas com sucesso!")
+                
+    # Nota informativa sobre onde ver os resumos
+    st.info("Para visualizar o resumo completo dos testes e análise de saúde do sistema, acesse a página 'Saúde do Sistema' no menu lateral.")
@@ -0,0 +1,297 @@
+import streamlit as st
+import pandas as pd
+from datetime import datetime
+
+import db
+import planejamento
+
+def pagina_plano_manutencao(cliente):
+    st.subheader(f"Plano de Manutenção - {cliente}")
+    
+    # Data de referência do plano (ano otimizado e destaque do mês atual)
+    hoje = datetime.now()
+    
+    # Verificação do estado atual do plano (apenas no modo depuração)
+    if st.session_state.get('modo_depuracao'):
+        with st.expander("Informações de depuração do banco de dados"):
+            st.write("Estado do plano no banco de dados:")
+            st.json(db.verificar_estado_plano(cliente))
+    
+    # Buscar dados do banco de dados
+    df = db.buscar_pontos(cliente)
+    
+    if df.empty:
+        st.info(f"Nenhum dispositivo cadastrado para {cliente}. Use a página de Upload para adicionar.")
+        return
+    
+    # Filtrar excluindo dispositivos com action="ISO" e type="UNUSED"
+    # (o laço já vem decomposto do id_disp, gravado junto da lista de pontos)
+    df = df[(df['action'] != 'ISO') & (df['type'] != 'UNUSED')]
+    
+    # Definir meses
+    meses = [
+        "Janeiro", "Fevereiro", "Março", "Abril", 
+        "Maio", "Junho", "Julho", "Agosto", 
+        "Setembro", "Outubro", "Novembro", "Dezembro"
+    ]
+    
+    # Verificar se já existe um plano de manutenção
+    plano_existente = db.buscar_plano_manutencao(cliente)
+    
+    # Se existe, mesclar com os dados dos dispositivos
+    if not plano_existente.empty:
+        df = pd.merge(df, plano_existente[['id_disp', 'mes_manutencao']], on='id_disp', how='left')
+        
+    # Se não existe ou se faltam dispositivos, inicializamos com mês 0 (não definido)
+    if 'mes_manutencao' not in df.columns or df['mes_manutencao'].isnull().any():
+        if 'mes_manutencao' not in df.columns:
+            df['mes_manutencao'] = 0  # 0 significa não atribuído
+        else:
+            df['mes_manutencao'] = df['mes_manutencao'].fillna(0).astype(int)
+    
+    # Escolher estratégia de distribuição
+    st.subheader("Definir Plano de Manutenção")
+    
+    # Explicação
+    st.markdown("""
+    Escolha como você deseja distribuir os dispositivos ao longo do ano:
+    - **Mensal**: Divide os dispositivos igualmente entre os 12 meses (visitas mensais)
+    - **Trimestral**: Divide os dispositivos em 4 grupos (visitas a cada 3 meses)
+    - **Semestral**: Divide os dispositivos em 2 grupos (visitas a cada 6 meses)
+    - **Anual**: Todos os dispositivos serão testados em janeiro (uma visita por ano)
+    - **Otimizado**: Escolhe o mês de cada dispositivo respeitando a capacidade da equipe, a periodicidade de teste de cada tipo (vencimento desde o último teste) e o mínimo de visitas por laço
+    """)
+    
+    # Critério de balanceamento da distribuição
+    opcoes_balanceamento = {
+        "Manter laços juntos": None,
+        "Balancear por laço": 'laco',
+        "Balancear por tipo": 'type',
+    }
+    balanceamento = st.radio(
+        "Distribuição dos dispositivos entre os meses:",
+        list(opcoes_balanceamento),
+        horizontal=True,
+        help="Balancear divide cada laço (ou tipo) igualmente entre todos os meses de visita."
+    )
+    
+    # Parâmetros do plano otimizado
+    with st.expander("Parâmetros do plano otimizado"):
+        capacidade_horas = st.number_input(
+            "Horas de teste disponíveis por mês", min_value=1.0, value=40.0, step=1.0
+        )
+        horas_deslocamento = st.number_input(
+            "Custo de cada visita a um laço (horas)", min_value=0.0,
+            value=planejamento.HORAS_DESLOCAMENTO, step=0.5
+        )
+        
+        # Periodicidade por tipo presente na lista (padrão de planejamento.PERIODICIDADE_POR_TIPO)
+        tipos = sorted(df['type'].astype(str).str.strip().unique())
+        periodicidade = st.data_editor(
+            pd.DataFrame({
+                'type': tipos,
+                'meses': [planejamento.PERIODICIDADE_POR_TIPO.get(tipo, planejamento.PERIODICIDADE_PADRAO) for tipo in tipos],
+            }),
+            column_config={
+                'type': st.column_config.TextColumn("Tipo"),
+                'meses': st.column_config.NumberColumn(
+                    "Meses entre testes", min_value=1, max_value=60, step=1, required=True
+                ),
+            },
+            disabled=['type'],
+            hide_index=True,
+            key=f"periodicidade_{cliente}",
+        )
+        periodicidade_por_tipo = dict(zip(periodicidade['type'], periodicidade['meses'].astype(int)))
+    
+    # Botões para selecionar estratégia - lado a lado
+    col1, col2, col3, col4, col5 = st.columns(5)
+    
+    estrategia = None
+    with col1:
+        if st.button("Mensal", use_container_width=True):
+            estrategia = "Mensal"
+    with col2:
+        if st.button("Trimestral", use_container_width=True):
+            estrategia = "Trimestral"
+    with col3:
+        if st.button("Semestral", use_container_width=True):
+            estrategia = "Semestral"
+    with col4:
+        if st.button("Anual", use_container_width=True):
+            estrategia = "Anual"
+    with col5:
+        if st.button("Otimizado", use_container_width=True):
+            estrategia = "Otimizado"
+    
+    # Botão para aplicar distribuição
+    if estrategia:
+        st.write(f"Estratégia selecionada: **{estrategia}**")
+        
+        df = df.sort_values(['laco', 'id_disp'])
+        if estrategia == "Otimizado":
+            # Otimizar considerando capacidade, vencimentos e deslocamento entre laços
+            df['mes_manutencao'], resumo = planejamento.otimizar_plano(
+                df,
+                capacidade_horas=capacidade_horas,
+                ultimos_testes=db.buscar_ultimos_testes(cliente),
+                ano=hoje.year,
+                periodicidade_por_tipo=periodicidade_por_tipo,
+                horas_deslocamento=horas_deslocamento
+            )
+            
+            col_visitas, col_excesso, col_atraso = st.columns(3)
+            col_visitas.metric("Visitas a laços", resumo['visitas'])
+            col_excesso.metric("Horas acima da capacidade", resumo['excesso_horas'])
+            col_atraso.metric("Meses de atraso (soma)", resumo['atraso_meses'])
+        else:
+            # Determinar meses de acordo com a estratégia
+            meses_disponiveis = planejamento.MESES_POR_ESTRATEGIA[estrategia]
+            
+            # Distribuir igualmente (ordenando por laço para manter dispositivos do mesmo laço juntos)
+            df['mes_manutencao'] = planejamento.distribuir_meses(
+                df, meses_disponiveis, balancear_por=opcoes_balanceamento[balanceamento]
+            )
+        
+        # Mensagem de sucesso
+        st.success(f"Dispositivos distribuídos conforme estratégia {estrategia}!")
+        
+        # SALVAR AUTOMATICAMENTE APÓS DISTRIBUIÇÃO
+        df_para_salvar = df[df['mes_manutencao'] > 0][['id_disp', 'mes_manutencao']]
+        if not df_para_salvar.empty:
+            try:
+                resultado = db.salvar_plano_manutencao(cliente, df_para_salvar)
+                if resultado:
+                    st.session_state['plano_salvo'] = True
+                    st.success("Plano de manutenção salvo automaticamente no banco de dados!")
+                else:
+                    st.error("Erro ao salvar o plano automaticamente.")
+            except Exception as e:
+                st.error(f"Erro ao salvar plano: {str(e)}")
+    
+    st.subheader("Dispositivos por Mês")
+    
+    # Criar abas para cada mês
+    if 'mes_manutencao' in df.columns:
+        tabs = st.tabs(meses)
+        
+        for i, mes_nome in enumerate(meses):
+            mes_numero = i + 1
+            with tabs[i]:
+                # Destaque visual para o mês atual
+                mes_atual = hoje.month
+                if mes_numero == mes_atual:
+                    st.markdown(f"## {mes_nome} (Mês Atual)")
+                else:
+                    st.markdown(f"## {mes_nome}")
+                    
+                df_mes = df[df['mes_manutencao'] == mes_numero]
+                
+                if not df_mes.empty:
+                    st.markdown(f"### {len(df_mes)} dispositivos para testar em {mes_nome}")
+                    
+                    # Mostrar dispositivos
+                    st.dataframe(df_mes[['id_disp', 'type', 'action', 'description', 'laco']])
+                    
+                    # Mostrar distribuição por laço
+                    st.subheader("Dispositivos por Laço")
+                    contagem_laco = df_mes['laco'].value_counts()
+                    st.bar_chart(contagem_laco[contagem_laco > 0])
+                else:
+                    st.info(f"Nenhum dispositivo programado para {mes_nome}")
+             
+    # Opções de configuração manual
+    st.markdown("---")
+    st.subheader("Ajustes Manuais")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("### Selecionar dispositivos")
+        
+        # Filtro para seleção de dispositivos
+        lacos_unicos = sorted(df['laco'].unique())
+        laco_selecionado = st.multiselect("Selecionar por Laço:", lacos_unicos)
+        
+        # Filtrar apenas os dispositivos do laço selecionado
+        df_ajuste = df.copy()
+        if laco_selecionado:
+            df_ajuste = df_ajuste[df_ajuste['laco'].isin(laco_selecionado)]
+        
+        # Seleção de tipo de dispositivo
+        tipos_unicos = sorted(df_ajuste['type'].unique())
+        tipo_selecionado = st.multiselect("Selecionar por Tipo:", tipos_unicos)
+        
+        # Filtrar por tipo selecionado
+        if tipo_selecionado:
+            df_ajuste = df_ajuste[df_ajuste['type'].isin(tipo_selecionado)]
+        
+        # Exibir quantidade de dispositivos selecionados
+        st.info(f"Selecionados: {len(df_ajuste)} dispositivos")
+        
+        # Selecionar mês para atribuir
+        mes_para_atribuir = st.selectbox(
+            "Mês para manutenção:", 
+            range(len(meses)),
+            format_func=lambda i: meses[i]
+        ) + 1  # Ajuste para 1-12
+        
+        # Botão para aplicar
+        if st.button("Atribuir mês aos dispositivos selecionados"):
+            df.loc[df_ajuste.index, 'mes_manutencao'] = mes_para_atribuir
+            
+            st.success(f"{len(df_ajuste)} dispositivos atribuídos para manutenção em {meses[mes_para_atribuir-1]}! Você pode verificar nas abas acima.")
+    
+    with col2:
+        st.markdown("### Visão geral do plano")
+        
+        # Calcular distribuição por mês
+        contagem_por_mes = df['mes_manutencao'].value_counts().sort_index()
+        contagem_por_mes = contagem_por_mes[contagem_por_mes.index != 0]  # Excluir não atribuídos
+        if not contagem_por_mes.empty:
+            # Criar DataFrame para o gráfico
+            meses_df = pd.DataFrame({
+                'Mês': [meses[i-1] for i in contagem_por_mes.index],
+                'Quantidade': contagem_por_mes.values
+            })
+            # Exibir gráfico
+            st.bar_chart(meses_df.set_index('Mês'))
+            
+            # Mostrar quantos dispositivos não têm mês atribuído
+            nao_atribuidos = len(df[df['mes_manutencao'] == 0])
+            if nao_atribuidos > 0:
+                st.warning(f"{nao_atribuidos} dispositivos ainda não têm mês de manutenção atribuído.")
+        else:
+            st.info("Nenhum dispositivo tem mês de manutenção atribuído ainda.")
+        
+        # Resumo da distribuição
+        st.markdown("### Resumo da distribuição:")
+        for i, mes_nome in enumerate(meses):
+            mes_numero = i + 1
+            qtd = contagem_por_mes.get(mes_numero, 0)
+            if qtd > 0:
+                st.markdown(f"**{mes_nome}:** {qtd} dispositivos")
+        
+        # Salvar o plano de manutenção no banco
+        if st.button("Salvar Plano de Manutenção"):
+            # Preparar DataFrame para salvar
+            # Filtrar dispositivos com mês atribuído
+            df_para_salvar = df[df['mes_manutencao'] > 0][['id_disp', 'mes_manutencao']]
+            
+            if df_para_salvar.empty:
+                st.error("Nenhum dispositivo tem mês de manutenção atribuído. Distribua os dispositivos primeiro.")
+                return
+            
+            # Debug: mostrar o que está sendo salvo
+            with st.expander("Dados a serem salvos"):
+                st.dataframe(df_para_salvar)
+            
+            # Salvar no banco
+            resultado = db.salvar_plano_manutencao(cliente, df_para_salvar)
+            
+            if resultado:
+                # Force um refresh após salvar
+                st.session_state['plano_salvo'] = True
+                st.success("Plano de manutenção salvo com sucesso!")
+            else:
+                st.error("Erro ao salvar o plano de manutenção.")
@@ -0,0 +1,185 @@
+import streamlit as st
+import pandas as pd
+import calendar
+from datetime import datetime
+import plotly.express as px
+
+import catalogo
+from db import buscar_manutencao_anual, buscar_testes_dispositivos, buscar_acoes_corretivas
+
+def pagina_saude_sistema(cliente):
+    st.title("Saúde do Sistema")
+    st.subheader(f"Cliente: {cliente}")
+    
+    # Seletor de mês e ano
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        ano = st.selectbox("Ano", list(range(datetime.now().year - 2, datetime.now().year + 1)))
+    with col2:
+        mostrar_mes_especifico = st.checkbox("Filtrar por mês específico", value=False)
+    
+    mes = None
+    if mostrar_mes_especifico:
+        with col3:
+            mes = st.selectbox("Mês", list(range(1, 13)), format_func=lambda x: calendar.month_name[x])
+    
+    # Buscar dispositivos planejados para todo o ANO
+    dispositivos_planejados_ano = buscar_manutencao_anual(cliente, ano)
+    
+    # Filtrar por mês se solicitado
+    if mostrar_mes_especifico and mes is not None:
+        dispositivos_planejados = [d for d in dispositivos_planejados_ano if d['mes'] == mes]
+        # Buscar testes apenas do mês selecionado
+        testes_anteriores = buscar_testes_dispositivos(cliente, mes, ano)
+    else:
+        dispositivos_planejados = dispositivos_planejados_ano
+        # Para testes de todos os meses, combinamos os resultados de cada mês
+        testes_anteriores = pd.concat(
+            [buscar_testes_dispositivos(cliente, m, ano) for m in range(1, 13)],
+            ignore_index=True
+        )
+    
+    # Buscar ações corretivas
+    if mostrar_mes_especifico and mes is not None:
+        acoes_corretivas = buscar_acoes_corretivas(cliente, mes, ano)
+    else:
+        acoes_corretivas = buscar_acoes_corretivas(cliente, None, ano)
+    
+    # RESUMO GERAL
+    st.header(f"Resumo do Sistema - {ano}" + (f" - {calendar.month_name[mes]}" if mostrar_mes_especifico and mes else ""))
+    
+    # Total de dispositivos planejados para o ano/mês
+    total_dispositivos_planejados = len(dispositivos_planejados)
+    
+    # Se não há dispositivos planejados
+    if total_dispositivos_planejados == 0:
+        st.warning(f"Não há dispositivos planejados para manutenção" + 
+                  (f" em {calendar.month_name[mes]}" if mostrar_mes_especifico and mes else " neste ano"))
+        return
+    
+    # Calcular métricas dos testes
+    if not testes_anteriores.empty:
+        df_testes = testes_anteriores
+        
+        # Calcular métricas
+        testes_realizados = len(df_testes)
+        testes_ok = len(df_testes[df_testes['status'] == 'Teste OK'])
+        testes_nok = len(df_testes[df_testes['status'] == 'Teste Não OK'])
+    else:
+        testes_realizados = 0
+        testes_ok = 0
+        testes_nok = 0
+    
+    # Métricas de ações corretivas
+    acoes_total = len(acoes_corretivas)
+    acoes_resolvidas = int(acoes_corretivas['resolvido'].sum())
+    acoes_pendentes = acoes_total - acoes_resolvidas
+    
+    # Exibir métricas
+    col1, col2, col3, col4, col5 = st.columns(5)
+    with col1:
+        st.metric("Dispositivos Planejados", total_dispositivos_planejados)
+    with col2:
+        st.metric("Testes Realizados", testes_realizados)
+    with col3:
+        st.metric("Testes OK", testes_ok)
+    with col4:
+        st.metric("Testes Não OK", testes_nok)
+    with col5:
+        st.metric("Ações Pendentes", acoes_pendentes)
+    
+    # Gráfico de pizza para visualizar os resultados dos testes
+    if testes_realizados > 0 and total_dispositivos_planejados > 0:
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.subheader("Distribuição dos Testes")
+            data = {
+                'Status': ['Teste OK', 'Teste Não OK', 'Não Testados'],
+                'Quantidade': [testes_ok, testes_nok, total_dispositivos_planejados - testes_realizados]
+            }
+            df_grafico = pd.DataFrame(data)
+            fig = px.pie(df_grafico, names='Status', values='Quantidade', 
+                        color='Status', 
+                        color_discrete_map={
+                            'Teste OK': 'green',
+                            'Teste Não OK': 'red',
+                            'Não Testados': 'gray'
+                        })
+            fig.update_traces(textposition='inside', textinfo='percent+label')
+            st.plotly_chart(fig, use_container_width=True)
+        
+        # Gráfico para ações corretivas
+        if acoes_total > 0:
+            with col2:
+                st.subheader("Status das Ações Corretivas")
+                data = {
+                    'Status': ['Resolvidas', 'Pendentes'],
+                    'Quantidade': [acoes_resolvidas, acoes_pendentes]
+                }
+                df_grafico = pd.DataFrame(data)
+                fig = px.pie(df_grafico, names='Status', values='Quantidade', 
+                            color='Status', 
+                            color_discrete_map={
+                                'Resolvidas': 'green',
+                                'Pendentes': 'orange'
+                            })
+                fig.update_traces(textposition='inside', textinfo='percent+label')
+                st.plotly_chart(fig, use_container_width=True)
+    
+    # DISTRIBUIÇÃO POR MÊS
+    if not mostrar_mes_especifico:
+        st.header("Distribuição Mensal de Manutenções")
+        
+        # Contar dispositivos por mês
+        dispositivos_por_mes = {}
+        for disp in dispositivos_planejados_ano:
+            mes = disp['mes']
+            if mes not in dispositivos_por_mes:
+                dispositivos_por_mes[mes] = 0
+            dispositivos_por_mes[mes] += 1
+        
+        # Criar DataFrame para gráfico
+        meses_df = []
+        for m in range(1, 13):
+            total_mes = dispositivos_por_mes.get(m, 0)
+            if total_mes > 0:
+                meses_df.append({
+                    'Mês': calendar.month_name[m],
+                    'Dispositivos': total_mes
+                })
+        
+        if meses_df:
+            df_meses = pd.DataFrame(meses_df)
+            fig = px.bar(df_meses, x='Mês', y='Dispositivos', 
+                        title="Dispositivos para manutenção por mês",
+                        color='Dispositivos')
+            st.plotly_chart(fig, use_container_width=True)
+    
+    # AÇÕES CORRETIVAS
+    if not acoes_corretivas.empty:
+        st.header("Histórico de Ações Corretivas")
+        
+        # Juntar as descrições dos dispositivos pelo catálogo do cliente
+        df_acoes = catalogo.obter_catalogo(cliente).juntar(acoes_corretivas, colunas=['descricao'])
+        df_acoes['descricao'] = df_acoes['descricao'].fillna('Dispositivo')
+        
+        # Formatar data de registro
+        if 'data_registro' in df_acoes.columns:
+            df_acoes['data_registro'] = pd.to_datetime(df_acoes['data_registro'])
+            df_acoes['data_formatada'] = df_acoes['data_registro'].dt.strftime('%d/%m/%Y %H:%M')
+        
+        # Mostrar em formato expandido
+        for acao in df_acoes.itertuples(index=False):
+            resolvido_status = "✅ Resolvido" if acao.resolvido else "⏳ Pendente"
+            with st.expander(f"**{acao.id_disp}** - {acao.descricao} ({resolvido_status})"):
+                st.write(f"**Problema:** {acao.descricao_problema}")
+                st.write(f"**Ação Corretiva:** {acao.acao_corretiva}")
+                st.write(f"**Data:** {getattr(acao, 'data_formatada', 'N/A')}")
+                st.write(f"**Mês/Ano:** {calendar.month_name[acao.mes]}/{acao.ano}")
+    else:
+        st.info("Não há ações corretivas registradas para este período")
+    
+    # Visão histórica (gráfico de tendência)
+    st.header("Histórico de Manutenção")
+    st.info("Histórico de manutenção em desenvolvimento")
@@ -0,0 +1,106 @@
+import streamlit as st
+import pandas as pd
+
+import db
+import processamento
+
+def pagina_upload(cliente):
+    st.subheader(f"Upload de Dados - {cliente}")
+    st.write("Escolha o tipo de arquivo para upload:")
+    
+    # Criar abas para os diferentes tipos de upload
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["TrueService", "TrueAlarm", "Dispositivos", "Histórico Geral", "Leituras"])
+    
+    with tab1:
+        st.markdown("### Log TrueService")
+        arquivo_ts = st.file_uploader("Upload .csv/.txt (TrueService)", type=["csv", "txt"], key="ts")
+        if arquivo_ts:
+            df_ts = pd.read_csv(arquivo_ts, sep=None, engine='python')
+            st.dataframe(df_ts.head())
+            if st.button("Salvar TrueService no banco", key="save_ts"):
+                st.success("Dados TrueService salvos! (simulado)")
+    
+    with tab2:
+        st.markdown("### Log TrueAlarm")
+        arquivo_ta = st.file_uploader("Upload .csv/.txt (TrueAlarm)", type=["csv", "txt"], key="ta")
+        if arquivo_ta:
+            df_ta = pd.read_csv(arquivo_ta, sep=None, engine='python')
+            st.dataframe(df_ta.head())
+            if st.button("Salvar TrueAlarm no banco", key="save_ta"):
+                st.success("Dados TrueAlarm salvos! (simulado)")
+    
+    with tab3:
+        st.markdown("### Lista de Dispositivos")
+        arquivo_disp = st.file_uploader("Upload .csv/.txt (Lista de Dispositivos)", type=["csv", "txt"], key="disp")
+        if arquivo_disp:
+            try:
+                # Processar arquivo com função específica para lista de pontos
+                df_processado, linhas_invalidas = processamento.ler_lista_pontos(arquivo_disp)
+                
+                # Mostrar dados processados
+                st.success(f"Arquivo processado com sucesso! Todos os {len(df_processado)} dispositivos foram carregados, incluindo UNUSED.")
+                if not linhas_invalidas.empty:
+                    st.warning(f"{len(linhas_invalidas)} linhas do arquivo estão fora do formato esperado (id_disp;type;action;description).")
+                    with st.expander("Ver linhas inválidas"):
+                        st.dataframe(linhas_invalidas, hide_index=True)
+                st.dataframe(df_processado)
+                
+                # Adicionar análises
+                if not df_processado.empty:
+                    # Enriquecer dados
+                    df_enriquecido = processamento.enriquecer_dados(df_processado)
+                    
+                    # Mostrar distribuição por tipo
+                    st.subheader("Distribuição por Tipo")
+                    contagem_tipo = df_processado['type'].value_counts()
+                    st.bar_chart(contagem_tipo)
+                
+                # Botão para salvar no banco
+                if st.button("Salvar no banco", key="save_disp"):
+                    try:
+                        # Salvar no banco (apenas as diferenças em relação à lista gravada)
+                        resumo = db.salvar_pontos(cliente, df_processado)
+                        st.success(f"Dados salvos com sucesso na tabela lista_de_pontos para o cliente {cliente}!")
+                        st.write(
+                            f"{resumo['inseridos']} inseridos, {resumo['atualizados']} atualizados, "
+                            f"{resumo['removidos']} removidos, {resumo['inalterados']} sem alteração"
+                        )
+                    except Exception as e:
+                        st.error(f"Erro ao salvar dados: {str(e)}")
+            except Exception as e:
+                st.error(f"Erro ao processar arquivo: {str(e)}")
+    
+    with tab4:
+        st.markdown("### Histórico Geral")
+        arquivo_hist = st.file_uploader("Upload .csv/.txt (Histórico Geral)", type=["csv", "txt"], key="hist")
+        if arquivo_hist:
+            df_hist = pd.read_csv(arquivo_hist, sep=None, engine='python')
+            st.dataframe(df_hist.head())
+            if st.button("Salvar Histórico Geral no banco", key="save_hist"):
+                st.success("Dados de Histórico Geral salvos! (simulado)")
+    
+    with tab5:
+        st.markdown("### Leituras dos Dispositivos")
+        st.caption("Arquivo separado por ';' com as colunas id_disp;datahora;valor;bateria;sinal "
+                   "(data e hora AAAA-MM-DD HH:MM:SS ou DD/MM/AAAA HH:MM:SS).")
+        arquivo_leituras = st.file_uploader("Upload .csv/.txt (Leituras)", type=["csv", "txt"], key="leituras")
+        if arquivo_leituras:
+            try:
+                df_leituras, linhas_invalidas = processamento.ler_leituras(arquivo_leituras)
+                
+                st.success(f"{len(df_leituras)} leituras de {df_leituras['id_disp'].nunique()} dispositivos carregadas.")
+                if not linhas_invalidas.empty:
+                    st.warning(f"{len(linhas_invalidas)} linhas do arquivo foram descartadas.")
+                    with st.expander("Ver linhas inválidas"):
+                        st.dataframe(linhas_invalidas, hide_index=True)
+                st.dataframe(df_leituras.head(100))
+                
+                # Leituras repetidas (mesmo dispositivo e data e hora) substituem as gravadas
+                if st.button("Salvar leituras no banco", key="save_leituras"):
+                    try:
+                        gravadas = db.salvar_leituras(cliente, df_leituras)
+                        st.success(f"{gravadas} leituras salvas para o cliente {cliente}!")
+                    except Exception as e:
+                        st.error(f"Erro ao salvar leituras: {str(e)}")
+            except Exception as e:
+                st.error(f"Erro ao processar arquivo: {str(e)}")
@@ -0,0 +1,89 @@
+import streamlit as st
+import pandas as pd
+import calendar
+from datetime import datetime
+import plotly.express as px
+
+import db
+
+def pagina_visao_frota(cliente):
+    st.title("Visão da Frota")
+    # A visão reúne todos os clientes, independente do selecionado no menu
+    st.subheader("Todos os clientes")
+    
+    ano_atual = datetime.now().year
+    ano = st.selectbox("Ano", list(range(ano_atual - 2, ano_atual + 1)), index=2, key='ano_frota')
+    
+    # Resumos materializados no banco: poucas leituras já agregadas, qualquer que seja o número de clientes
+    dispositivos = db.buscar_resumo_dispositivos()
+    manutencao = db.buscar_resumo_manutencao(None, ano)
+    acoes = db.buscar_resumo_acoes()
+    
+    if dispositivos.empty and manutencao.empty and acoes.empty:
+        st.info("Nenhum cliente com dados gravados ainda.")
+        return
+    
+    # Uma linha por cliente
+    por_cliente = pd.concat([
+        dispositivos.groupby('cliente')['dispositivos'].sum(),
+        manutencao.groupby('cliente')[['planejados', 'testados', 'falhas']].sum(),
+        acoes.set_index('cliente')['abertas'],
+    ], axis=1).fillna(0).astype(int)
+    total = por_cliente.sum()
+    por_cliente['% testado'] = (
+        100 * por_cliente['testados'] / por_cliente['planejados'].where(por_cliente['planejados'] > 0)
+    ).round(1)
+    
+    # Métricas da frota
+    percentual = 100 * total['testados'] / total['planejados'] if total['planejados'] else 0
+    col1, col2, col3, col4, col5 = st.columns(5)
+    with col1:
+        st.metric("Clientes", len(por_cliente))
+    with col2:
+        st.metric("Dispositivos", int(total['dispositivos']))
+    with col3:
+        st.metric("Testes Realizados", f"{percentual:.1f}%")
+    with col4:
+        st.metric("Testes Não OK", int(total['falhas']))
+    with col5:
+        st.metric("Ações Pendentes", int(total['abertas']))
+    
+    st.dataframe(
+        por_cliente.rename(columns={
+            'dispositivos': 'Dispositivos',
+            'planejados': 'Planejados',
+            'testados': 'Testados',
+            'falhas': 'Testes Não OK',
+            'abertas': 'Ações Pendentes',
+        }),
+        use_container_width=True
+    )
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("Planejados x Testados por Mês")
+        por_mes = manutencao.groupby('mes')[['planejados', 'testados', 'falhas']].sum().reindex(range(1, 13), fill_value=0)
+        por_mes.index = [calendar.month_name[m] for m in por_mes.index]
+        df_grafico = por_mes.rename(columns={
+            'planejados': 'Planejados',
+            'testados': 'Testados',
+            'falhas': 'Testes Não OK',
+        }).rename_axis('Mês').reset_index().melt(id_vars='Mês', var_name='Situação', value_name='Dispositivos')
+        fig = px.bar(df_grafico, x='Mês', y='Dispositivos', color='Situação', barmode='group',
+                    color_discrete_map={'Planejados': 'gray', 'Testados': 'green', 'Testes Não OK': 'red'})
+        st.plotly_chart(fig, use_container_width=True)
+    
+    with col2:
+        st.subheader("Dispositivos por Tipo")
+        df_grafico = dispositivos.groupby(['cliente', 'type'], observed=True)['dispositivos'].sum().reset_index()
+        fig = px.bar(df_grafico, x='cliente', y='dispositivos', color='type',
+                    labels={'cliente': 'Cliente', 'dispositivos': 'Dispositivos', 'type': 'Tipo'})
+        st.plotly_chart(fig, use_container_width=True)
+    
+    # Laços de cada cliente
+    with st.expander("Dispositivos por laço"):
+        por_laco = dispositivos.pivot_table(
+            index='cliente', columns='laco', values='dispositivos', aggfunc='sum', fill_value=0, observed=True
+        )
+        st.dataframe(por_laco, use_container_width=True)
@@ -0,0 +1,484 @@
+import datetime
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+# Meses de visita de cada estratégia de distribuição do plano de manutenção
+MESES_POR_ESTRATEGIA = {
+    'Mensal': list(range(1, 13)),       # 1 a 12
+    'Trimestral': [1, 4, 7, 10],        # Jan, Abr, Jul, Out
+    'Semestral': [1, 7],                # Jan, Jul
+    'Anual': [1],                       # Janeiro
+}
+
+def distribuir_meses(df, meses, balancear_por=None):
+    """
+    Distribui os dispositivos igualmente entre os meses informados
+    
+    Os dispositivos são ordenados por laço e id_disp e divididos em blocos
+    contíguos, um por mês: os primeiros meses recebem um dispositivo a mais
+    quando a divisão não é exata. Todo o cálculo é feito com operações de
+    array sobre as cotas acumuladas de cada mês, sem laços por linha.
+    
+    Com balancear_por, cada grupo (ex.: 'laco' ou 'type') é dividido entre todos
+    os meses separadamente. As sobras de cada grupo são rotacionadas entre os
+    meses, então tanto o total do mês quanto a parte de cada grupo diferem em no
+    máximo um dispositivo.
+    
+    Parâmetros:
+    df (DataFrame): Dispositivos com as colunas id_disp e laco (e a coluna de balanceamento)
+    meses (list): Meses disponíveis para visita (1-12)
+    balancear_por (str, opcional): Coluna usada para balancear os grupos entre os meses
+    
+    Retorna:
+    Series: Mês de manutenção de cada dispositivo, alinhada ao índice de df
+    """
+    meses = np.asarray(meses, dtype='int64')
+    total = len(df)
+    if total == 0:
+        return pd.Series(np.zeros(0, dtype='int64'), index=df.index, name='mes_manutencao')
+    
+    quantidade_meses = len(meses)
+    
+    # Ordenar por (grupo, laço, id_disp); sem balanceamento há um único grupo
+    chaves_ordem = [df['id_disp'].astype(str).to_numpy(), df['laco'].astype(str).to_numpy()]
+    if balancear_por is not None:
+        chaves_ordem.append(df[balancear_por].astype(str).to_numpy())
+    ordem = np.lexsort(chaves_ordem)
+    
+    if balancear_por is not None:
+        grupos = chaves_ordem[-1][ordem]
+        inicio_grupo = np.flatnonzero(np.r_[True, grupos[1:] != grupos[:-1]])
+    else:
+        inicio_grupo = np.array([0])
+    tamanho_grupo = np.diff(np.r_[inicio_grupo, total])
+    
+    # Cotas de cada grupo: 'base' dispositivos por mês e 'extras' meses com um a mais
+    base, extras = np.divmod(tamanho_grupo, quantidade_meses)
+    # As sobras de cada grupo começam onde terminaram as do grupo anterior
+    deslocamento = np.r_[0, np.cumsum(extras)[:-1]] % quantidade_meses
+    
+    # Posição de cada dispositivo dentro do seu grupo, já na ordem final
+    posicao = np.arange(total) - np.repeat(inicio_grupo, tamanho_grupo)
+    base_disp = np.repeat(base, tamanho_grupo)
+    extras_disp = np.repeat(extras, tamanho_grupo)
+    
+    # Índice do bloco (mês relativo) pela posição nas cotas acumuladas:
+    # os 'extras' primeiros blocos têm base + 1 dispositivos, os demais têm base
+    limite_extras = extras_disp * (base_disp + 1)
+    bloco = np.where(
+        posicao < limite_extras,
+        posicao // (base_disp + 1),
+        extras_disp + (posicao - limite_extras) // np.maximum(base_disp, 1)
+    )
+    indice_mes = (bloco + np.repeat(deslocamento, tamanho_grupo)) % quantidade_meses
+    
+    resultado = np.empty(total, dtype='int64')
+    resultado[ordem] = meses[indice_mes]
+    return pd.Series(resultado, index=df.index, name='mes_manutencao')
+
+# Tempo médio de teste em campo (horas) por tipo de dispositivo
+HORAS_POR_TIPO = {
+    'PHOTO': 0.25,
+    'MPHOTO': 0.25,
+    'HEAT': 0.25,
+    'MHEAT': 0.25,
+    'COMBO': 0.33,
+    'ADRPUL': 0.17,
+    'MARCOR': 0.17,
+    'IAM': 0.33,
+    'MBZAM': 0.33,
+    'ISO': 0.17,
+    'IDNETISO': 0.17,
+    'UNUSED': 0.0,
+}
+HORAS_PADRAO = 0.25
+
+# Intervalo máximo (meses) entre dois testes do mesmo dispositivo, por tipo: teste
+# funcional anual de detectores, acionadores manuais e isoladores, e semestral dos
+# módulos de monitoração, que costumam supervisionar chaves de fluxo e de válvula
+# (NFPA 72, tabela 14.4.3.2; ABNT NBR 17240). A página do plano permite ajustar os
+# valores ao contrato de cada cliente. O plano tem um mês por dispositivo, então um
+# intervalo menor que 12 meses define apenas o prazo do primeiro teste do ano.
+PERIODICIDADE_POR_TIPO = {
+    'PHOTO': 12,
+    'MPHOTO': 12,
+    'HEAT': 12,
+    'MHEAT': 12,
+    'COMBO': 12,
+    'ADRPUL': 12,
+    'MARCOR': 12,
+    'IAM': 6,
+    'MBZAM': 6,
+    'ISO': 12,
+    'IDNETISO': 12,
+}
+PERIODICIDADE_PADRAO = 12
+
+# Pesos da função de custo do plano otimizado (em horas equivalentes)
+HORAS_DESLOCAMENTO = 1.5    # Cada visita a um laço em um mês
+PESO_EXCESSO = 10.0         # Cada hora acima da capacidade da equipe no mês
+PESO_ATRASO = 0.5           # Cada mês que um dispositivo fica além do vencimento
+
+def _preparar_modelo(df, capacidade_horas, ultimos_testes, ano, horas_por_tipo, periodicidade_por_tipo):
+    """
+    Converte os dispositivos em arrays para o otimizador
+    
+    Os dispositivos ficam na ordem (laço, id_disp). O prazo de cada dispositivo é
+    o mês do ano do plano em que vence o intervalo desde o último teste; sem
+    histórico de testes não há prazo dentro do ano.
+    """
+    horas_por_tipo = HORAS_POR_TIPO if horas_por_tipo is None else horas_por_tipo
+    periodicidade_por_tipo = PERIODICIDADE_POR_TIPO if periodicidade_por_tipo is None else periodicidade_por_tipo
+    ano = datetime.date.today().year if ano is None else ano
+    
+    ordem = np.lexsort([df['id_disp'].astype(str).to_numpy(), df['laco'].astype(str).to_numpy()])
+    dados = df.iloc[ordem]
+    tipos = dados['type'].astype(str).str.strip()
+    
+    codigos_laco, lacos = pd.factorize(dados['laco'].astype(str))
+    horas = tipos.map(horas_por_tipo).fillna(HORAS_PADRAO).to_numpy(dtype='float64')
+    periodicidade = tipos.map(periodicidade_por_tipo).fillna(PERIODICIDADE_PADRAO).to_numpy(dtype='float64')
+    
+    prazo = np.full(len(dados), np.inf)
+    if ultimos_testes is not None and not ultimos_testes.empty:
+        periodo_teste = ultimos_testes['ano'] * 12 + ultimos_testes['mes'] - 1
+        ultimo = dados['id_disp'].map(pd.Series(periodo_teste.to_numpy(), index=ultimos_testes['id_disp']))
+        vencimento = ultimo.to_numpy(dtype='float64') + periodicidade
+        prazo = np.where(np.isnan(vencimento), np.inf, vencimento - ano * 12 + 1)
+    
+    # Meses de atraso de cada dispositivo em cada mês do ano (linhas x 12)
+    atraso = np.maximum(0.0, np.arange(1, 13)[None, :] - prazo[:, None])
+    
+    if isinstance(capacidade_horas, dict):
+        capacidade = np.array([capacidade_horas.get(mes, 0.0) for mes in range(1, 13)], dtype='float64')
+    else:
+        capacidade = np.full(12, float(capacidade_horas))
+    
+    return {
+        'indice': dados.index,
+        'prazo': prazo,
+        'laco': codigos_laco,
+        'quantidade_lacos': len(lacos),
+        'horas': horas,
+        'atraso': atraso,
+        'capacidade': capacidade,
+    }
+
+def _avaliar(modelo, indice_mes, horas_deslocamento):
+    """Calcula os componentes do custo de um plano (indice_mes de 0 a 11 por dispositivo)"""
+    carga = np.bincount(indice_mes, weights=modelo['horas'], minlength=12)
+    excesso = np.maximum(0.0, carga - modelo['capacidade']).sum()
+    visitas = len(np.unique(modelo['laco'] * 12 + indice_mes))
+    atraso = modelo['atraso'][np.arange(len(indice_mes)), indice_mes].sum()
+    return {
+        'custo': round(float(horas_deslocamento * visitas + PESO_EXCESSO * excesso + PESO_ATRASO * atraso), 2),
+        'visitas': int(visitas),
+        'excesso_horas': round(float(excesso), 2),
+        'atraso_meses': round(float(atraso), 2),
+        'carga_por_mes': {mes + 1: round(float(carga[mes]), 2) for mes in range(12) if carga[mes] > 0},
+    }
+
+def avaliar_plano(df, mes_manutencao, capacidade_horas=40.0, ultimos_testes=None, ano=None,
+                  horas_por_tipo=None, periodicidade_por_tipo=None, horas_deslocamento=HORAS_DESLOCAMENTO):
+    """
+    Calcula o custo de um plano de manutenção já definido
+    
+    Usa a mesma função de custo de otimizar_plano, permitindo comparar o plano
+    otimizado com a distribuição igualitária. Dispositivos sem mês (0) são ignorados.
+    
+    Parâmetros:
+    df (DataFrame): Dispositivos com as colunas id_disp, type e laco
+    mes_manutencao (Series): Mês de cada dispositivo, alinhado ao índice de df
+    (demais parâmetros como em otimizar_plano)
+    
+    Retorna:
+    dict: custo, visitas, excesso_horas, atraso_meses e carga_por_mes
+    """
+    mes_manutencao = mes_manutencao.reindex(df.index).fillna(0)
+    atribuidos = mes_manutencao.to_numpy() > 0
+    modelo = _preparar_modelo(df[atribuidos], capacidade_horas, ultimos_testes, ano, horas_por_tipo, periodicidade_por_tipo)
+    indice_mes = mes_manutencao.loc[modelo['indice']].to_numpy(dtype='int64') - 1
+    return _avaliar(modelo, indice_mes, horas_deslocamento)
+
+def _plano_guloso(modelo, permitidos):
+    """
+    Solução inicial: cada laço vai inteiro para o mês de menor custo em que cabe
+    
+    Laços com prazo mais cedo (e depois os mais pesados) escolhem primeiro. Quando
+    um laço não cabe em nenhum mês, ele é dividido em trechos contíguos que
+    preenchem os meses com mais capacidade livre.
+    """
+    horas = modelo['horas']
+    capacidade = modelo['capacidade']
+    carga = np.zeros(12)
+    indice_mes = np.zeros(len(horas), dtype='int64')
+    
+    inicio_laco = np.flatnonzero(np.r_[True, modelo['laco'][1:] != modelo['laco'][:-1]])
+    fim_laco = np.r_[inicio_laco[1:], len(horas)]
+    horas_laco = np.add.reduceat(horas, inicio_laco) if len(horas) else np.zeros(0)
+    # Urgência do laço: maior atraso possível (em dezembro) entre seus dispositivos
+    urgencia_laco = [modelo['atraso'][inicio:fim, -1].max() for inicio, fim in zip(inicio_laco, fim_laco)]
+    
+    for laco in sorted(range(len(inicio_laco)), key=lambda l: (-urgencia_laco[l], -horas_laco[l])):
+        inicio, fim = inicio_laco[laco], fim_laco[laco]
+        while inicio < fim:
+            restante = horas[inicio:fim].sum()
+            livre = capacidade[permitidos] - carga[permitidos]
+            atraso = modelo['atraso'][inicio:fim][:, permitidos].sum(axis=0)
+            
+            if (livre >= restante).any() or livre.max() <= 0:
+                # Cabe inteiro (ou não há mais capacidade): mês de menor excesso, atraso e carga
+                excesso = np.maximum(0.0, restante - np.maximum(livre, 0.0))
+                custo = PESO_EXCESSO * excesso + PESO_ATRASO * atraso - 1e-6 * livre
+                mes = permitidos[int(np.argmin(custo))]
+                indice_mes[inicio:fim] = mes
+                carga[mes] += restante
+                break
+            
+            # Dividir: preencher o mês com mais capacidade livre com um trecho contíguo
+            mes = permitidos[int(np.argmax(livre))]
+            cabe = np.searchsorted(np.cumsum(horas[inicio:fim]), livre.max(), side='right')
+            corte = inicio + max(int(cabe), 1)
+            indice_mes[inicio:corte] = mes
+            carga[mes] += horas[inicio:corte].sum()
+            inicio = corte
+    
+    return indice_mes
+
+def _plano_por_prazo(modelo, permitidos):
+    """
+    Solução inicial alternativa: dispositivos em ordem de vencimento preenchem os meses
+    
+    Os dispositivos são ordenados por prazo (e por laço dentro do mesmo prazo) e
+    ocupam os meses permitidos em sequência, conforme a capacidade acumulada.
+    """
+    ordem = np.lexsort([np.arange(len(modelo['horas'])), modelo['laco'], modelo['prazo']])
+    carga_acumulada = np.cumsum(modelo['horas'][ordem]) - modelo['horas'][ordem] / 2
+    capacidade_acumulada = np.cumsum(modelo['capacidade'][permitidos])
+    posicao = np.minimum(np.searchsorted(capacidade_acumulada, carga_acumulada), len(permitidos) - 1)
+    
+    indice_mes = np.empty(len(ordem), dtype='int64')
+    indice_mes[ordem] = permitidos[posicao]
+    return indice_mes
+
+def _busca_local(modelo, indice_mes, permitidos, horas_deslocamento, limite):
+    """
+    Melhora o plano com movimentos de menor custo até não haver ganho ou acabar o tempo
+    
+    Movimentos avaliados a cada rodada, com custo incremental:
+    - mover o trecho de um laço em um mês inteiro para outro mês
+    - trocar de mês os trechos de dois laços diferentes
+    - mover um dispositivo isolado para outro mês
+    """
+    horas = modelo['horas'].tolist()
+    atraso_np = modelo['atraso']
+    atraso = atraso_np.tolist()
+    capacidade = modelo['capacidade'].tolist()
+    laco = modelo['laco'].tolist()
+    quantidade_lacos = modelo['quantidade_lacos']
+    mes_disp = indice_mes.tolist()
+    
+    # Estado incremental: carga por mês e, por (laço, mês), dispositivos, horas e atraso em cada mês destino
+    carga = np.bincount(indice_mes, weights=modelo['horas'], minlength=12).tolist()
+    contagem = np.zeros((quantidade_lacos, 12), dtype='int64')
+    np.add.at(contagem, (modelo['laco'], indice_mes), 1)
+    contagem = contagem.tolist()
+    horas_trecho = np.zeros((quantidade_lacos, 12))
+    np.add.at(horas_trecho, (modelo['laco'], indice_mes), modelo['horas'])
+    horas_trecho = horas_trecho.tolist()
+    atraso_trecho = np.zeros((quantidade_lacos, 12, 12))
+    np.add.at(atraso_trecho, (modelo['laco'], indice_mes), atraso_np)
+    
+    def variacao_carga(mes, delta):
+        atual = carga[mes] - capacidade[mes]
+        novo = atual + delta
+        return PESO_EXCESSO * ((novo if novo > 0.0 else 0.0) - (atual if atual > 0.0 else 0.0))
+    
+    def mover_trecho(l, origem, destino):
+        for i in range(len(mes_disp)):
+            if laco[i] == l and mes_disp[i] == origem:
+                mes_disp[i] = destino
+        carga[origem] -= horas_trecho[l][origem]
+        carga[destino] += horas_trecho[l][origem]
+        contagem[l][destino] += contagem[l][origem]
+        contagem[l][origem] = 0
+        horas_trecho[l][destino] += horas_trecho[l][origem]
+        horas_trecho[l][origem] = 0.0
+        atraso_trecho[l, destino] += atraso_trecho[l, origem]
+        atraso_trecho[l, origem] = 0.0
+    
+    rodadas = 0
+    melhorou = True
+    while melhorou and time.perf_counter() < limite:
+        melhorou = False
+        rodadas += 1
+        
+        # Mover trechos inteiros
+        for l in range(quantidade_lacos):
+            for origem in permitidos:
+                if contagem[l][origem] == 0:
+                    continue
+                carga_trecho = horas_trecho[l][origem]
+                atraso_destinos = atraso_trecho[l, origem]
+                ganho_origem = variacao_carga(origem, -carga_trecho) - horas_deslocamento - PESO_ATRASO * atraso_destinos[origem]
+                melhor, melhor_destino = -1e-9, None
+                for destino in permitidos:
+                    if destino == origem:
+                        continue
+                    delta = (ganho_origem + variacao_carga(destino, carga_trecho)
+                             + (horas_deslocamento if contagem[l][destino] == 0 else 0.0)
+                             + PESO_ATRASO * atraso_destinos[destino])
+                    if delta < melhor:
+                        melhor, melhor_destino = delta, destino
+                if melhor_destino is not None:
+                    mover_trecho(l, origem, melhor_destino)
+                    melhorou = True
+        
+        # Trocar trechos de laços diferentes entre dois meses
+        trechos = [(l, mes) for l in range(quantidade_lacos) for mes in permitidos if contagem[l][mes] > 0]
+        for posicao, (l1, mes1) in enumerate(trechos):
+            for l2, mes2 in trechos[posicao + 1:]:
+                if l1 == l2 or mes1 == mes2 or contagem[l1][mes1] == 0 or contagem[l2][mes2] == 0:
+                    continue
+                diferenca = horas_trecho[l2][mes2] - horas_trecho[l1][mes1]
+                delta = (variacao_carga(mes1, diferenca) + variacao_carga(mes2, -diferenca)
+                         - (horas_deslocamento if contagem[l1][mes2] > 0 else 0.0)
+                         - (horas_deslocamento if contagem[l2][mes1] > 0 else 0.0)
+                         + PESO_ATRASO * (atraso_trecho[l1, mes1, mes2] - atraso_trecho[l1, mes1, mes1]
+                                          + atraso_trecho[l2, mes2, mes1] - atraso_trecho[l2, mes2, mes2]))
+                if time.perf_counter() >= limite:
+                    break
+                if delta < -1e-9:
+                    # Troca em duas etapas para preservar o estado incremental
+                    mover_trecho(l1, mes1, mes2)
+                    mover_trecho(l2, mes2, mes1)
+                    melhorou = True
+        
+        # Mover dispositivos isolados
+        for i in range(len(mes_disp)):
+            if time.perf_counter() >= limite:
+                break
+            origem, l, h, atraso_i = mes_disp[i], laco[i], horas[i], atraso[i]
+            # Sem excesso na origem, sem atraso e sem visita a economizar nenhum destino é melhor
+            if carga[origem] <= capacidade[origem] and atraso_i[origem] == 0.0 and contagem[l][origem] > 1:
+                continue
+            ganho_origem = (variacao_carga(origem, -h) - PESO_ATRASO * atraso_i[origem]
+                            - (horas_deslocamento if contagem[l][origem] == 1 else 0.0))
+            melhor, melhor_destino = -1e-9, None
+            for destino in permitidos:
+                if destino == origem:
+                    continue
+                delta = (ganho_origem + variacao_carga(destino, h) + PESO_ATRASO * atraso_i[destino]
+                         + (horas_deslocamento if contagem[l][destino] == 0 else 0.0))
+                if delta < melhor:
+                    melhor, melhor_destino = delta, destino
+            if melhor_destino is not None:
+                destino = melhor_destino
+                mes_disp[i] = destino
+                carga[origem] -= h
+                carga[destino] += h
+                contagem[l][origem] -= 1
+                contagem[l][destino] += 1
+                horas_trecho[l][origem] -= h
+                horas_trecho[l][destino] += h
+                atraso_trecho[l, origem] -= atraso_np[i]
+                atraso_trecho[l, destino] += atraso_np[i]
+                melhorou = True
+    
+    return np.array(mes_disp, dtype='int64'), rodadas
+
+def otimizar_plano(df, meses=None, capacidade_horas=40.0, ultimos_testes=None, ano=None,
+                   horas_por_tipo=None, periodicidade_por_tipo=None,
+                   horas_deslocamento=HORAS_DESLOCAMENTO, tempo_limite_s=5.0):
+    """
+    Define o mês de manutenção de cada dispositivo minimizando o custo do plano
+    
+    O custo soma, em horas equivalentes: o deslocamento de cada visita a um laço
+    em um mês (laços divididos em poucos meses), as horas acima da capacidade
+    mensal da equipe (tempo de teste por tipo de dispositivo) e os meses de
+    atraso em relação ao vencimento de cada dispositivo (último teste mais a
+    periodicidade do tipo). A solução parte de uma atribuição gulosa por laço e é
+    refinada por busca local até não haver melhoria ou até o tempo limite.
+    
+    Parâmetros:
+    df (DataFrame): Dispositivos com as colunas id_disp, type e laco
+    meses (list, opcional): Meses permitidos para visita (padrão: os 12 meses)
+    capacidade_horas (float ou dict): Horas disponíveis da equipe por mês, ou {mês: horas}
+    ultimos_testes (DataFrame, opcional): Último teste de cada dispositivo [id_disp, ano, mes]
+    ano (int, opcional): Ano do plano (padrão: ano atual)
+    horas_por_tipo (dict, opcional): Horas de teste por tipo (padrão: HORAS_POR_TIPO)
+    periodicidade_por_tipo (dict, opcional): Meses entre testes por tipo (padrão: PERIODICIDADE_POR_TIPO)
+    horas_deslocamento (float): Custo de cada visita a um laço em um mês
+    tempo_limite_s (float): Tempo máximo da busca local em segundos
+    
+    Retorna:
+    tuple: (Series com o mês de cada dispositivo alinhada ao índice de df,
+            dict com o custo do plano, o custo da solução gulosa, rodadas e tempo)
+    """
+    inicio = time.perf_counter()
+    meses = list(range(1, 13)) if meses is None else meses
+    permitidos = np.asarray(meses, dtype='int64') - 1
+    
+    if df.empty:
+        return pd.Series(np.zeros(0, dtype='int64'), index=df.index, name='mes_manutencao'), {}
+    
+    modelo = _preparar_modelo(df, capacidade_horas, ultimos_testes, ano, horas_por_tipo, periodicidade_por_tipo)
+    
+    # Busca local a partir das duas soluções iniciais, dividindo o tempo entre elas
+    melhor = None
+    for numero, construtor in enumerate([_plano_guloso, _plano_por_prazo]):
+        inicial = construtor(modelo, permitidos)
+        limite = inicio + tempo_limite_s * (numero + 1) / 2
+        indice_mes, rodadas = _busca_local(modelo, inicial, permitidos.tolist(), horas_deslocamento, limite)
+        resumo = _avaliar(modelo, indice_mes, horas_deslocamento)
+        if melhor is None or resumo['custo'] < melhor[1]['custo']:
+            resumo['custo_inicial'] = _avaliar(modelo, inicial, horas_deslocamento)['custo']
+            resumo['solucao_inicial'] = construtor.__name__.lstrip('_')
+            resumo['rodadas'] = rodadas
+            melhor = (indice_mes, resumo)
+    indice_mes, resumo = melhor
+    
+    resumo['tempo_s'] = round(time.perf_counter() - inicio, 3)
+    
+    resultado = pd.Series(indice_mes + 1, index=modelo['indice'], name='mes_manutencao')
+    return resultado.reindex(df.index), resumo
+
+if __name__ == "__main__":
+    # Benchmark: distribuição igualitária x plano otimizado na lista de pontos do BSC
+    # (uso, a partir da pasta src: python planejamento.py [caminho_csv] [capacidade_horas])
+    import sys
+    import processamento
+    
+    caminho = sys.argv[1] if len(sys.argv) > 1 else os.path.join('..', 'data', 'ListaPontosclientes', 'BSC.csv')
+    capacidade = float(sys.argv[2]) if len(sys.argv) > 2 else 12.0
+    
+    pontos = processamento.processar_arquivo_pontos(caminho)
+    pontos = pontos[(pontos['action'] != 'ISO') & (pontos['type'] != 'UNUSED')]
+    pontos['laco'] = processamento.decompor_ids(pontos['id_disp'])['laco'].astype(str)
+    
+    # Histórico simulado: 60% dos dispositivos testados em algum mês do ano anterior
+    rng = np.random.default_rng(0)
+    
+    for copias in [1, 5, 20]:
+        # Replicar a lista como laços independentes para medir a escala
+        df = pd.concat([
+            pontos.assign(laco=pontos['laco'] + f"-{copia}", id_disp=pontos['id_disp'] + f"-{copia}")
+            for copia in range(copias)
+        ], ignore_index=True)
+        testados = df['id_disp'].sample(frac=0.6, random_state=0)
+        ultimos = pd.DataFrame({'id_disp': testados, 'ano': 2025, 'mes': rng.integers(1, 13, len(testados))})
+        capacidade_total = capacidade * copias
+        
+        inicio = time.perf_counter()
+        igual = distribuir_meses(df, MESES_POR_ESTRATEGIA['Mensal'])
+        tempo_igual = time.perf_counter() - inicio
+        custo_igual = avaliar_plano(df, igual, capacidade_total, ultimos, 2026)
+        _, otimizado = otimizar_plano(df, capacidade_horas=capacidade_total, ultimos_testes=ultimos, ano=2026)
+        
+        print(f"{len(df)} dispositivos, {df['laco'].nunique()} laços, capacidade {capacidade_total:.0f} h/mês")
+        for nome, resumo, tempo in [('Igualitário', custo_igual, tempo_igual), ('Otimizado', otimizado, otimizado['tempo_s'])]:
+            print(f"  {nome:<12} custo {resumo['custo']:>9.1f} | visitas {resumo['visitas']:>4} | "
+                  f"excesso {resumo['excesso_horas']:>7.1f} h | atraso {resumo['atraso_meses']:>7.0f} meses | {tempo * 1000:>7.1f} ms")
@@ -1,62 +1,299 @@
-import pandas as pd
+import codecs
+import csv
+import io
 import re
 
+import numpy as np
+import pandas as pd
+
+# Leitura da lista de pontos: separador, bytes usados para detectar a codificação
+# e colunas esperadas (com o cabeçalho genérico exportado por algumas centrais)
+SEPARADOR = ';'
+TAMANHO_AMOSTRA = 64 * 1024
+COLUNAS_PONTOS = ['id_disp', 'type', 'action', 'description']
+CABECALHO_GENERICO = {
+    'Column1': 'id_disp',
+    'Column2': 'type',
+    'Column3': 'action',
+    'Column4': 'description'
+}
+
+# Arquivo de leituras dos dispositivos: colunas e formatos aceitos para a data e hora
+COLUNAS_LEITURAS = ['id_disp', 'datahora', 'valor', 'bateria', 'sinal']
+FORMATOS_DATAHORA = ['%Y-%m-%d %H:%M:%S', '%d/%m/%Y %H:%M:%S', '%d/%m/%Y %H:%M']
+
+# Padrão dos ids de dispositivo do tipo M1-249-0 (prefixo, módulo, número e sub)
+PADRAO_ID_DISPOSITIVO = re.compile(r'^(?P<prefixo>[A-Za-z]+)(?P<modulo>\d+)-(?P<numero>\d+)-(?P<sub>\d+)$')
+
+# Colunas derivadas do id gravadas junto da lista de pontos
+COLUNAS_ID = ['prefixo', 'modulo', 'numero', 'sub', 'laco']
+
+def detectar_codificacao(amostra):
+    """
+    Detecta a codificação do arquivo a partir dos primeiros bytes
+    
+    UTF-8 (com ou sem BOM) é reconhecido por decodificar sem erros (um caractere
+    cortado no fim da amostra é aceito); caso contrário o arquivo é tratado como
+    cp1252, o padrão das exportações do Windows, ou latin1 se houver bytes que o
+    cp1252 não define.
+    
+    Parâmetros:
+    amostra (bytes): Início do arquivo
+    
+    Retorna:
+    str: Nome da codificação
+    """
+    if amostra.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(amostra, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    try:
+        amostra.decode('cp1252')
+        return 'cp1252'
+    except UnicodeDecodeError:
+        return 'latin1'
+
+def _campos_por_registro(dados, codificacao, separador=SEPARADOR):
+    """
+    Conta os campos de cada registro (linha não vazia) do arquivo
+    
+    Sem aspas no arquivo, cada linha é um registro e a contagem é feita direto
+    nos bytes, sem decodificar. Com aspas, um campo pode conter o separador ou
+    quebras de linha, e os registros são separados pelo leitor do módulo csv
+    (mesmas regras de aspas do leitor do pandas).
+    
+    Retorna:
+    tuple: (número da primeira linha de cada registro, quantidade de campos,
+    função que devolve o conteúdo do registro pelo seu índice)
+    """
+    if b'"' not in dados:
+        buffer = np.frombuffer(dados, dtype=np.uint8)
+        fim = np.flatnonzero(buffer == ord('\n'))
+        if len(buffer) and buffer[-1] != ord('\n'):
+            fim = np.r_[fim, len(buffer)]
+        inicio = np.r_[0, fim[:-1] + 1]
+        
+        separadores = np.flatnonzero(buffer == ord(separador))
+        campos = np.searchsorted(separadores, fim) - np.searchsorted(separadores, inicio) + 1
+        
+        # Linhas vazias ou só com espaços, tabulações e \r são ignoradas pelo leitor de
+        # CSV (só linhas sem separador podem estar em branco)
+        em_branco = np.zeros(len(fim), dtype=bool)
+        for linha in np.flatnonzero(campos == 1):
+            em_branco[linha] = not dados[inicio[linha]:fim[linha]].strip()
+        registros = np.flatnonzero(~em_branco)
+        
+        def conteudo(indice):
+            linha = registros[indice]
+            return dados[inicio[linha]:fim[linha]].decode(codificacao, errors='replace').strip()
+        
+        return registros + 1, campos[registros], conteudo
+    
+    leitor = csv.reader(io.StringIO(dados.decode(codificacao, errors='replace'), newline=''),
+                        delimiter=separador, skipinitialspace=True)
+    linhas, campos, conteudos = [], [], []
+    proxima_linha = 1
+    for registro in leitor:
+        if len(registro) > 1 or (registro and registro[0].strip()):
+            linhas.append(proxima_linha)
+            campos.append(len(registro))
+            conteudos.append(separador.join(registro).strip())
+        proxima_linha = leitor.line_num + 1
+    return np.array(linhas, dtype=np.int64), np.array(campos, dtype=np.int64), conteudos.__getitem__
+
+def _ler_registros(dados, codificacao, linhas, campos):
+    """
+    Lê o arquivo como texto com uma linha do DataFrame por registro após o cabeçalho
+    
+    Os registros são lidos sem cabeçalho, com tantas colunas quanto o registro
+    mais largo: nenhum é descartado pelo leitor (os com campos a menos são
+    completados com vazio), e a linha i do DataFrame corresponde ao registro
+    i + 1 de _campos_por_registro. As colunas a mais não têm nome.
+    """
+    opcoes = dict(sep=SEPARADOR, encoding=codificacao, dtype=str, skipinitialspace=True)
+    cabecalho = list(pd.read_csv(io.BytesIO(dados), nrows=0, **opcoes).columns)
+    if len(linhas) < 2:
+        return pd.DataFrame({coluna: pd.Series(dtype=str) for coluna in cabecalho}, columns=cabecalho)
+    
+    largura = max(int(campos.max()), len(cabecalho))
+    df = pd.read_csv(io.BytesIO(dados), engine='c', na_filter=False, header=None,
+                     names=range(largura), skiprows=int(linhas[1]) - 1, **opcoes)
+    if len(df) != len(linhas) - 1:
+        raise ValueError(
+            f"Não foi possível separar os registros do arquivo ({len(df)} lidos, "
+            f"{len(linhas) - 1} esperados). Verifique as quebras de linha e as aspas."
+        )
+    df.columns = cabecalho + [''] * (largura - len(cabecalho))
+    return df
+
+def _ler_arquivo(arquivo):
+    """
+    Lê um arquivo separado por ';' com todas as colunas como texto
+    
+    A codificação é detectada uma única vez pelos primeiros bytes e o arquivo é
+    lido pelo leitor C do pandas, com um registro por linha do DataFrame (ver
+    _ler_registros).
+    
+    Retorna:
+    tuple: (DataFrame dos registros após o cabeçalho, número da primeira linha de
+    cada registro, quantidade de campos, função que devolve o conteúdo do registro)
+    """
+    if hasattr(arquivo, 'read'):
+        dados = arquivo.read()
+    else:
+        with open(arquivo, 'rb') as f:
+            dados = f.read()
+    if isinstance(dados, str):
+        dados = dados.encode('utf-8')
+    
+    codificacao = detectar_codificacao(dados[:TAMANHO_AMOSTRA])
+    linhas, campos, conteudo = _campos_por_registro(dados, codificacao)
+    try:
+        df = _ler_registros(dados, codificacao, linhas, campos)
+    except UnicodeDecodeError:
+        # A amostra era só ASCII, mas o restante do arquivo não é UTF-8
+        codificacao = detectar_codificacao(dados)
+        linhas, campos, conteudo = _campos_por_registro(dados, codificacao)
+        df = _ler_registros(dados, codificacao, linhas, campos)
+    return df, linhas, campos, conteudo
+
+def _problemas_de_campos(linhas, campos, conteudo):
+    """Registros com quantidade de campos diferente do cabeçalho (o primeiro registro)"""
+    return [
+        (int(linhas[indice]), f"{campos[indice]} campos (esperado {campos[0]})", conteudo(indice))
+        for indice in np.flatnonzero(campos != campos[0])
+    ]
+
+def _frame_problemas(problemas):
+    """DataFrame das linhas inválidas [linha, motivo, conteudo], em ordem de linha"""
+    problemas = pd.DataFrame(problemas, columns=['linha', 'motivo', 'conteudo']).astype({'linha': 'int64'})
+    return problemas.sort_values('linha', ignore_index=True)
+
+def ler_lista_pontos(arquivo):
+    """
+    Lê e valida um arquivo de lista de pontos (id_disp;type;action;description)
+    
+    A codificação é detectada uma única vez pelos primeiros bytes e o arquivo é
+    lido pelo leitor C do pandas com todas as colunas como texto. Aceita tanto o
+    cabeçalho genérico (Column1..Column4) quanto o cabeçalho com os nomes das
+    colunas. Linhas com quantidade de campos diferente do cabeçalho e linhas sem
+    id_disp são informadas; as com campos a mais e as sem id são descartadas.
+    
+    Parâmetros:
+    arquivo (file ou str): Arquivo enviado por upload (BytesIO) ou caminho do arquivo
+    
+    Retorna:
+    tuple: (DataFrame com as colunas padronizadas,
+            DataFrame com as linhas inválidas [linha, motivo, conteudo])
+    """
+    df, linhas, campos, conteudo = _ler_arquivo(arquivo)
+    
+    # Validar o cabeçalho: genérico (Column1..Column4) ou com os nomes das colunas
+    df.columns = df.columns.str.strip()
+    if list(df.columns[:4]) == list(CABECALHO_GENERICO):
+        df = df.rename(columns=CABECALHO_GENERICO)
+    else:
+        df.columns = df.columns.str.lower()
+    faltando = [coluna for coluna in COLUNAS_PONTOS if coluna not in df.columns]
+    if faltando:
+        raise ValueError(
+            f"Cabeçalho inválido: colunas {', '.join(faltando)} não encontradas. "
+            f"Use Column1;Column2;Column3;Column4 ou {';'.join(COLUNAS_PONTOS)}."
+        )
+    
+    # Campos a mais (registro descartado) ou a menos (completado com vazio)
+    problemas = _problemas_de_campos(linhas, campos, conteudo)
+    
+    # Espaços e tabulações nas bordas dos campos (os iniciais já saem com o skipinitialspace)
+    df = df[COLUNAS_PONTOS].apply(lambda coluna: coluna.str.strip())
+    campos_a_mais = campos[1:] > campos[0]
+    sem_id = (df['id_disp'] == '').to_numpy() & ~campos_a_mais
+    problemas += [(int(linhas[indice + 1]), "id_disp vazio", conteudo(indice + 1)) for indice in np.flatnonzero(sem_id)]
+    df = df[~(sem_id | campos_a_mais)].reset_index(drop=True)
+    
+    return df, _frame_problemas(problemas)
+
 def processar_arquivo_pontos(arquivo, formato='csv'):
     """
     Processa o arquivo de lista de pontos para um formato padronizado
     
     Parâmetros:
-    arquivo (file): Arquivo enviado por upload (BytesIO)
-    formato (str): Formato do arquivo (csv, txt)
+    arquivo (file): Arquivo enviado por upload (BytesIO) ou caminho do arquivo
+    formato (str): Formato do arquivo (csv, txt; ambos separados por ';')
     
     Retorna:
-    DataFrame pandas com as colunas padronizadas
-    """
-    # Lista de codificações para tentar
-    codificacoes = ['latin1', 'cp1252', 'utf-8-sig', 'utf-8']
-    
-    # Tentar diferentes codificações
-    for codificacao in codificacoes:
-        try:
-            if formato == 'csv':
-                # Detectar o separador automaticamente
-                df = pd.read_csv(arquivo, sep=';', engine='python', encoding=codificacao)
-            else:
-                # Tratar como txt
-                df = pd.read_csv(arquivo, sep=';', engine='python', encoding=codificacao)
-                
-            # Se chegou aqui, a leitura foi bem-sucedida
+    DataFrame pandas com as colunas padronizadas (ver ler_lista_pontos para as linhas inválidas)
+    """
+    df, _ = ler_lista_pontos(arquivo)
+    return df
+
+def _converter_datahora(valores):
+    """Converte textos de data e hora pelos FORMATOS_DATAHORA (NaT se nenhum servir)"""
+    datahora = pd.Series(pd.NaT, index=valores.index, dtype='datetime64[ns]')
+    for formato in FORMATOS_DATAHORA:
+        faltando = datahora.isna()
+        if not faltando.any():
             break
-        except UnicodeDecodeError:
-            # Tentar próxima codificação
-            if codificacao == codificacoes[-1]:
-                # Se for a última codificação, não há mais o que tentar
-                raise Exception("Não foi possível decodificar o arquivo. Verifique a codificação.")
-            # Resetar o ponteiro do arquivo para o início
-            arquivo.seek(0)
-            continue
-    
-    # Renomear colunas para o padrão esperado
-    if 'Column1' in df.columns and 'Column2' in df.columns and 'Column3' in df.columns and 'Column4' in df.columns:
-        df = df.rename(columns={
-            'Column1': 'id_disp',
-            'Column2': 'type',
-            'Column3': 'action',
-            'Column4': 'description'
-        })
-    
-    # Limpar espaços em branco dos dados
-    for col in df.columns:
-        if df[col].dtype == 'object':
-            df[col] = df[col].str.strip()
-    
-    # Se faltar alguma coluna essencial, adicionar vazia
-    colunas_essenciais = ['id_disp', 'type', 'action', 'description']
-    for col in colunas_essenciais:
-        if col not in df.columns:
-            df[col] = ''
-    
-    return df[colunas_essenciais]
+        datahora[faltando] = pd.to_datetime(valores[faltando], format=formato, errors='coerce')
+    return datahora
+
+def _converter_numero(valores):
+    """Converte textos com vírgula ou ponto decimal em números (NaN se vazio ou inválido)"""
+    return pd.to_numeric(valores.str.replace(',', '.', regex=False), errors='coerce')
+
+def ler_leituras(arquivo):
+    """
+    Lê e valida um arquivo de leituras de dispositivos (id_disp;datahora;valor;bateria;sinal)
+    
+    O arquivo é lido como a lista de pontos (codificação detectada e registros
+    conferidos pela quantidade de campos). A data e hora pode vir como
+    AAAA-MM-DD HH:MM:SS ou DD/MM/AAAA HH:MM[:SS] e os números com vírgula ou
+    ponto decimal; bateria e sinal podem ficar vazios. Registros com campos a
+    mais, sem id_disp, com data e hora inválida ou sem valor são informados e
+    descartados.
+    
+    Parâmetros:
+    arquivo (file ou str): Arquivo enviado por upload (BytesIO) ou caminho do arquivo
+    
+    Retorna:
+    tuple: (DataFrame [id_disp, datahora, valor, bateria, sinal] no formato de db.salvar_leituras,
+            DataFrame com as linhas inválidas [linha, motivo, conteudo])
+    """
+    df, linhas, campos, conteudo = _ler_arquivo(arquivo)
+    
+    df.columns = df.columns.str.strip().str.lower()
+    faltando = [coluna for coluna in COLUNAS_LEITURAS if coluna not in df.columns]
+    if faltando:
+        raise ValueError(
+            f"Cabeçalho inválido: colunas {', '.join(faltando)} não encontradas. "
+            f"Use {';'.join(COLUNAS_LEITURAS)}."
+        )
+    
+    problemas = _problemas_de_campos(linhas, campos, conteudo)
+    df = df[COLUNAS_LEITURAS].apply(lambda coluna: coluna.str.strip())
+    leituras = pd.DataFrame({
+        'id_disp': df['id_disp'],
+        'datahora': _converter_datahora(df['datahora']),
+        'valor': _converter_numero(df['valor']),
+        'bateria': _converter_numero(df['bateria']),
+        'sinal': _converter_numero(df['sinal']),
+    })
+    
+    # Cada registro descartado é informado uma vez, pelo primeiro motivo encontrado
+    descartar = campos[1:] > campos[0]
+    for motivo, invalido in [
+        ("id_disp vazio", leituras['id_disp'] == ''),
+        ("data e hora inválida", leituras['datahora'].isna()),
+        ("valor não numérico", leituras['valor'].isna()),
+    ]:
+        invalido = invalido.to_numpy() & ~descartar
+        problemas += [(int(linhas[indice + 1]), motivo, conteudo(indice + 1)) for indice in np.flatnonzero(invalido)]
+        descartar = descartar | invalido
+    
+    return leituras[~descartar].reset_index(drop=True), _frame_problemas(problemas)
 
 def extrair_dados_dispositivo(id_disp):
     """
@@ -70,9 +307,7 @@ def extrair_dados_dispositivo(id_disp):
     Retorna:
     dict com as informações extraídas
     """
-    # Padrão para dispositivos do tipo M1-249-0
-    padrao = r'^([A-Za-z]+)(\d+)-(\d+)-(\d+)$'
-    match = re.match(padrao, id_disp.strip())
+    match = PADRAO_ID_DISPOSITIVO.match(id_disp.strip())
     
     if match:
         return {
@@ -89,6 +324,33 @@ def extrair_dados_dispositivo(id_disp):
         'sub': 0
     }
 
+def decompor_ids(ids):
+    """
+    Decompõe uma coluna de ids de dispositivo em prefixo, módulo, número, sub e laço
+    
+    Versão vetorizada de extrair_dados_dispositivo: o padrão compilado é aplicado
+    a toda a coluna de uma vez com str.extract. Ids fora do padrão ficam com
+    prefixo vazio e zeros, como em extrair_dados_dispositivo. O laço são os dois
+    primeiros caracteres do id.
+    
+    Parâmetros:
+    ids (Series): Ids dos dispositivos (ex.: M1-249-0)
+    
+    Retorna:
+    DataFrame com as colunas prefixo e laco (category) e modulo, numero e sub (int64),
+    alinhado ao índice de ids
+    """
+    ids = ids.fillna('').astype(str).str.strip()
+    partes = ids.str.extract(PADRAO_ID_DISPOSITIVO)
+    
+    return pd.DataFrame({
+        'prefixo': partes['prefixo'].fillna('').astype('category'),
+        'modulo': partes['modulo'].fillna(0).astype('int64'),
+        'numero': partes['numero'].fillna(0).astype('int64'),
+        'sub': partes['sub'].fillna(0).astype('int64'),
+        'laco': ids.str[:2].astype('category'),
+    }, index=ids.index)
+
 def enriquecer_dados(df):
     """
     Adiciona colunas extras com informações extraídas dos ids dos dispositivos
@@ -99,16 +361,5 @@ def enriquecer_dados(df):
     Retorna:
     DataFrame enriquecido com novas colunas
     """
-    # Copiar para não modificar o original
-    df_enriquecido = df.copy()
-    
-    # Aplicar função de extração em cada ID de dispositivo
-    info_dispositivos = df_enriquecido['id_disp'].apply(extrair_dados_dispositivo)
-    
-    # Expandir o dicionário em novas colunas
-    info_df = pd.json_normalize(info_dispositivos)
-    
-    # Concatenar com os dados originais
-    df_resultado = pd.concat([df_enriquecido, info_df], axis=1)
-    
-    return df_resultado 
\ No newline at end of file
+    # Decompor todos os ids de uma vez e juntar pelo índice (sem modificar o original)
+    return df.drop(columns=COLUNAS_ID, errors='ignore').join(decompor_ids(df['id_disp']))
@@ -0,0 +1,187 @@
+"""
+Exportação dos relatórios de manutenção
+
+O relatório junta, dentro do SQLite, os dispositivos planejados de cada mês com
+o resultado do teste e a ação corretiva registrada. As linhas são lidas do
+cursor em lotes e escritas direto no arquivo de saída (CSV, Parquet ou XLSX),
+sem montar um DataFrame com o relatório inteiro, de modo que um ano completo de
+um cliente grande não precisa caber na memória.
+
+pyarrow (Parquet) e openpyxl (XLSX) são opcionais e só são importados quando o
+formato correspondente é pedido.
+"""
+import csv
+import io
+import tempfile
+
+import db
+
+# Formatos de exportação: (tipo MIME, extensão do arquivo)
+FORMATOS = {
+    'csv': ('text/csv', '.csv'),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', '.xlsx'),
+    'parquet': ('application/vnd.apache.parquet', '.parquet'),
+}
+
+COLUNAS_RELATORIO = [
+    'ano', 'mes', 'id_disp', 'descricao', 'type', 'action', 'laco',
+    'status', 'observacao', 'data_teste', 'acao_corretiva', 'resolvido'
+]
+
+# Tamanho a partir do qual o arquivo gerado deixa a memória e vai para o disco
+TAMANHO_MAXIMO_MEMORIA = 8 * 1024 * 1024
+
+def consultar_relatorio(cliente, ano, meses=None, tamanho_lote=db.TAMANHO_LOTE):
+    """
+    Lê as linhas do relatório em lotes, na ordem mês, laço e dispositivo
+    
+    Cada dispositivo planejado para um dos meses aparece uma vez, com o status
+    do teste naquele mês/ano ('Não Testado' se não houver) e a ação corretiva
+    registrada, se houver. A conexão é aberta só quando o primeiro lote é pedido
+    e fechada ao fim da leitura.
+    
+    Parâmetros:
+    cliente (str): Nome do cliente
+    ano (int): Ano dos testes
+    meses (list, opcional): Meses do relatório (se None, o ano inteiro)
+    tamanho_lote (int): Quantidade de linhas por lote
+    
+    Retorna:
+    generator: Listas de tuplas na ordem de COLUNAS_RELATORIO
+    """
+    meses = list(range(1, 13)) if meses is None else [int(mes) for mes in meses]
+    cliente_id = db.get_cliente_id(cliente)
+    if not cliente_id or not meses:
+        return
+    
+    conn = db.get_db_connection()
+    try:
+        cursor = conn.cursor()
+        
+        # A tabela de ações corretivas só existe depois da primeira ação registrada
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='acoes_corretivas'")
+        if cursor.fetchone():
+            colunas_acao = "a.acao_corretiva, a.resolvido"
+            juncao_acao = '''
+            LEFT JOIN acoes_corretivas a
+                ON a.cliente = ? AND a.ano = ? AND a.mes = pm.mes_manutencao AND a.id_disp = pm.id_disp
+            '''
+            params_acao = [cliente, ano]
+        else:
+            colunas_acao = "NULL AS acao_corretiva, NULL AS resolvido"
+            juncao_acao = ""
+            params_acao = []
+        
+        marcadores = ', '.join('?' * len(meses))
+        cursor.execute(f'''
+        SELECT ? AS ano, pm.mes_manutencao AS mes, pm.id_disp, lp.description AS descricao,
+               lp.type, lp.action, lp.laco,
+               COALESCE(NULLIF(t.status, ''), 'Não Testado') AS status,
+               COALESCE(t.observacao, '') AS observacao, t.data_teste,
+               {colunas_acao}
+        FROM plano_manutencao pm
+        JOIN lista_de_pontos lp ON lp.cliente_id = pm.cliente_id AND lp.id_disp = pm.id_disp
+        LEFT JOIN testes_dispositivos t
+            ON t.cliente = ? AND t.ano = ? AND t.mes = pm.mes_manutencao AND t.id_disp = pm.id_disp
+        {juncao_acao}
+        WHERE pm.cliente_id = ? AND pm.mes_manutencao IN ({marcadores})
+        ORDER BY pm.mes_manutencao, lp.laco, pm.id_disp
+        ''', [ano, cliente, ano] + params_acao + [cliente_id] + meses)
+        
+        # Tuplas simples são mais baratas que sqlite3.Row
+        cursor.row_factory = None
+        while True:
+            lote = cursor.fetchmany(tamanho_lote)
+            if not lote:
+                break
+            yield lote
+    finally:
+        conn.close()
+
+def _escrever_csv(lotes, destino):
+    """Escreve o relatório em CSV (UTF-8, separado por vírgula), lote a lote"""
+    texto = io.StringIO()
+    escritor = csv.writer(texto)
+    escritor.writerow(COLUNAS_RELATORIO)
+    for lote in lotes:
+        escritor.writerows(lote)
+        destino.write(texto.getvalue().encode('utf-8'))
+        texto.seek(0)
+        texto.truncate()
+    destino.write(texto.getvalue().encode('utf-8'))
+
+def _escrever_xlsx(lotes, destino):
+    """Escreve o relatório em XLSX com o openpyxl em modo somente escrita (linhas vão direto para o arquivo)"""
+    try:
+        from openpyxl import Workbook
+    except ImportError as e:
+        raise ImportError("A exportação em XLSX requer o pacote openpyxl (pip install openpyxl)") from e
+    
+    planilha = Workbook(write_only=True)
+    aba = planilha.create_sheet("Relatório")
+    aba.append(COLUNAS_RELATORIO)
+    for lote in lotes:
+        for linha in lote:
+            aba.append(linha)
+    planilha.save(destino)
+
+def _escrever_parquet(lotes, destino):
+    """Escreve o relatório em Parquet, um grupo de linhas por lote"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("A exportação em Parquet requer o pacote pyarrow (pip install pyarrow)") from e
+    
+    tipos = {'ano': pa.int64(), 'mes': pa.int64(), 'resolvido': pa.bool_()}
+    esquema = pa.schema([(coluna, tipos.get(coluna, pa.string())) for coluna in COLUNAS_RELATORIO])
+    posicao_resolvido = COLUNAS_RELATORIO.index('resolvido')
+    
+    with pq.ParquetWriter(destino, esquema) as escritor:
+        for lote in lotes:
+            colunas = [list(valores) for valores in zip(*lote)]
+            # resolvido é gravado como 0/1 no SQLite
+            colunas[posicao_resolvido] = [None if v is None else bool(v) for v in colunas[posicao_resolvido]]
+            escritor.write_table(pa.table(colunas, schema=esquema))
+
+ESCRITORES = {
+    'csv': _escrever_csv,
+    'xlsx': _escrever_xlsx,
+    'parquet': _escrever_parquet,
+}
+
+def gerar_relatorio(cliente, ano, meses=None, formato='csv'):
+    """
+    Gera o relatório de manutenção de um ou mais meses (ou do ano inteiro)
+    
+    O arquivo fica em memória enquanto for pequeno e passa para um arquivo
+    temporário em disco acima de TAMANHO_MAXIMO_MEMORIA. Quem chama deve fechá-lo.
+    
+    Parâmetros:
+    cliente (str): Nome do cliente
+    ano (int): Ano dos testes
+    meses (list, opcional): Meses do relatório (se None, o ano inteiro)
+    formato (str): 'csv', 'xlsx' ou 'parquet' (ver FORMATOS)
+    
+    Retorna:
+    SpooledTemporaryFile: Arquivo binário com o relatório, posicionado no início
+    """
+    if formato not in ESCRITORES:
+        raise ValueError(f"Formato de relatório desconhecido: {formato}")
+    
+    arquivo = tempfile.SpooledTemporaryFile(max_size=TAMANHO_MAXIMO_MEMORIA)
+    try:
+        ESCRITORES[formato](consultar_relatorio(cliente, ano, meses), arquivo)
+    except Exception:
+        arquivo.close()
+        raise
+    arquivo.seek(0)
+    return arquivo
+
+def nome_arquivo_relatorio(cliente, ano, meses=None, formato='csv'):
+    """Nome sugerido para o arquivo do relatório (ex.: relatorio_BSC_2025_03.csv)"""
+    if meses is None:
+        periodo = 'anual'
+    else:
+        periodo = '-'.join(f"{int(mes):02d}" for mes in sorted(meses))
+    return f"relatorio_{cliente}_{ano}_{periodo}{FORMATOS[formato][1]}"
@@ -0,0 +1,221 @@
+"""
+Simulação de carga do banco de dados do painel
+
+Simula N técnicos preenchendo o checklist de Manutenção Mensal ao mesmo tempo:
+cada sessão lê os testes do mês, grava os resultados de um bloco de dispositivos
+e registra ações corretivas, em paralelo com as demais. Ao final são exibidos os
+percentis de latência de cada operação, quantos erros ocorreram e a contagem
+das transações de escrita (novas tentativas e desistências com o banco ocupado).
+
+As sessões de um mesmo processo compartilham a fila única de escrita do db.py,
+então só disputam o bloqueio do banco entre processos. Com --processos, as
+sessões são divididas entre vários processos (cada um com a sua fila e as suas
+conexões), como vários servidores do Streamlit sobre o mesmo arquivo; um
+--timeout-banco curto faz o BEGIN IMMEDIATE desistir antes do busy timeout
+padrão e exercita as novas tentativas com espera exponencial.
+
+Uso (a partir da pasta src):
+    python simulacao_carga.py --sessoes 20 --rodadas 10 --dispositivos 50
+    python simulacao_carga.py --sessoes 20 --processos 4 --timeout-banco 0.01
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import db
+
+def preparar_banco(caminho, cliente, total_dispositivos):
+    """Cria um banco temporário com a lista de pontos e o plano do cliente"""
+    db.DB_PATH = caminho
+    db.limpar_cache()
+    db.init_db()
+    
+    ids = [f"M1-{i}-0" for i in range(1, total_dispositivos + 1)]
+    pontos = pd.DataFrame({
+        'id_disp': ids,
+        'type': 'PHOTO',
+        'action': '',
+        'description': [f"Dispositivo {i}" for i in ids],
+    })
+    db.salvar_pontos(cliente, pontos)
+    db.salvar_plano_manutencao(cliente, pd.DataFrame({'id_disp': ids, 'mes_manutencao': 1}))
+    return ids
+
+def sessao_tecnico(numero, cliente, ids, rodadas, dispositivos_por_rodada, latencias, erros, barreira):
+    """Executa as operações de uma sessão e guarda a latência de cada uma"""
+    rng = np.random.default_rng(numero)
+    barreira.wait()
+    
+    for rodada in range(rodadas):
+        operacoes = {
+            'buscar_testes': lambda: db.buscar_testes_dispositivos(cliente, 1, 2025),
+            'salvar_testes': lambda: db.salvar_teste_dispositivos(cliente, 1, 2025, pd.DataFrame({
+                'id_disp': rng.choice(ids, dispositivos_por_rodada, replace=False),
+                'status': rng.choice(['Teste OK', 'Teste Não OK'], dispositivos_por_rodada),
+                'observacao': f"sessão {numero} rodada {rodada}",
+            })),
+            'salvar_acao': lambda: db.salvar_acao_corretiva(
+                cliente, 1, 2025, rng.choice(ids), "Falha simulada", "Troca do dispositivo", False
+            ),
+        }
+        
+        for nome, operacao in operacoes.items():
+            inicio = time.perf_counter()
+            try:
+                resultado = operacao()
+                if resultado is False:
+                    erros.append(nome)
+            except Exception:
+                erros.append(nome)
+            latencias.append((nome, (time.perf_counter() - inicio) * 1000))
+
+def executar_sessoes(caminho, cliente, ids, sessoes, rodadas, dispositivos_por_rodada,
+                     primeira_sessao=0, timeout_banco_s=None, barreira_processos=None):
+    """
+    Executa sessões simultâneas (threads) no processo atual
+    
+    Parâmetros:
+    caminho (str): Banco já preparado por preparar_banco
+    primeira_sessao (int): Número da primeira sessão (semente de cada sessão)
+    timeout_banco_s (float, opcional): Busy timeout das conexões deste processo
+    barreira_processos (multiprocessing.Barrier, opcional): Sincroniza o início entre processos
+    (demais parâmetros como em executar_simulacao)
+    
+    Retorna:
+    tuple: (lista de (operação, latência em ms), lista de erros, contagem de transações,
+            duração das sessões em s)
+    """
+    db.DB_PATH = caminho
+    if timeout_banco_s is not None:
+        db.TIMEOUT_BANCO_S = timeout_banco_s
+    db.resetar_metricas()
+    
+    latencias = []
+    erros = []
+    barreira = threading.Barrier(sessoes)
+    threads = [
+        threading.Thread(
+            target=sessao_tecnico,
+            args=(n, cliente, ids, rodadas, dispositivos_por_rodada, latencias, erros, barreira)
+        )
+        for n in range(primeira_sessao, primeira_sessao + sessoes)
+    ]
+    
+    if barreira_processos is not None:
+        barreira_processos.wait()
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencias, erros, db.obter_contagem_transacoes(), time.perf_counter() - inicio
+
+def _processo_sessoes(resultados, *args, **kwargs):
+    """Alvo de cada processo da simulação: envia o resultado de executar_sessoes pela fila"""
+    resultados.put(executar_sessoes(*args, **kwargs))
+
+def executar_simulacao(sessoes, rodadas, dispositivos_por_rodada, total_dispositivos=1000,
+                       processos=1, timeout_banco_s=None):
+    """
+    Executa a simulação e retorna os percentis de latência por operação
+    
+    Parâmetros:
+    sessoes (int): Número de sessões simultâneas (divididas entre os processos)
+    rodadas (int): Quantas vezes cada sessão repete o ciclo de operações
+    dispositivos_por_rodada (int): Dispositivos gravados por chamada de salvar_teste_dispositivos
+    total_dispositivos (int): Tamanho da lista de pontos do cliente simulado
+    processos (int): Processos que dividem as sessões (1: todas neste processo)
+    timeout_banco_s (float, opcional): Busy timeout das conexões durante a simulação
+    
+    Retorna:
+    tuple: (DataFrame com p50/p95/p99/máximo em ms por operação, lista de erros,
+            duração total em s, contagem de transações somada entre os processos)
+    """
+    cliente = 'CARGA'
+    latencias = []
+    erros = []
+    contagem = {}
+    
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho_original = db.DB_PATH
+        timeout_original = db.TIMEOUT_BANCO_S
+        try:
+            caminho = os.path.join(diretorio, 'carga.db')
+            ids = preparar_banco(caminho, cliente, total_dispositivos)
+            
+            # Sessões divididas entre os processos o mais igualmente possível
+            por_processo = [len(parte) for parte in np.array_split(np.arange(sessoes), processos) if len(parte)]
+            primeiras = np.r_[0, np.cumsum(por_processo)[:-1]].tolist()
+            
+            if len(por_processo) == 1:
+                resultados = [executar_sessoes(caminho, cliente, ids, sessoes, rodadas, dispositivos_por_rodada,
+                                               timeout_banco_s=timeout_banco_s)]
+            else:
+                contexto = multiprocessing.get_context('spawn')
+                fila = contexto.Queue()
+                barreira = contexto.Barrier(len(por_processo))
+                filhos = [
+                    contexto.Process(
+                        target=_processo_sessoes,
+                        args=(fila, caminho, cliente, ids, quantidade, rodadas, dispositivos_por_rodada),
+                        kwargs=dict(primeira_sessao=primeira, timeout_banco_s=timeout_banco_s,
+                                    barreira_processos=barreira),
+                    )
+                    for quantidade, primeira in zip(por_processo, primeiras)
+                ]
+                for filho in filhos:
+                    filho.start()
+                # A fila é esvaziada antes do join para que nenhum processo fique preso ao enviar
+                resultados = [fila.get() for _ in filhos]
+                for filho in filhos:
+                    filho.join()
+        finally:
+            db.DB_PATH = caminho_original
+            db.TIMEOUT_BANCO_S = timeout_original
+            db.limpar_cache()
+    
+    # Duração da simulação: do início conjunto das sessões até o fim do último processo
+    duracao = max(resultado[3] for resultado in resultados)
+    for latencias_processo, erros_processo, contagem_processo, _ in resultados:
+        latencias += latencias_processo
+        erros += erros_processo
+        for evento, quantidade in contagem_processo.items():
+            contagem[evento] = contagem.get(evento, 0) + quantidade
+    
+    df = pd.DataFrame(latencias, columns=['operacao', 'latencia_ms'])
+    resumo = df.groupby('operacao')['latencia_ms'].agg(
+        chamadas='count',
+        p50=lambda x: np.percentile(x, 50),
+        p95=lambda x: np.percentile(x, 95),
+        p99=lambda x: np.percentile(x, 99),
+        maximo='max',
+    )
+    return resumo, erros, duracao, contagem
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulação de sessões simultâneas salvando testes")
+    parser.add_argument('--sessoes', type=int, default=20)
+    parser.add_argument('--rodadas', type=int, default=10)
+    parser.add_argument('--dispositivos', type=int, default=50)
+    parser.add_argument('--processos', type=int, default=1, help="Processos que dividem as sessões")
+    parser.add_argument('--timeout-banco', type=float, default=None,
+                        help=f"Busy timeout das conexões em s (padrão do db.py: {db.TIMEOUT_BANCO_S})")
+    args = parser.parse_args()
+    
+    resumo, erros, duracao, contagem = executar_simulacao(
+        args.sessoes, args.rodadas, args.dispositivos,
+        processos=args.processos, timeout_banco_s=args.timeout_banco
+    )
+    
+    print(f"{args.sessoes} sessões em {args.processos} processo(s) x {args.rodadas} rodadas em {duracao:.2f} s")
+    print(resumo.round(2).to_string())
+    print(f"Erros: {len(erros)}")
+    print(f"Transações de escrita: {contagem['transacoes']} concluídas, "
+          f"{contagem['tentativas_ocupado']} novas tentativas com o banco ocupado, "
+          f"{contagem['falhas_ocupado']} desistências")
@@ -0,0 +1,191 @@
+"""
+Contagens pré-agregadas das ocorrências do TroubleLog
+
+O CuboOcorrencias agrupa os registros uma única vez por dia × hora × local ×
+tipo de dispositivo × status, guardando cada dimensão como códigos inteiros de
+categorias. Os gráficos e filtros consultam o cubo (máscaras e np.bincount
+sobre os códigos) em vez de agrupar o DataFrame completo a cada execução da
+página.
+"""
+import numpy as np
+import pandas as pd
+
+DIAS_SEMANA = ['MON', 'TUE', 'WED', 'THU', 'FRI', 'SAT', 'SUN']
+
+# Colunas do DataFrame do TroubleLog usadas por cada dimensão
+COLUNAS_DIMENSOES = {
+    'local': 'Local',
+    'tipo': 'Tipo de Dispositivo',
+    'status': 'Status',
+}
+
+# Locais que não são dispositivos (reconhecimentos e reinício da central)
+LOCAIS_GENERICOS = ['TROUBLES', 'SUPERVISORIES', 'HARDWARE RESET IN PROGRESS']
+
+# Acima desta quantidade de combinações, contar usa np.unique em vez de np.bincount
+LIMITE_BINCOUNT = 1_000_000
+
+class CuboOcorrencias:
+    """
+    Contagem de ocorrências por dia, hora, local, tipo de dispositivo e status
+    
+    Cada célula guarda os códigos das cinco dimensões e a quantidade de
+    registros. Dimensões consultáveis em contar: 'dia', 'hora', 'local',
+    'tipo', 'status' e 'dia_semana' (derivada do dia). Registros sem data
+    válida (DataHora NaT) ficam fora das contagens por dia, hora e dia da semana.
+    """
+    
+    DIMENSOES = ['dia', 'hora', 'local', 'tipo', 'status']
+    
+    def __init__(self, df):
+        """
+        Parâmetros:
+        df (DataFrame): Registros do TroubleLog (DataHora, Local, Tipo de Dispositivo, Status)
+        """
+        codigos = {}
+        categorias = {}
+        
+        # Dia: datas ordenadas; hora: 0 a 23 (registros sem data recebem o código -1)
+        data_hora = df['DataHora']
+        codigos['dia'], categorias['dia'] = pd.factorize(data_hora.dt.normalize(), sort=True)
+        categorias['dia'] = pd.DatetimeIndex(categorias['dia'])
+        codigos['hora'] = data_hora.dt.hour.fillna(-1).to_numpy(dtype=np.int64)
+        categorias['hora'] = pd.RangeIndex(24)
+        
+        for dimensao, coluna in COLUNAS_DIMENSOES.items():
+            codigos[dimensao], categorias[dimensao] = pd.factorize(df[coluna], sort=True)
+            categorias[dimensao] = pd.Index(categorias[dimensao])
+        
+        # Agrupar as combinações distintas (os códigos são deslocados em 1 para aceitar o -1)
+        tamanhos = [len(categorias[d]) + 1 for d in self.DIMENSOES]
+        chave = np.ravel_multi_index([codigos[d] + 1 for d in self.DIMENSOES], tamanhos)
+        celulas, contagem = np.unique(chave, return_counts=True)
+        partes = np.unravel_index(celulas, tamanhos)
+        
+        self._categorias = categorias
+        self._codigos = {
+            'dia': (partes[0] - 1).astype(np.int32),
+            'hora': (partes[1] - 1).astype(np.int8),
+            'local': (partes[2] - 1).astype(np.int32),
+            'tipo': (partes[3] - 1).astype(np.int32),
+            'status': (partes[4] - 1).astype(np.int32),
+        }
+        self._contagem = contagem.astype(np.int64)
+    
+    @classmethod
+    def _subconjunto(cls, origem, mascara):
+        """Cubo com as células de origem selecionadas pela máscara (mesmas categorias)"""
+        cubo = cls.__new__(cls)
+        cubo._categorias = origem._categorias
+        cubo._codigos = {dimensao: codigos[mascara] for dimensao, codigos in origem._codigos.items()}
+        cubo._contagem = origem._contagem[mascara]
+        return cubo
+    
+    def __len__(self):
+        return len(self._contagem)
+    
+    @property
+    def total(self):
+        """Quantidade de registros representados no cubo"""
+        return int(self._contagem.sum())
+    
+    @property
+    def dias(self):
+        """Datas (DatetimeIndex ordenado) presentes no cubo"""
+        return self._categorias['dia'][np.unique(self._codigos['dia'][self._codigos['dia'] >= 0])]
+    
+    def _selecao(self, dimensao, valores):
+        """Máscara das células cujo valor da dimensão está em valores"""
+        permitidos = np.zeros(len(self._categorias[dimensao]), dtype=bool)
+        posicoes = self._categorias[dimensao].get_indexer(list(valores))
+        permitidos[posicoes[posicoes >= 0]] = True
+        return permitidos[self._codigos[dimensao]]
+    
+    def filtrar(self, inicio=None, fim=None, locais=None, tipos=None, status=None, excluir_locais=None):
+        """
+        Seleciona as células do cubo
+        
+        Parâmetros:
+        inicio, fim (date, opcional): Período (inclusive) das ocorrências
+        locais, tipos, status (list, opcional): Valores aceitos de cada dimensão
+        excluir_locais (list, opcional): Locais descartados
+        
+        Retorna:
+        CuboOcorrencias: Novo cubo apenas com as células selecionadas
+        """
+        mascara = np.ones(len(self), dtype=bool)
+        
+        if inicio is not None or fim is not None:
+            # Códigos de dia são ordenados por data: o período vira um intervalo de códigos
+            dias = self._categorias['dia']
+            primeiro = 0 if inicio is None else dias.searchsorted(pd.Timestamp(inicio), side='left')
+            ultimo = len(dias) if fim is None else dias.searchsorted(pd.Timestamp(fim), side='right')
+            codigos_dia = self._codigos['dia']
+            mascara &= (codigos_dia >= primeiro) & (codigos_dia < ultimo)
+        
+        for dimensao, valores in (('local', locais), ('tipo', tipos), ('status', status)):
+            if valores is not None:
+                mascara &= self._selecao(dimensao, valores)
+        
+        if excluir_locais is not None:
+            mascara &= ~self._selecao('local', excluir_locais)
+        
+        return self._subconjunto(self, mascara)
+    
+    def _codigos_e_categorias(self, dimensao):
+        if dimensao == 'dia_semana':
+            # O -1 no fim da tabela faz o código de dia -1 (sem data) continuar -1
+            dias_semana = np.append(self._categorias['dia'].dayofweek.to_numpy(), -1)
+            return dias_semana[self._codigos['dia']], pd.Index(DIAS_SEMANA)
+        return self._codigos[dimensao], self._categorias[dimensao]
+    
+    def agregar(self, *dimensoes):
+        """
+        Soma as ocorrências por uma ou mais dimensões, mantendo os códigos das categorias
+        
+        Parâmetros:
+        dimensoes (str): 'dia', 'hora', 'local', 'tipo', 'status' ou 'dia_semana'
+        
+        Retorna:
+        tuple: (códigos de cada dimensão, contagens, categorias de cada dimensão), com
+        uma posição por combinação com ocorrências, ordenadas pelos códigos (a
+        primeira dimensão varia mais devagar)
+        """
+        codigos, categorias = zip(*[self._codigos_e_categorias(d) for d in dimensoes])
+        tamanhos = [max(len(c), 1) for c in categorias]
+        
+        validos = np.logical_and.reduce([c >= 0 for c in codigos])
+        chave = np.ravel_multi_index([c[validos] for c in codigos], tamanhos)
+        pesos = self._contagem[validos]
+        
+        combinacoes = int(np.prod(tamanhos))
+        if combinacoes <= LIMITE_BINCOUNT:
+            soma = np.bincount(chave, weights=pesos, minlength=combinacoes)
+            celulas = np.flatnonzero(soma)
+            contagem = soma[celulas]
+        else:
+            celulas, inverso = np.unique(chave, return_inverse=True)
+            contagem = np.bincount(inverso, weights=pesos)
+        
+        partes = np.unravel_index(celulas, tamanhos)
+        return list(partes), contagem.astype(np.int64), list(categorias)
+    
+    def contar(self, *dimensoes):
+        """
+        Conta as ocorrências por uma ou mais dimensões
+        
+        Parâmetros:
+        dimensoes (str): 'dia', 'hora', 'local', 'tipo', 'status' ou 'dia_semana'
+        
+        Retorna:
+        Series: Contagem (apenas valores com ocorrências), indexada pelos valores das
+        dimensões (MultiIndex para mais de uma), na ordem das categorias
+        """
+        partes, contagem, categorias = self.agregar(*dimensoes)
+        if len(dimensoes) == 1:
+            indice = categorias[0][partes[0]].rename(dimensoes[0])
+        else:
+            indice = pd.MultiIndex.from_arrays(
+                [categoria[parte] for categoria, parte in zip(categorias, partes)], names=list(dimensoes)
+            )
+        return pd.Series(contagem, index=indice, name='Contagem')
@@ -0,0 +1,197 @@
+"""
+Detecção de picos de eventos no TroubleLog
+
+As séries de contagem saem do cubo de ocorrências (agregados.CuboOcorrencias):
+eventos por local e dia, para dispositivos instáveis (que disparam repetidamente),
+e eventos de todos os locais por hora, para tempestades de eventos. Cada período
+é comparado com duas linhas de base calculadas apenas com os períodos anteriores:
+
+- z robusto: mediana e MAD (desvio absoluto mediano) de uma janela móvel, que
+  não são puxados pelos próprios picos do histórico;
+- z EWMA: média e desvio com pesos exponenciais, que acompanham mudanças
+  graduais de nível.
+
+Um período é marcado quando passa dos dois limites e tem um mínimo de eventos.
+O cálculo é vetorizado em NumPy sobre todas as séries de uma vez (em blocos de
+locais, para limitar a memória das janelas móveis).
+"""
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+import agregados
+
+# Janelas da linha de base robusta e período (span) da média exponencial
+JANELA_DIAS = 14
+JANELA_HORAS = 7 * 24
+SPAN_DIAS = 7
+SPAN_HORAS = 24
+
+# Limites para marcar um período
+LIMIAR_Z_ROBUSTO = 3.5
+LIMIAR_Z_EWMA = 3.0
+MINIMO_EVENTOS_DIA = 5
+MINIMO_EVENTOS_HORA = 20
+
+# Escala mínima (em eventos) para séries quase sempre zeradas, onde o MAD e o desvio são 0
+DISPERSAO_MINIMA = 1.0
+
+# Quantidade máxima de valores nas janelas móveis de um bloco de séries
+ELEMENTOS_POR_BLOCO = 5_000_000
+
+COLUNAS_ANOMALIAS = ['tipo', 'local', 'inicio', 'eventos', 'esperado', 'z_robusto', 'z_ewma']
+
+TIPO_INSTAVEL = "Dispositivo instável"
+TIPO_TEMPESTADE = "Tempestade de eventos"
+
+def pontuar_series(series, janela, span):
+    """
+    Calcula a linha de base e os z-scores de cada período em relação aos anteriores
+    
+    Parâmetros:
+    series (ndarray): Contagens [série, período]
+    janela (int): Períodos anteriores usados na mediana e no MAD
+    span (int): Span da média exponencial
+    
+    Retorna:
+    tuple: (esperado, z_robusto, z_ewma), arrays do mesmo formato de series. O
+    esperado (mediana da janela) e o z robusto são NaN nos primeiros janela
+    períodos, sem histórico suficiente
+    """
+    series = np.asarray(series, dtype=np.float64)
+    periodos = series.shape[1]
+    esperado = np.full(series.shape, np.nan)
+    z_robusto = np.full(series.shape, np.nan)
+    
+    if periodos > janela:
+        # Janela que termina no período anterior a cada período pontuado
+        janelas = sliding_window_view(series, janela, axis=1)[:, :-1]
+        mediana = np.median(janelas, axis=2)
+        mad = np.median(np.abs(janelas - mediana[..., np.newaxis]), axis=2)
+        esperado[:, janela:] = mediana
+        z_robusto[:, janela:] = (series[:, janela:] - mediana) / (1.4826 * np.maximum(mad, DISPERSAO_MINIMA))
+    
+    # Média e desvio exponenciais até o período anterior
+    exponencial = pd.DataFrame(series.T).ewm(span=span, adjust=False)
+    media = exponencial.mean().to_numpy().T
+    desvio = np.nan_to_num(exponencial.std().to_numpy().T)
+    z_ewma = np.full(series.shape, np.nan)
+    z_ewma[:, 1:] = (series[:, 1:] - media[:, :-1]) / np.maximum(desvio[:, :-1], DISPERSAO_MINIMA)
+    
+    return esperado, z_robusto, z_ewma
+
+def _marcar(series, janela, span, minimo_eventos):
+    """Pontua as séries e retorna (série, período) dos picos com as respectivas métricas"""
+    esperado, z_robusto, z_ewma = pontuar_series(series, janela, span)
+    marcado = (z_robusto >= LIMIAR_Z_ROBUSTO) & (z_ewma >= LIMIAR_Z_EWMA) & (series >= minimo_eventos)
+    linhas, periodos = np.nonzero(marcado)
+    return (
+        linhas, periodos, series[linhas, periodos],
+        esperado[linhas, periodos], z_robusto[linhas, periodos], z_ewma[linhas, periodos]
+    )
+
+def _dias_do_log(dias):
+    """Deslocamento (em dias) de cada dia do cubo em relação ao primeiro, e a quantidade de dias do período"""
+    deslocamento = ((dias - dias[0]) // pd.Timedelta(days=1)).to_numpy()
+    return deslocamento, int(deslocamento[-1]) + 1
+
+def detectar_instaveis(cubo, janela=JANELA_DIAS, span=SPAN_DIAS, minimo_eventos=MINIMO_EVENTOS_DIA):
+    """
+    Procura dias em que um local teve muito mais eventos que o seu histórico recente
+    
+    Parâmetros:
+    cubo (CuboOcorrencias): Contagens das ocorrências
+    janela, span (int): Ver pontuar_series (em dias)
+    minimo_eventos (int): Eventos no dia abaixo dos quais o dia não é marcado
+    
+    Retorna:
+    DataFrame: Um pico por linha [tipo, local, inicio, eventos, esperado, z_robusto, z_ewma]
+    """
+    (codigos_local, codigos_dia), contagem, (locais, dias) = cubo.agregar('local', 'dia')
+    if len(contagem) == 0:
+        return pd.DataFrame(columns=COLUNAS_ANOMALIAS)
+    
+    deslocamento, periodos = _dias_do_log(dias)
+    colunas = deslocamento[codigos_dia]
+    
+    # Só locais com algum dia acima do mínimo podem ser marcados; cada um ganha uma linha
+    candidatos = np.unique(codigos_local[contagem >= minimo_eventos])
+    linha_local = np.full(len(locais), -1)
+    linha_local[candidatos] = np.arange(len(candidatos))
+    
+    # Séries densas (locais × dias, com zeros nos dias sem eventos), um bloco de locais por vez
+    tamanho_bloco = max(1, ELEMENTOS_POR_BLOCO // (periodos * janela))
+    resultados = []
+    for primeiro in range(0, len(candidatos), tamanho_bloco):
+        bloco = candidatos[primeiro:primeiro + tamanho_bloco]
+        inicio, fim = np.searchsorted(codigos_local, [bloco[0], bloco[-1] + 1])
+        linhas = linha_local[codigos_local[inicio:fim]]
+        no_bloco = linhas >= 0
+        series = np.zeros((len(bloco), periodos))
+        series[linhas[no_bloco] - primeiro, colunas[inicio:fim][no_bloco]] = contagem[inicio:fim][no_bloco]
+        
+        linhas, periodos_marcados, eventos, esperado, z_robusto, z_ewma = _marcar(series, janela, span, minimo_eventos)
+        resultados.append(pd.DataFrame({
+            'tipo': TIPO_INSTAVEL,
+            'local': locais[bloco[linhas]],
+            'inicio': dias[0] + pd.to_timedelta(periodos_marcados, unit='D'),
+            'eventos': eventos.astype(np.int64),
+            'esperado': esperado,
+            'z_robusto': z_robusto,
+            'z_ewma': z_ewma,
+        }, columns=COLUNAS_ANOMALIAS))
+    
+    if not resultados:
+        return pd.DataFrame(columns=COLUNAS_ANOMALIAS)
+    return pd.concat(resultados, ignore_index=True)
+
+def detectar_tempestades(cubo, janela=JANELA_HORAS, span=SPAN_HORAS, minimo_eventos=MINIMO_EVENTOS_HORA):
+    """
+    Procura horas em que o total de eventos (todos os locais) ficou muito acima do histórico recente
+    
+    Parâmetros:
+    cubo (CuboOcorrencias): Contagens das ocorrências
+    janela, span (int): Ver pontuar_series (em horas)
+    minimo_eventos (int): Eventos na hora abaixo dos quais a hora não é marcada
+    
+    Retorna:
+    DataFrame: Um pico por linha [tipo, local, inicio, eventos, esperado, z_robusto, z_ewma]
+    """
+    (codigos_dia, horas), contagem, (dias, _) = cubo.agregar('dia', 'hora')
+    if len(contagem) == 0 or contagem.max() < minimo_eventos:
+        return pd.DataFrame(columns=COLUNAS_ANOMALIAS)
+    
+    deslocamento, periodos = _dias_do_log(dias)
+    serie = np.zeros((1, periodos * 24))
+    serie[0, deslocamento[codigos_dia] * 24 + horas] = contagem
+    
+    _, periodos_marcados, eventos, esperado, z_robusto, z_ewma = _marcar(serie, janela, span, minimo_eventos)
+    return pd.DataFrame({
+        'tipo': TIPO_TEMPESTADE,
+        'local': "(todos)",
+        'inicio': dias[0] + pd.to_timedelta(periodos_marcados, unit='h'),
+        'eventos': eventos.astype(np.int64),
+        'esperado': esperado,
+        'z_robusto': z_robusto,
+        'z_ewma': z_ewma,
+    }, columns=COLUNAS_ANOMALIAS)
+
+def detectar_anomalias(cubo):
+    """
+    Procura dispositivos instáveis e tempestades de eventos, da mais para a menos severa
+    
+    Reconhecimentos e reinícios da central (agregados.LOCAIS_GENERICOS) não
+    entram nas séries.
+    
+    Parâmetros:
+    cubo (CuboOcorrencias): Contagens das ocorrências
+    
+    Retorna:
+    DataFrame: Um pico por linha [tipo, local, inicio, eventos, esperado,
+    z_robusto, z_ewma], ordenado pelo z robusto (severidade) decrescente
+    """
+    dispositivos = cubo.filtrar(excluir_locais=agregados.LOCAIS_GENERICOS)
+    anomalias = pd.concat(
+        [detectar_tempestades(dispositivos), detectar_instaveis(dispositivos)], ignore_index=True
+    )
+    return anomalias.sort_values('z_robusto', ascending=False, ignore_index=True)
@@ -1,12 +1,18 @@
 import streamlit as st
 import pandas as pd
-import re
-from datetime import datetime, timedelta
 import io
 import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
 import warnings
+from datetime import timedelta
+
+import agregados
+import anomalias
+import episodios
+import filtros
+import historico
+import troublelog
 
 # Suprimir os avisos FutureWarning específicos do pandas
 warnings.simplefilter(action='ignore', category=FutureWarning)
@@ -18,158 +24,196 @@ st.set_page_config(
 
 st.title("Analisador de Log de Problemas")
 
-# Função para processar o arquivo de log
-def processar_troublelog(conteudo):
-    # Remover cabeçalhos de página
-    conteudo = re.sub(r'-{80,}\nService Port\s+Page \d+\nReport 2 : Trouble Historical Log\s+\d+:\d+:\d+\s+\w+ \d+-\w+-\d+\n-{80,}', '', conteudo)
-    
-    # Dividir o conteúdo em linhas e remover linhas vazias
-    linhas = [linha for linha in conteudo.split('\n') if linha.strip()]
-    
-    registros = []
-    i = 0
-    total_linhas = len(linhas)
+# Intervalo entre as atualizações da barra de progresso durante a leitura
+INTERVALO_ATUALIZACAO_S = 0.1
+
+# Período sugerido ao carregar do histórico (dias até o último registro do painel)
+PERIODO_HISTORICO_DIAS = 30
+
+# Nomes exibidos das colunas dos episódios de problema
+COLUNAS_EPISODIOS = {
+    'local': 'Local', 'tipo': 'Tipo de Dispositivo', 'status': 'Status', 'grupo': 'Grupo',
+    'inicio': 'Início', 'reconhecimento': 'Reconhecimento', 'fim': 'Normalização',
+    'eventos': 'Eventos', 'tempo_reconhecimento': 'Tempo até Reconhecimento', 'duracao': 'Duração'
+}
+
+# Nomes exibidos das colunas das anomalias de taxa de eventos
+COLUNAS_ANOMALIAS = {
+    'tipo': 'Tipo', 'local': 'Local', 'inicio': 'Início', 'eventos': 'Eventos',
+    'esperado': 'Esperado (mediana)', 'z_robusto': 'Severidade (z robusto)', 'z_ewma': 'z EWMA'
+}
+
+# Função para processar os arquivos de log (um ou mais, combinados em um único histórico)
+def processar_troublelog(arquivos):
+    # A leitura roda em uma thread (e é reaproveitada para os mesmos arquivos);
+    # aqui a página apenas acompanha o andamento
+    leitura = troublelog.iniciar_leitura(arquivos)
     
     # Criar uma barra de progresso para arquivos grandes
     progress_bar = st.progress(0)
     status_text = st.empty()
     
-    while i < total_linhas:
-        # Atualizar progresso a cada 1000 linhas
-        if i % 1000 == 0:
-            progress = min(i / total_linhas, 1.0)
-            progress_bar.progress(progress)
-            status_text.text(f"Processando... {i}/{total_linhas} linhas ({int(progress*100)}%)")
-        
-        linha = linhas[i]
-        
-        # Verificar se a linha começa com "ENTRY"
-        entry_match = re.match(r'ENTRY (\d+)\s+(\d+:\d+:\d+)\s+(\w+) (\d+-\w+-\d+) (.+?)$', linha)
-        if entry_match:
-            entry_num = entry_match.group(1).strip()
-            hora = entry_match.group(2).strip()
-            dia_semana = entry_match.group(3).strip()
-            data = entry_match.group(4).strip()
-            local = entry_match.group(5).strip()
-            
-            # Inicializar tipo_dispositivo e status
-            tipo_dispositivo = ""
-            status = ""
-            
-            # Verificar se há informações adicionais na próxima linha
-            if i + 1 < total_linhas:
-                proxima_linha = linhas[i + 1]
-                # Se a próxima linha não começa com "ENTRY", assume que contém tipo_dispositivo e status
-                if not proxima_linha.startswith("ENTRY"):
-                    # Busca por dois blocos de texto separados por múltiplos espaços
-                    info_match = re.search(r'^\s+(.+?)\s{2,}(.+?)$', proxima_linha)
-                    if info_match:
-                        tipo_dispositivo = info_match.group(1).strip()
-                        status = info_match.group(2).strip()
-                        i += 1  # Avança para a próxima linha, já que foi processada
-            
-            # Tratamento especial para entradas com "ACKNOWLEDGED"
-            if "TROUBLES ACKNOWLEDGED" in local:
-                if "AT MAIN PANEL" in local:
-                    partes = local.split("AT MAIN PANEL")
-                    local = "TROUBLES"
-                    status = "ACKNOWLEDGED"
-                    tipo_dispositivo = "AT MAIN PANEL"
-            
-            if "SUPERVISORIES ACKNOWLEDGED" in local:
-                if "AT MAIN PANEL" in local:
-                    partes = local.split("AT MAIN PANEL")
-                    local = "SUPERVISORIES"
-                    status = "ACKNOWLEDGED"
-                    tipo_dispositivo = "AT MAIN PANEL"
-            
-            # Converter data para formato padrão
-            try:
-                data_obj = datetime.strptime(f"{dia_semana} {data}", "%a %d-%b-%y")
-                data_formatada = data_obj.strftime("%d-%m-%Y")
-                # Adicionar data como objeto datetime para facilitar a análise temporal
-                data_datetime = data_obj
-            except:
-                data_formatada = data
-                data_datetime = None
-            
-            # Extrair a hora como número para análise temporal
-            try:
-                hora_parts = hora.split(':')
-                hora_numero = int(hora_parts[0])
-            except:
-                hora_numero = 0
-            
-            registros.append({
-                "Entrada": entry_num,
-                "Hora": hora,
-                "Hora_Numero": hora_numero,
-                "Data": data_formatada,
-                "Data_Obj": data_datetime,
-                "Dia da Semana": dia_semana,
-                "Local": local,
-                "Tipo de Dispositivo": tipo_dispositivo,
-                "Status": status
-            })
-        
-        i += 1
+    while not leitura.aguardar(INTERVALO_ATUALIZACAO_S):
+        progress = leitura.progresso
+        progress_bar.progress(progress)
+        status_text.text(f"Processando... {leitura.linhas_lidas}/{leitura.total_linhas} linhas ({int(progress*100)}%)")
+    
+    df = leitura.obter_dataframe()
     
     # Completar a barra de progresso
     progress_bar.progress(1.0)
-    status_text.text(f"Processamento concluído! {len(registros)} registros encontrados.")
-    
-    df = pd.DataFrame(registros)
+    status_text.text(f"Processamento concluído! {len(df)} registros encontrados.")
+    if leitura.registros_repetidos:
+        st.sidebar.info(f"Registros repetidos entre os arquivos descartados: {leitura.registros_repetidos}")
     
+    # Intervalos de registros ausentes (calculados sobre o log completo, antes dos filtros)
+    lacunas = troublelog.detectar_lacunas(df["Entrada"])
+    verificar_registros(df, lacunas)
+    return df, lacunas, leitura.chave
+
+# Função para informar na barra lateral os registros lidos e os ausentes
+def verificar_registros(df, lacunas):
     # Verificar se capturamos todos os registros esperados
-    if len(registros) > 0:
-        ultimo_registro = int(registros[-1]["Entrada"])
-        st.sidebar.info(f"Registros processados: {len(registros)} / Último registro: #{ultimo_registro}")
-        
-        # Verificar se há registros ausentes
-        entries = [int(r["Entrada"]) for r in registros]
-        entries_set = set(entries)
-        expected_entries = set(range(1, ultimo_registro + 1))
-        missing_entries = expected_entries - entries_set
-        if missing_entries:
-            st.sidebar.warning(f"Registros ausentes: {len(missing_entries)}")
-            st.sidebar.write(f"IDs ausentes: {sorted(list(missing_entries))[:10]}...")
-    
-    return df
+    if len(df) > 0:
+        ultimo_registro = int(df["Entrada"].iloc[-1])
+        st.sidebar.info(f"Registros processados: {len(df)} / Último registro: #{ultimo_registro}")
+        
+        # Informar os intervalos de registros ausentes
+        if not lacunas.empty:
+            st.sidebar.warning(f"Registros ausentes: {int(lacunas['ausentes'].sum())} em {len(lacunas)} intervalos")
+            intervalos = [
+                f"{inicio}" if inicio == fim else f"{inicio}–{fim}"
+                for inicio, fim in zip(lacunas['inicio'].head(10), lacunas['fim'].head(10))
+            ]
+            st.sidebar.write(f"Intervalos ausentes: {', '.join(intervalos)}{'...' if len(lacunas) > 10 else ''}")
+
+# Função para gravar no histórico do painel os registros novos dos arquivos, uma vez por sessão,
+# painel e conjunto de arquivos (as próximas execuções da página reaproveitam a quantidade gravada)
+def salvar_no_historico(painel, chave, df):
+    salvo = f"salvo_historico:{painel}:{chave}"
+    if salvo not in st.session_state:
+        st.session_state[salvo] = historico.salvar_registros(painel, df)
+    return st.session_state[salvo]
+
+# Período do histórico de um painel, lido uma vez (e de novo quando o painel recebe novos registros)
+@st.cache_resource(max_entries=troublelog.MAXIMO_LEITURAS_GUARDADAS)
+def ler_historico(painel, inicio, fim, registros):
+    return historico.carregar_registros(painel, inicio, fim)
+
+# Função para escolher na barra lateral o painel e o período a carregar do histórico
+def escolher_periodo_historico():
+    paineis = historico.listar_paineis()
+    if not paineis:
+        st.sidebar.info("O histórico ainda está vazio. Carregue arquivos com a opção \"Salvar no histórico\" ativada.")
+        return None
+    
+    painel = st.sidebar.selectbox("Painel:", paineis)
+    registros, primeiro, ultimo = historico.resumo_painel(painel)
+    if pd.isna(primeiro):
+        st.sidebar.info(f"{registros} registros no histórico de {painel}, nenhum com data válida.")
+        return painel, None, None, registros
+    st.sidebar.caption(f"{registros} registros de {primeiro:%d/%m/%Y} a {ultimo:%d/%m/%Y}")
+    
+    # Sem "todo o histórico", apenas o período escolhido é lido do banco
+    if st.sidebar.checkbox("Todo o histórico"):
+        return painel, None, None, registros
+    periodo = st.sidebar.date_input(
+        "Período a carregar:",
+        value=(max(primeiro.date(), ultimo.date() - timedelta(days=PERIODO_HISTORICO_DIAS)), ultimo.date()),
+        min_value=primeiro.date(),
+        max_value=ultimo.date()
+    )
+    if len(periodo) != 2:
+        return None
+    return painel, periodo[0], periodo[1], registros
+
+# Função para carregar um período do histórico no lugar dos arquivos enviados
+def carregar_historico(painel, inicio, fim, registros):
+    df = ler_historico(painel, inicio, fim, registros)
+    lacunas = troublelog.detectar_lacunas(df["Entrada"])
+    verificar_registros(df, lacunas)
+    # A quantidade de registros do painel entra na chave: novos registros geram novos cubos e índices
+    return df, lacunas, f"historico:{painel}:{inicio}:{fim}:{registros}"
+
+# Cubo de contagens do arquivo, montado uma vez e reaproveitado nas próximas execuções da página
+@st.cache_resource(max_entries=troublelog.MAXIMO_LEITURAS_GUARDADAS)
+def obter_cubo(chave, _df):
+    return agregados.CuboOcorrencias(_df)
+
+# Episódios de problema do arquivo (log completo, antes dos filtros), reconstruídos uma vez por arquivo
+@st.cache_resource(max_entries=troublelog.MAXIMO_LEITURAS_GUARDADAS)
+def obter_episodios(chave, _df):
+    return episodios.IndiceEpisodios(episodios.reconstruir_episodios(_df), _df['DataHora'].max())
+
+# Anomalias de taxa de eventos do arquivo (log completo, antes dos filtros), detectadas uma vez por arquivo
+@st.cache_resource(max_entries=troublelog.MAXIMO_LEITURAS_GUARDADAS)
+def obter_anomalias(chave, _cubo):
+    return anomalias.detectar_anomalias(_cubo)
+
+# Índices de valores para os filtros globais, criados uma vez por arquivo
+@st.cache_resource(max_entries=troublelog.MAXIMO_LEITURAS_GUARDADAS)
+def obter_indices_filtros(chave, _df):
+    return filtros.criar_indices(_df)
+
+# Função para o filtro de uma coluna: busca por texto e seleção múltipla entre os valores encontrados
+def filtro_com_busca(indice, rotulo):
+    busca = st.text_input(f"Buscar {rotulo.lower()}:", key=f"busca_{rotulo}")
+    
+    # Os valores já selecionados continuam entre as opções mesmo fora da busca atual
+    selecionados = st.session_state.get(f"selecao_{rotulo}", [])
+    opcoes = selecionados + [valor for valor in indice.buscar(busca) if valor not in selecionados]
+    st.caption(f"{len(indice)} valores distintos; a lista mostra até {filtros.LIMITE_SUGESTOES} resultados da busca.")
+    
+    return st.multiselect(
+        f"Selecione {rotulo.lower()}:",
+        opcoes,
+        key=f"selecao_{rotulo}",
+        format_func=lambda valor: f"{valor or '(vazio)'} ({indice.contagem(valor)})"
+    )
+
+# Função para converter uma contagem do cubo em tabela para os gráficos
+def tabela_contagem(contagem, *colunas):
+    tabela = contagem.reset_index()
+    tabela.columns = list(colunas) + ['Contagem']
+    return tabela
+
+# Função para montar a tabela de ocorrências por data (ordem cronológica)
+def contagem_por_data(cubo):
+    df_por_data = tabela_contagem(cubo.contar('dia'), 'Data')
+    df_por_data['Data'] = df_por_data['Data'].dt.date
+    return df_por_data
+
+# Função para a máscara dos registros de um período (datas inclusive) pela coluna DataHora
+def mascara_periodo(df, inicio, fim):
+    data_hora = df['DataHora']
+    return ((data_hora >= pd.Timestamp(inicio)) & (data_hora < pd.Timestamp(fim) + pd.Timedelta(days=1))).to_numpy()
 
 # Função para criar análises visuais dos dados
-def criar_visualizacoes(df):
+def criar_visualizacoes(df, cubo):
+    # Os gráficos consultam o cubo de contagens; apenas a tabela de registros
+    # do dia específico usa as linhas do DataFrame
     st.subheader("Análise Temporal")
     
     # Verificar se temos dados de data válidos
-    if 'Data_Obj' in df.columns and not df['Data_Obj'].isnull().all():
-        # Criar um dataframe agregado por data
-        df_por_data = df.groupby('Data').size().reset_index(name='Contagem')
-        
-        # Ordenar por data para visualização cronológica
-        if 'Data_Formatada' in df.columns and not df['Data_Formatada'].isnull().all():
-            min_date = df['Data_Formatada'].min()
-            max_date = df['Data_Formatada'].max()
-        else:
-            # Usar datas como estão se não pudermos converter
-            min_date = None
-            max_date = None
+    dias = cubo.dias
+    if len(dias) > 0:
+        # Ocorrências por data
+        df_por_data = contagem_por_data(cubo)
+        min_date = dias[0].date()
+        max_date = dias[-1].date()
         
         # Criar seletores de data
         col1, col2, col3 = st.columns([1, 1, 2])
         with col1:
             modo_visualizacao = st.radio("Modo de visualização:", ["Todas as datas", "Período específico", "Dia específico"])
         
-        if modo_visualizacao == "Período específico" and min_date and max_date:
+        if modo_visualizacao == "Período específico":
             with col2:
                 data_inicio = st.date_input("Data inicial", min_date)
                 data_fim = st.date_input("Data final", max_date)
             
-            # Filtrar dataframe por período
-            df_filtrado = df[(df['Data_Formatada'] >= pd.to_datetime(data_inicio)) & 
-                            (df['Data_Formatada'] <= pd.to_datetime(data_fim))]
-            
-            # Criar dataframe agregado por data
-            df_periodo = df_filtrado.groupby('Data').size().reset_index(name='Contagem')
+            # Ocorrências por data no período
+            df_periodo = contagem_por_data(cubo.filtrar(inicio=data_inicio, fim=data_fim))
             
             # Gráfico de ocorrências por período
             fig = px.bar(df_periodo, x='Data', y='Contagem', 
@@ -180,63 +224,65 @@ def criar_visualizacoes(df):
             
             # Mostrar estatísticas do período
             st.subheader(f"Estatísticas do Período ({data_inicio.strftime('%d/%m/%Y')} a {data_fim.strftime('%d/%m/%Y')})")
-            total_ocorrencias = df_periodo['Contagem'].sum()
-            media_ocorrencias = df_periodo['Contagem'].mean()
-            max_ocorrencias = df_periodo['Contagem'].max()
-            data_max_ocorrencias = df_periodo.loc[df_periodo['Contagem'].idxmax(), 'Data']
-            
-            col1, col2, col3 = st.columns(3)
-            col1.metric("Total de ocorrências", total_ocorrencias)
-            col2.metric("Média diária", f"{media_ocorrencias:.2f}")
-            col3.metric("Maior ocorrência", f"{max_ocorrencias} ({data_max_ocorrencias})")
+            if df_periodo.empty:
+                st.warning("Não há registros no período selecionado")
+            else:
+                total_ocorrencias = df_periodo['Contagem'].sum()
+                media_ocorrencias = df_periodo['Contagem'].mean()
+                max_ocorrencias = df_periodo['Contagem'].max()
+                data_max_ocorrencias = df_periodo.loc[df_periodo['Contagem'].idxmax(), 'Data']
+                
+                col1, col2, col3 = st.columns(3)
+                col1.metric("Total de ocorrências", total_ocorrencias)
+                col2.metric("Média diária", f"{media_ocorrencias:.2f}")
+                col3.metric("Maior ocorrência", f"{max_ocorrencias} ({data_max_ocorrencias.strftime('%d/%m/%Y')})")
             
-        elif modo_visualizacao == "Dia específico" and min_date and max_date:
+        elif modo_visualizacao == "Dia específico":
             with col2:
                 data_especifica = st.date_input("Selecione a data", max_date)
             
-            # Filtrar dataframe para a data específica
-            df_dia = df[df['Data_Formatada'].dt.date == data_especifica]
+            # Células do cubo para a data específica
+            cubo_dia = cubo.filtrar(inicio=data_especifica, fim=data_especifica)
             
             # Verificar se há dados para a data selecionada
-            if len(df_dia) > 0:
+            if cubo_dia.total > 0:
                 # Análise por hora para o dia específico
-                df_hora_dia = df_dia.groupby('Hora_Numero').size().reset_index(name='Contagem')
+                df_hora_dia = tabela_contagem(cubo_dia.contar('hora'), 'Hora')
                 
                 # Gráfico de ocorrências por hora no dia específico
-                fig_hora_dia = px.bar(df_hora_dia, x='Hora_Numero', y='Contagem',
+                fig_hora_dia = px.bar(df_hora_dia, x='Hora', y='Contagem',
                                     title=f'Ocorrências em {data_especifica.strftime("%d/%m/%Y")} por Hora',
-                                    labels={'Contagem': 'Número de Ocorrências', 'Hora_Numero': 'Hora'},
+                                    labels={'Contagem': 'Número de Ocorrências', 'Hora': 'Hora'},
                                     color='Contagem', color_continuous_scale='Viridis')
                 fig_hora_dia.update_xaxes(tickvals=list(range(0, 24)))
                 st.plotly_chart(fig_hora_dia, use_container_width=True)
                 
                 # Detalhamento por tipo de dispositivo nesse dia
-                if 'Tipo de Dispositivo' in df.columns and not df['Tipo de Dispositivo'].empty:
-                    st.subheader(f"Dispositivos com Problemas em {data_especifica.strftime('%d/%m/%Y')}")
-                    df_dispositivos_dia = df_dia[df_dia['Tipo de Dispositivo'] != ''].groupby('Tipo de Dispositivo').size().reset_index(name='Contagem')
-                    df_dispositivos_dia = df_dispositivos_dia.sort_values('Contagem', ascending=False)
-                    
-                    fig_disp_dia = px.bar(df_dispositivos_dia, y='Tipo de Dispositivo', x='Contagem',
-                                        labels={'Contagem': 'Número de Ocorrências', 'Tipo de Dispositivo': 'Dispositivo'},
-                                        color='Contagem', color_continuous_scale='Viridis',
-                                        orientation='h')
-                    st.plotly_chart(fig_disp_dia, use_container_width=True)
+                st.subheader(f"Dispositivos com Problemas em {data_especifica.strftime('%d/%m/%Y')}")
+                df_dispositivos_dia = tabela_contagem(cubo_dia.contar('tipo').drop('', errors='ignore'), 'Tipo de Dispositivo')
+                df_dispositivos_dia = df_dispositivos_dia.sort_values('Contagem', ascending=False)
+                
+                fig_disp_dia = px.bar(df_dispositivos_dia, y='Tipo de Dispositivo', x='Contagem',
+                                    labels={'Contagem': 'Número de Ocorrências', 'Tipo de Dispositivo': 'Dispositivo'},
+                                    color='Contagem', color_continuous_scale='Viridis',
+                                    orientation='h')
+                st.plotly_chart(fig_disp_dia, use_container_width=True)
                 
                 # Detalhamento por status nesse dia
-                if 'Status' in df.columns and not df['Status'].empty:
-                    st.subheader(f"Status de Falha em {data_especifica.strftime('%d/%m/%Y')}")
-                    df_status_dia = df_dia[df_dia['Status'] != ''].groupby('Status').size().reset_index(name='Contagem')
-                    df_status_dia = df_status_dia.sort_values('Contagem', ascending=False)
-                    
-                    fig_status_dia = px.bar(df_status_dia, y='Status', x='Contagem',
-                                            labels={'Contagem': 'Número de Ocorrências', 'Status': 'Status'},
-                                            color='Contagem', color_continuous_scale='Viridis',
-                                            orientation='h')
-                    st.plotly_chart(fig_status_dia, use_container_width=True)
+                st.subheader(f"Status de Falha em {data_especifica.strftime('%d/%m/%Y')}")
+                df_status_dia = tabela_contagem(cubo_dia.contar('status').drop('', errors='ignore'), 'Status')
+                df_status_dia = df_status_dia.sort_values('Contagem', ascending=False)
+                
+                fig_status_dia = px.bar(df_status_dia, y='Status', x='Contagem',
+                                        labels={'Contagem': 'Número de Ocorrências', 'Status': 'Status'},
+                                        color='Contagem', color_continuous_scale='Viridis',
+                                        orientation='h')
+                st.plotly_chart(fig_status_dia, use_container_width=True)
                 
                 # Tabela com todos os registros do dia
+                df_dia = df[mascara_periodo(df, data_especifica, data_especifica)]
                 st.subheader(f"Todos os Registros de {data_especifica.strftime('%d/%m/%Y')}")
-                st.dataframe(df_dia.drop(columns=['Data_Formatada', 'Data_Obj', 'Hora_Numero', 'Dia_Ordem'], errors='ignore'), use_container_width=True)
+                st.dataframe(df_dia, use_container_width=True)
             else:
                 st.warning(f"Não há registros para a data {data_especifica.strftime('%d/%m/%Y')}")
         else:
@@ -251,18 +297,7 @@ def criar_visualizacoes(df):
                         labels={'Contagem': 'Número de Ocorrências', 'Data': 'Data'},
                         color='Contagem', color_continuous_scale='Viridis')
             
-            if len(df_por_data) > 30:
-                # Se houver muitas datas, ajustar o layout para melhor visualização
-                fig.update_layout(xaxis={'categoryarray': df_por_data['Data'].tolist()})
-                if len(df_por_data) > 50:
-                    fig.update_layout(xaxis={'showticklabels': False})
-                    fig.add_annotation(
-                        text="Muitas datas para exibir os rótulos. Use o zoom ou filtros acima.",
-                        xref="paper", yref="paper",
-                        x=0.5, y=-0.15,
-                        showarrow=False
-                    )
-            
+            # O eixo é de datas: os rótulos se ajustam ao zoom mesmo com muitas datas
             st.plotly_chart(fig, use_container_width=True)
         
         # Top 5 dias com mais ocorrências
@@ -271,168 +306,232 @@ def criar_visualizacoes(df):
         st.dataframe(top_dias, use_container_width=True)
     
     # Análise por hora do dia
-    if 'Hora_Numero' in df.columns:
-        st.subheader("Análise por Hora do Dia")
-        df_por_hora = df.groupby('Hora_Numero').size().reset_index(name='Contagem')
-        
-        # Gráfico de ocorrências por hora
-        fig_hora = px.bar(df_por_hora, x='Hora_Numero', y='Contagem',
-                         title='Ocorrências por Hora do Dia',
-                         labels={'Contagem': 'Número de Ocorrências', 'Hora_Numero': 'Hora'},
-                         color='Contagem', color_continuous_scale='Viridis')
-        fig_hora.update_xaxes(tickvals=list(range(0, 24)))
-        st.plotly_chart(fig_hora, use_container_width=True)
+    st.subheader("Análise por Hora do Dia")
+    df_por_hora = tabela_contagem(cubo.contar('hora'), 'Hora')
+    
+    # Gráfico de ocorrências por hora
+    fig_hora = px.bar(df_por_hora, x='Hora', y='Contagem',
+                     title='Ocorrências por Hora do Dia',
+                     labels={'Contagem': 'Número de Ocorrências', 'Hora': 'Hora'},
+                     color='Contagem', color_continuous_scale='Viridis')
+    fig_hora.update_xaxes(tickvals=list(range(0, 24)))
+    st.plotly_chart(fig_hora, use_container_width=True)
     
     # Análise de locais específicos com mais problemas (descrição)
     st.subheader("Locais/Dispositivos Específicos com Mais Problemas")
     
-    if 'Local' in df.columns:
-        # Excluir entradas genéricas de reconhecimento
-        df_locais = df[~df['Local'].isin(['TROUBLES', 'SUPERVISORIES', 'HARDWARE RESET IN PROGRESS'])]
-        
-        # Pegar os 15 locais mais problemáticos
-        locais_contagem = df_locais.groupby('Local').size().reset_index(name='Contagem')
-        locais_contagem = locais_contagem.sort_values('Contagem', ascending=False).head(15)
-        
-        # Gráfico de barras horizontais para locais
-        fig_locais = px.bar(locais_contagem, y='Local', x='Contagem',
-                          title='Top 15 Locais/Dispositivos com Mais Problemas',
-                          labels={'Contagem': 'Número de Ocorrências', 'Local': 'Local/Dispositivo'},
-                          color='Contagem', color_continuous_scale='Viridis',
-                          orientation='h')
-        st.plotly_chart(fig_locais, use_container_width=True)
-        
-        # Análise combinada: Local x Tipo de Dispositivo
-        if 'Tipo de Dispositivo' in df.columns and not df['Tipo de Dispositivo'].empty:
-            st.subheader("Análise por Local e Tipo de Dispositivo")
-            df_local_tipo = df_locais.groupby(['Local', 'Tipo de Dispositivo']).size().reset_index(name='Contagem')
-            df_local_tipo = df_local_tipo.sort_values('Contagem', ascending=False).head(15)
-            
-            fig_local_tipo = px.bar(df_local_tipo, 
-                                   x='Contagem', 
-                                   y='Local',
-                                   color='Tipo de Dispositivo',
-                                   title='Ocorrências por Local e Tipo de Dispositivo',
-                                   labels={'Contagem': 'Número de Ocorrências', 'Local': 'Local/Dispositivo'},
-                                   orientation='h')
-            st.plotly_chart(fig_local_tipo, use_container_width=True)
-        
-        # Análise combinada: Local x Status
-        if 'Status' in df.columns and not df['Status'].empty:
-            st.subheader("Análise por Local e Status")
-            df_local_status = df_locais.groupby(['Local', 'Status']).size().reset_index(name='Contagem')
-            df_local_status = df_local_status.sort_values('Contagem', ascending=False).head(15)
-            
-            fig_local_status = px.bar(df_local_status, 
-                                     x='Contagem', 
-                                     y='Local',
-                                     color='Status',
-                                     title='Tipos de Problemas por Local',
-                                     labels={'Contagem': 'Número de Ocorrências', 'Local': 'Local/Dispositivo'},
-                                     orientation='h')
-            st.plotly_chart(fig_local_status, use_container_width=True)
+    # Excluir entradas genéricas de reconhecimento
+    cubo_locais = cubo.filtrar(excluir_locais=agregados.LOCAIS_GENERICOS)
+    
+    # Pegar os 15 locais mais problemáticos
+    locais_contagem = tabela_contagem(cubo_locais.contar('local'), 'Local')
+    locais_contagem = locais_contagem.sort_values('Contagem', ascending=False).head(15)
+    
+    # Gráfico de barras horizontais para locais
+    fig_locais = px.bar(locais_contagem, y='Local', x='Contagem',
+                      title='Top 15 Locais/Dispositivos com Mais Problemas',
+                      labels={'Contagem': 'Número de Ocorrências', 'Local': 'Local/Dispositivo'},
+                      color='Contagem', color_continuous_scale='Viridis',
+                      orientation='h')
+    st.plotly_chart(fig_locais, use_container_width=True)
+    
+    # Análise combinada: Local x Tipo de Dispositivo
+    st.subheader("Análise por Local e Tipo de Dispositivo")
+    df_local_tipo = tabela_contagem(cubo_locais.contar('local', 'tipo'), 'Local', 'Tipo de Dispositivo')
+    df_local_tipo = df_local_tipo.sort_values('Contagem', ascending=False).head(15)
+    
+    fig_local_tipo = px.bar(df_local_tipo, 
+                           x='Contagem', 
+                           y='Local',
+                           color='Tipo de Dispositivo',
+                           title='Ocorrências por Local e Tipo de Dispositivo',
+                           labels={'Contagem': 'Número de Ocorrências', 'Local': 'Local/Dispositivo'},
+                           orientation='h')
+    st.plotly_chart(fig_local_tipo, use_container_width=True)
+    
+    # Análise combinada: Local x Status
+    st.subheader("Análise por Local e Status")
+    df_local_status = tabela_contagem(cubo_locais.contar('local', 'status'), 'Local', 'Status')
+    df_local_status = df_local_status.sort_values('Contagem', ascending=False).head(15)
+    
+    fig_local_status = px.bar(df_local_status, 
+                             x='Contagem', 
+                             y='Local',
+                             color='Status',
+                             title='Tipos de Problemas por Local',
+                             labels={'Contagem': 'Número de Ocorrências', 'Local': 'Local/Dispositivo'},
+                             orientation='h')
+    st.plotly_chart(fig_local_status, use_container_width=True)
     
     # Análise de dispositivos mais problemáticos
     st.subheader("Dispositivos Mais Problemáticos")
     
-    if 'Tipo de Dispositivo' in df.columns and not df['Tipo de Dispositivo'].empty:
-        # Excluir dispositivos vazios
-        df_dispositivos = df[df['Tipo de Dispositivo'] != '']
-        
-        # Top dispositivos com problemas
-        dispositivos_contagem = df_dispositivos.groupby('Tipo de Dispositivo').size().reset_index(name='Contagem')
-        dispositivos_contagem = dispositivos_contagem.sort_values('Contagem', ascending=False).head(10)
-        
-        # Gráfico de barras horizontais
-        fig_disp = px.bar(dispositivos_contagem, y='Tipo de Dispositivo', x='Contagem',
-                         title='Top 10 Dispositivos com Problemas',
-                         labels={'Contagem': 'Número de Ocorrências', 'Tipo de Dispositivo': 'Dispositivo'},
-                         color='Contagem', color_continuous_scale='Viridis',
-                         orientation='h')
-        st.plotly_chart(fig_disp, use_container_width=True)
+    # Top dispositivos com problemas (excluindo dispositivos vazios)
+    dispositivos_contagem = tabela_contagem(cubo.contar('tipo').drop('', errors='ignore'), 'Tipo de Dispositivo')
+    dispositivos_contagem = dispositivos_contagem.sort_values('Contagem', ascending=False).head(10)
+    
+    # Gráfico de barras horizontais
+    fig_disp = px.bar(dispositivos_contagem, y='Tipo de Dispositivo', x='Contagem',
+                     title='Top 10 Dispositivos com Problemas',
+                     labels={'Contagem': 'Número de Ocorrências', 'Tipo de Dispositivo': 'Dispositivo'},
+                     color='Contagem', color_continuous_scale='Viridis',
+                     orientation='h')
+    st.plotly_chart(fig_disp, use_container_width=True)
     
     # Análise de status mais comuns
     st.subheader("Status de Falha Mais Comuns")
     
-    if 'Status' in df.columns and not df['Status'].empty:
-        # Excluir status vazios
-        df_status = df[df['Status'] != '']
-        
-        # Top status
-        status_contagem = df_status.groupby('Status').size().reset_index(name='Contagem')
-        status_contagem = status_contagem.sort_values('Contagem', ascending=False).head(10)
-        
-        # Gráfico de barras horizontais
-        fig_status = px.bar(status_contagem, y='Status', x='Contagem',
-                           title='Top 10 Status de Falha',
-                           labels={'Contagem': 'Número de Ocorrências', 'Status': 'Status'},
-                           color='Contagem', color_continuous_scale='Viridis',
-                           orientation='h')
-        st.plotly_chart(fig_status, use_container_width=True)
+    # Top status (excluindo status vazios)
+    status_contagem = tabela_contagem(cubo.contar('status').drop('', errors='ignore'), 'Status')
+    status_contagem = status_contagem.sort_values('Contagem', ascending=False).head(10)
+    
+    # Gráfico de barras horizontais
+    fig_status = px.bar(status_contagem, y='Status', x='Contagem',
+                       title='Top 10 Status de Falha',
+                       labels={'Contagem': 'Número de Ocorrências', 'Status': 'Status'},
+                       color='Contagem', color_continuous_scale='Viridis',
+                       orientation='h')
+    st.plotly_chart(fig_status, use_container_width=True)
     
     # Mapa de calor de ocorrências por dia da semana e hora
     st.subheader("Mapa de Calor: Dia da Semana × Hora")
     
-    if 'Dia da Semana' in df.columns and 'Hora_Numero' in df.columns:
-        # Criar mapeamento para ordenar dias da semana
-        dias_ordem = {'MON': 0, 'TUE': 1, 'WED': 2, 'THU': 3, 'FRI': 4, 'SAT': 5, 'SUN': 6}
-        
-        # Criar coluna com ordem dos dias
-        df['Dia_Ordem'] = df['Dia da Semana'].map(dias_ordem)
-        
-        # Agrupar por dia da semana e hora
-        heatmap_data = df.groupby(['Dia da Semana', 'Hora_Numero']).size().reset_index(name='Contagem')
-        
-        # Criar uma matriz com todos os dias da semana e horas
-        dias = list(dias_ordem.keys())
-        horas = list(range(24))
-        
-        # Criar um pivot table para o mapa de calor
-        pivot_data = heatmap_data.pivot_table(
-            values='Contagem', 
-            index='Dia da Semana', 
-            columns='Hora_Numero', 
-            fill_value=0
-        ).reindex(dias)
-        
-        # Criar o mapa de calor
-        fig_heatmap = px.imshow(
-            pivot_data,
-            labels=dict(x="Hora do Dia", y="Dia da Semana", color="Ocorrências"),
-            x=horas,
-            y=dias,
-            color_continuous_scale="Viridis",
-            title="Ocorrências por Dia da Semana e Hora"
-        )
-        
-        fig_heatmap.update_layout(xaxis=dict(tickmode='linear', tick0=0, dtick=1))
-        st.plotly_chart(fig_heatmap, use_container_width=True)
+    # Matriz 7 × 24 com todos os dias da semana e horas (zero onde não há ocorrências)
+    dias_semana = agregados.DIAS_SEMANA
+    horas = list(range(24))
+    pivot_data = cubo.contar('dia_semana', 'hora').unstack(fill_value=0).reindex(
+        index=dias_semana, columns=horas, fill_value=0
+    )
+    
+    # Criar o mapa de calor
+    fig_heatmap = px.imshow(
+        pivot_data,
+        labels=dict(x="Hora do Dia", y="Dia da Semana", color="Ocorrências"),
+        x=horas,
+        y=dias_semana,
+        color_continuous_scale="Viridis",
+        title="Ocorrências por Dia da Semana e Hora"
+    )
+    
+    fig_heatmap.update_layout(xaxis=dict(tickmode='linear', tick0=0, dtick=1))
+    st.plotly_chart(fig_heatmap, use_container_width=True)
 
-# Botão de upload do arquivo
-uploaded_file = st.file_uploader("Carregue o arquivo TroubleLog.txt", type=["txt"])
+# Função para exibir os episódios de problema (abertura → reconhecimento → normalização)
+def mostrar_episodios(indice):
+    tabela = indice.episodios
+    st.subheader("Episódios de Problema")
+    st.caption("Um episódio vai do primeiro status de problema de um local até a volta a NORMAL; "
+               "o reconhecimento é o primeiro TROUBLES/SUPERVISORIES ACKNOWLEDGED enquanto ele está ativo.")
+    
+    if tabela.empty:
+        st.info("Nenhum episódio de problema encontrado no log.")
+        return
+    
+    # Resumo geral
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Episódios", len(tabela))
+    col2.metric("Ativos no fim do log", int(tabela['fim'].isna().sum()))
+    col3.metric("MTTA (min)", f"{tabela['tempo_reconhecimento'].dt.total_seconds().mean() / 60:.1f}")
+    col4.metric("MTTR (min)", f"{tabela['duracao'].dt.total_seconds().mean() / 60:.1f}")
+    
+    # MTTA e MTTR por local ou por tipo de dispositivo
+    agrupamento = st.radio("Agrupar tempos médios por:", ["Local", "Tipo de Dispositivo"], horizontal=True)
+    tempos = episodios.tempos_medios(tabela, 'local' if agrupamento == "Local" else 'tipo')
+    tempos.columns = [agrupamento, 'Episódios', 'Reconhecidos', 'MTTA (min)', 'Encerrados', 'MTTR (min)']
+    
+    fig_tempos = px.bar(tempos.head(15), y=agrupamento, x='MTTR (min)', color='MTTA (min)',
+                        title=f'Top 15 por Tempo Médio até a Normalização ({agrupamento})',
+                        color_continuous_scale='Viridis', orientation='h')
+    st.plotly_chart(fig_tempos, use_container_width=True)
+    st.dataframe(tempos.round(1), use_container_width=True, hide_index=True)
+    
+    # Episódios ativos em um momento (consulta ao índice de intervalos)
+    st.subheader("Episódios Ativos em um Momento")
+    col1, col2 = st.columns(2)
+    with col1:
+        data_consulta = st.date_input("Data da consulta", indice.fim_log.date(), key='episodios_data')
+    with col2:
+        hora_consulta = st.time_input("Hora da consulta", indice.fim_log.time(), key='episodios_hora')
+    momento = pd.Timestamp.combine(data_consulta, hora_consulta)
+    
+    ativos = indice.ativos_em(momento)
+    st.write(f"{len(ativos)} episódios ativos em {momento.strftime('%d/%m/%Y %H:%M:%S')}")
+    st.dataframe(ativos.rename(columns=COLUNAS_EPISODIOS), use_container_width=True, hide_index=True)
 
-if uploaded_file is not None:
-    # Exibir informações sobre o arquivo
-    st.success(f"Arquivo carregado: {uploaded_file.name}")
+# Função para exibir os dispositivos instáveis e as tempestades de eventos, das mais severas para as menos
+def mostrar_anomalias(tabela, dias):
+    st.subheader("Anomalias na Taxa de Eventos")
+    st.caption(f"Cada dia de um local e cada hora do sistema são comparados com os {anomalias.JANELA_DIAS} dias "
+               f"(ou {anomalias.JANELA_HORAS} horas) anteriores: mediana/MAD (z robusto ≥ {anomalias.LIMIAR_Z_ROBUSTO}) "
+               f"e média exponencial (z EWMA ≥ {anomalias.LIMIAR_Z_EWMA}).")
+    
+    if len(dias) <= anomalias.JANELA_DIAS:
+        st.info(f"O log cobre {len(dias)} dias; dispositivos instáveis precisam de mais de {anomalias.JANELA_DIAS} dias de histórico.")
     
-    # Ler o conteúdo do arquivo
-    conteudo = uploaded_file.getvalue().decode("utf-8", errors="replace")
+    if tabela.empty:
+        st.info("Nenhuma anomalia encontrada no log.")
+        return
     
-    # Processar o conteúdo do arquivo
+    # Resumo por tipo de anomalia
+    instaveis = tabela[tabela['tipo'] == anomalias.TIPO_INSTAVEL]
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Tempestades de eventos", int((tabela['tipo'] == anomalias.TIPO_TEMPESTADE).sum()))
+    col2.metric("Dias de dispositivo instável", len(instaveis))
+    col3.metric("Locais instáveis", instaveis['local'].nunique())
+    
+    # Gráfico e tabela das anomalias, já ordenadas por severidade
+    df_anomalias = tabela.rename(columns=COLUNAS_ANOMALIAS)
+    fig_anomalias = px.scatter(df_anomalias, x='Início', y='Eventos', color='Tipo', size='Severidade (z robusto)',
+                               hover_data=['Local', 'Esperado (mediana)'], title='Anomalias por Momento e Quantidade de Eventos')
+    st.plotly_chart(fig_anomalias, use_container_width=True)
+    st.dataframe(df_anomalias.round({coluna: 1 for coluna in ['Esperado (mediana)', 'Severidade (z robusto)', 'z EWMA']}),
+                 use_container_width=True, hide_index=True)
+
+# Origem dos dados: arquivos enviados (opcionalmente gravados no histórico) ou um período do histórico
+st.sidebar.title("Origem dos Dados")
+origem = st.sidebar.radio("Carregar de:", ["Arquivos", "Histórico"], horizontal=True)
+uploaded_files = None
+periodo_historico = None
+
+if origem == "Histórico":
+    periodo_historico = escolher_periodo_historico()
+else:
+    painel = st.sidebar.text_input("Painel (central) dos arquivos:", historico.PAINEL_PADRAO)
+    salvar = st.sidebar.checkbox("Salvar no histórico", value=True)
+    
+    # Botão de upload dos arquivos
+    uploaded_files = st.file_uploader("Carregue um ou mais arquivos TroubleLog.txt", type=["txt"], accept_multiple_files=True)
+
+if uploaded_files or periodo_historico:
     try:
-        df = processar_troublelog(conteudo)
+        if uploaded_files:
+            # Exibir informações sobre os arquivos
+            st.success(f"Arquivos carregados: {', '.join(arquivo.name for arquivo in uploaded_files)}")
+            
+            # Processar o conteúdo dos arquivos
+            df, lacunas, chave = processar_troublelog([arquivo.getvalue() for arquivo in uploaded_files])
+            if salvar and painel.strip():
+                novos = salvar_no_historico(painel.strip(), chave, df)
+                st.sidebar.info(f"Registros novos no histórico de {painel.strip()}: {novos}")
+        else:
+            df, lacunas, chave = carregar_historico(*periodo_historico)
         
-        # Preparar o dataframe para análise
-        if 'Data' in df.columns:
-            df['Data_Formatada'] = pd.to_datetime(df['Data'], format='%d-%m-%Y', errors='coerce')
+        cubo = obter_cubo(chave, df)
+        indice_episodios = obter_episodios(chave, df)
+        tabela_anomalias = obter_anomalias(chave, cubo)
+        indices_filtros = obter_indices_filtros(chave, df)
         
         # Configuração dos filtros na barra lateral
         st.sidebar.title("Filtros Globais")
         
+        # Os filtros são combinados em uma máscara sobre os registros, aplicada uma vez no final
+        mascara = np.ones(len(df), dtype=bool)
+        
         # Filtro de data
-        if 'Data_Formatada' in df.columns and not df['Data_Formatada'].isnull().all():
-            min_date = df['Data_Formatada'].min().date()
-            max_date = df['Data_Formatada'].max().date()
+        dias = cubo.dias
+        if len(dias) > 0:
+            min_date = dias[0].date()
+            max_date = dias[-1].date()
             
             date_filter = st.sidebar.expander("Filtrar por Data", expanded=False)
             with date_filter:
@@ -448,47 +547,24 @@ if uploaded_file is not None:
                     
                     if len(date_range) == 2:
                         start_date, end_date = date_range
-                        df = df[(df['Data_Formatada'].dt.date >= start_date) & 
-                                (df['Data_Formatada'].dt.date <= end_date)]
-        
-        # Filtro de local
-        if 'Local' in df.columns and not df['Local'].empty:
-            local_filter = st.sidebar.expander("Filtrar por Local", expanded=False)
-            with local_filter:
-                use_local_filter = st.checkbox("Ativar filtro de local")
-                
-                if use_local_filter:
-                    locais = ["Todos"] + sorted(df['Local'].unique().tolist())
-                    local_selecionado = st.selectbox("Selecione o local:", locais)
-                    
-                    if local_selecionado != "Todos":
-                        df = df[df['Local'] == local_selecionado]
-        
-        # Filtro de tipo de dispositivo
-        if 'Tipo de Dispositivo' in df.columns and not df['Tipo de Dispositivo'].empty:
-            device_filter = st.sidebar.expander("Filtrar por Dispositivo", expanded=False)
-            with device_filter:
-                use_device_filter = st.checkbox("Ativar filtro de dispositivo")
-                
-                if use_device_filter:
-                    dispositivos = ["Todos"] + sorted(df['Tipo de Dispositivo'].unique().tolist())
-                    dispositivo_selecionado = st.selectbox("Selecione o dispositivo:", dispositivos)
-                    
-                    if dispositivo_selecionado != "Todos":
-                        df = df[df['Tipo de Dispositivo'] == dispositivo_selecionado]
+                        mascara &= mascara_periodo(df, start_date, end_date)
+                        cubo = cubo.filtrar(inicio=start_date, fim=end_date)
+        
+        # Filtros de local, tipo de dispositivo e status (nenhum valor selecionado = todos)
+        for coluna, rotulo, argumento in [
+            ('Local', "Local", 'locais'),
+            ('Tipo de Dispositivo', "Dispositivo", 'tipos'),
+            ('Status', "Status", 'status'),
+        ]:
+            with st.sidebar.expander(f"Filtrar por {rotulo}", expanded=False):
+                selecionados = filtro_com_busca(indices_filtros[coluna], rotulo)
+            
+            if selecionados:
+                mascara &= indices_filtros[coluna].mascara(selecionados)
+                cubo = cubo.filtrar(**{argumento: selecionados})
         
-        # Filtro de status
-        if 'Status' in df.columns and not df['Status'].empty:
-            status_filter = st.sidebar.expander("Filtrar por Status", expanded=False)
-            with status_filter:
-                use_status_filter = st.checkbox("Ativar filtro de status")
-                
-                if use_status_filter:
-                    status_list = ["Todos"] + sorted(df['Status'].unique().tolist())
-                    status_selecionado = st.selectbox("Selecione o status:", status_list)
-                    
-                    if status_selecionado != "Todos":
-                        df = df[df['Status'] == status_selecionado]
+        if not mascara.all():
+            df = df[mascara]
         
         # Exibir informações sobre os dados filtrados
         total_registros = len(df)
@@ -501,23 +577,21 @@ if uploaded_file is not None:
             st.metric("Total de registros", total_registros)
         with col2:
             if 'Local' in df.columns:
-                st.metric("Locais únicos", df['Local'].nunique())
+                st.metric("Locais únicos", len(cubo.contar('local')))
         with col3:
             if 'Status' in df.columns:
-                st.metric("Status diferentes", df['Status'].nunique())
+                st.metric("Status diferentes", len(cubo.contar('status')))
         
         # Criar abas para navegação
-        tab1, tab2, tab3 = st.tabs(["Dados", "Visualizações", "Estatísticas"])
+        tab1, tab2, tab3, tab4, tab5 = st.tabs(["Dados", "Visualizações", "Estatísticas", "Episódios", "Anomalias"])
         
         with tab1:
             # Exibir tabela com os dados
             st.subheader("Tabela de Logs")
-            # Remover colunas auxiliares usadas apenas para análise
-            display_df = df.drop(columns=['Hora_Numero', 'Data_Obj', 'Dia_Ordem', 'Data_Formatada'], errors='ignore')
-            st.dataframe(display_df, use_container_width=True)
+            st.dataframe(df, use_container_width=True)
             
             # Opção para download dos dados processados
-            csv = display_df.to_csv(index=False).encode('utf-8')
+            csv = df.to_csv(index=False).encode('utf-8')
             st.download_button(
                 label="Download dos dados em CSV",
                 data=csv,
@@ -527,39 +601,60 @@ if uploaded_file is not None:
         
         with tab2:
             # Criar visualizações dos dados
-            criar_visualizacoes(df)
+            criar_visualizacoes(df, cubo)
             
         with tab3:
             # Análise estatística básica
             st.subheader("Estatísticas")
-            subtab1, subtab2, subtab3 = st.tabs(["Locais", "Status", "Dispositivos"])
+            subtab1, subtab2, subtab3, subtab4 = st.tabs(["Locais", "Status", "Dispositivos", "Registros Ausentes"])
             
             with subtab1:
                 if 'Local' in df.columns and not df['Local'].empty:
                     st.subheader("Ocorrências por Local")
-                    local_counts = df['Local'].value_counts().reset_index()
-                    local_counts.columns = ['Local', 'Contagem']
+                    local_counts = tabela_contagem(cubo.contar('local').sort_values(ascending=False), 'Local')
                     st.dataframe(local_counts, use_container_width=True)
             
             with subtab2:
                 if 'Status' in df.columns and not df['Status'].empty:
                     st.subheader("Ocorrências por Status")
-                    status_counts = df['Status'].value_counts().reset_index()
-                    status_counts.columns = ['Status', 'Contagem']
+                    status_counts = tabela_contagem(cubo.contar('status').sort_values(ascending=False), 'Status')
                     st.dataframe(status_counts, use_container_width=True)
                     
             with subtab3:
                 if 'Tipo de Dispositivo' in df.columns and not df['Tipo de Dispositivo'].empty:
                     st.subheader("Ocorrências por Tipo de Dispositivo")
-                    device_counts = df['Tipo de Dispositivo'].value_counts().reset_index()
-                    device_counts.columns = ['Tipo de Dispositivo', 'Contagem']
+                    device_counts = tabela_contagem(cubo.contar('tipo').sort_values(ascending=False), 'Tipo de Dispositivo')
                     st.dataframe(device_counts, use_container_width=True)
-        
+            
+            with subtab4:
+                st.subheader("Intervalos de Registros Ausentes")
+                if lacunas.empty:
+                    st.info("Nenhum registro ausente na sequência de ENTRY.")
+                else:
+                    # Um novo trecho começa quando o contador de ENTRY da central reinicia
+                    df_lacunas = lacunas.rename(columns={
+                        'segmento': 'Trecho', 'inicio': 'Primeiro Ausente',
+                        'fim': 'Último Ausente', 'ausentes': 'Ausentes'
+                    })
+                    fig_lacunas = px.bar(df_lacunas, x='Primeiro Ausente', y='Ausentes', color='Trecho',
+                                         title='Registros Ausentes por Posição na Sequência',
+                                         labels={'Primeiro Ausente': 'Número da ENTRY', 'Ausentes': 'Registros Ausentes'})
+                    st.plotly_chart(fig_lacunas, use_container_width=True)
+                    st.dataframe(df_lacunas, use_container_width=True, hide_index=True)
+        
+        with tab4:
+            # Episódios calculados sobre o log completo (os reconhecimentos da central valem para todos os locais)
+            mostrar_episodios(indice_episodios)
+        
+        with tab5:
+            # Anomalias calculadas sobre o log completo (as linhas de base usam todo o histórico)
+            mostrar_anomalias(tabela_anomalias, dias)
+    
     except Exception as e:
         st.error(f"Erro ao processar o arquivo: {str(e)}")
 else:
     # Exibir instruções quando nenhum arquivo estiver carregado
-    st.info("Por favor, carregue um arquivo TroubleLog.txt para análise.")
+    st.info("Por favor, carregue um ou mais arquivos TroubleLog.txt para análise (ou escolha um período do histórico na barra lateral). Exportações sobrepostas da mesma central são combinadas sem repetir registros.")
     
     # Exemplo de como os dados serão exibidos
     st.subheader("Formato de Saída")
@@ -568,6 +663,7 @@ else:
         "Hora": ["4:12:32", "4:17:08", "4:46:00", "16:48:02"],
         "Data": ["15-01-2025", "15-01-2025", "15-01-2025", "15-01-2025"],
         "Dia da Semana": ["WED", "WED", "WED", "WED"],
+        "DataHora": pd.to_datetime(["2025-01-15 04:12:32", "2025-01-15 04:17:08", "2025-01-15 04:46:00", "2025-01-15 16:48:02"]),
         "Local": ["DF - FUNDO LOJA CHAME PIZZA L2 M3-57", "TROUBLES", "BOMBA JOCKEY ACIONADA", "DF - FUNDO LOJA CHAME PIZZA L2 M3-57"],
         "Tipo de Dispositivo": ["SMOKE DETECTOR", "AT MAIN PANEL", "SUPERVISORY MONITOR", "SMOKE DETECTOR"],
         "Status": ["EXCESSIVELY DIRTY", "ACKNOWLEDGED", "ABNORMAL", "HEAD MISSING"]
@@ -0,0 +1,190 @@
+"""
+Episódios de problema reconstruídos a partir dos registros do TroubleLog
+
+Um episódio começa quando um local registra um status de problema (qualquer
+status diferente de NORMAL), é reconhecido pelo primeiro "TROUBLES/SUPERVISORIES
+ACKNOWLEDGED AT MAIN PANEL" do seu grupo enquanto está ativo e termina quando o
+mesmo local volta a NORMAL. Novos status de problema com o episódio já aberto
+entram como eventos do mesmo episódio.
+
+A reconstrução é vetorizada: os eventos são ordenados uma vez por local e
+momento, e início, fim e reconhecimento de cada episódio saem de máscaras e
+buscas binárias sobre essa ordem. IndiceEpisodios guarda os episódios em um
+pd.IntervalIndex para consultar o que estava ativo em um momento ou período.
+"""
+import numpy as np
+import pandas as pd
+
+STATUS_NORMAL = "NORMAL"
+STATUS_RECONHECIDO = "ACKNOWLEDGED"
+
+# Grupos de reconhecimento na central (mesmos locais de troublelog.RECONHECIMENTOS)
+GRUPO_PROBLEMAS = "TROUBLES"
+GRUPO_SUPERVISAO = "SUPERVISORIES"
+
+# Tipos de dispositivo reconhecidos por "SUPERVISORIES ACKNOWLEDGED" (os demais, por "TROUBLES")
+MARCADOR_SUPERVISAO = "SUPERVISORY"
+
+COLUNAS_EPISODIOS = [
+    'local', 'tipo', 'status', 'grupo', 'inicio', 'reconhecimento', 'fim',
+    'eventos', 'tempo_reconhecimento', 'duracao'
+]
+
+def reconstruir_episodios(df):
+    """
+    Monta os episódios de problema de cada local
+    
+    Registros sem data válida (DataHora NaT), sem status ou de reinício de
+    hardware são ignorados. Registros no mesmo segundo mantêm a ordem do arquivo.
+    
+    Parâmetros:
+    df (DataFrame): Registros do TroubleLog (DataHora, Local, Tipo de Dispositivo, Status)
+    
+    Retorna:
+    DataFrame: Um episódio por linha [local, tipo, status, grupo, inicio,
+    reconhecimento, fim, eventos, tempo_reconhecimento, duracao], ordenado por
+    inicio. tipo e status são os do evento que abriu o episódio; reconhecimento
+    e fim são NaT quando não ocorreram no log (episódio ainda ativo no fim)
+    """
+    registros = df[df['DataHora'].notna()]
+    momentos = registros['DataHora'].to_numpy()
+    locais = registros['Local'].to_numpy()
+    status = registros['Status'].to_numpy()
+    
+    # Posição de cada registro na ordem cronológica (empates mantêm a ordem do arquivo)
+    ordem = np.argsort(momentos, kind='stable')
+    posicoes = np.empty(len(ordem), dtype=np.int64)
+    posicoes[ordem] = np.arange(len(ordem))
+    momentos_ordenados = momentos[ordem]
+    
+    # Reconhecimentos na central, por grupo, como posições ordenadas
+    reconhecido = status == STATUS_RECONHECIDO
+    reconhecimentos = {
+        grupo: np.sort(posicoes[reconhecido & (locais == grupo)])
+        for grupo in (GRUPO_PROBLEMAS, GRUPO_SUPERVISAO)
+    }
+    
+    # Eventos de dispositivo, ordenados por local e, dentro do local, cronologicamente
+    dispositivo = (status != '') & ~reconhecido
+    codigos_local, categorias_local = pd.factorize(locais[dispositivo])
+    posicoes_evento = posicoes[dispositivo]
+    sequencia = np.lexsort((posicoes_evento, codigos_local))
+    codigos_local = codigos_local[sequencia]
+    posicoes_evento = posicoes_evento[sequencia]
+    ativo = status[dispositivo][sequencia] != STATUS_NORMAL
+    tipos = registros['Tipo de Dispositivo'].to_numpy()[dispositivo][sequencia]
+    status_evento = status[dispositivo][sequencia]
+    
+    # Um episódio abre no problema que segue um NORMAL (ou o início do local) e
+    # fecha no primeiro NORMAL seguinte do mesmo local
+    novo_local = np.ones(len(ativo), dtype=bool)
+    novo_local[1:] = codigos_local[1:] != codigos_local[:-1]
+    anterior_ativo = np.zeros(len(ativo), dtype=bool)
+    anterior_ativo[1:] = ativo[:-1]
+    anterior_ativo &= ~novo_local
+    abertura = np.flatnonzero(ativo & ~anterior_ativo)
+    fechamento = np.flatnonzero(~ativo & anterior_ativo)
+    
+    episodio = np.cumsum(ativo & ~anterior_ativo) - 1
+    quantidade = len(abertura)
+    eventos = np.bincount(episodio[ativo], minlength=quantidade)
+    
+    posicao_inicio = posicoes_evento[abertura]
+    posicao_fim = np.full(quantidade, np.iinfo(np.int64).max)
+    posicao_fim[episodio[fechamento]] = posicoes_evento[fechamento]
+    
+    # Reconhecimento: primeiro do grupo do episódio depois da abertura e antes do fim
+    supervisao = pd.Series(tipos[abertura], dtype=object).str.contains(MARCADOR_SUPERVISAO, regex=False).to_numpy()
+    grupos = np.where(supervisao, GRUPO_SUPERVISAO, GRUPO_PROBLEMAS)
+    posicao_reconhecimento = np.full(quantidade, -1)
+    for grupo, posicoes_grupo in reconhecimentos.items():
+        do_grupo = grupos == grupo
+        seguinte = np.searchsorted(posicoes_grupo, posicao_inicio[do_grupo], side='right')
+        candidata = np.append(posicoes_grupo, -1)[seguinte]
+        valida = (candidata >= 0) & (candidata < posicao_fim[do_grupo])
+        posicao_reconhecimento[do_grupo] = np.where(valida, candidata, -1)
+    
+    # Posições de volta para momentos (-1 e "sem fim" viram NaT)
+    momentos_com_nulo = np.append(momentos_ordenados, np.datetime64('NaT'))
+    sem_posicao = len(momentos_ordenados)
+    inicio = momentos_ordenados[posicao_inicio]
+    fim = momentos_com_nulo[np.where(posicao_fim < sem_posicao, posicao_fim, sem_posicao)]
+    reconhecimento = momentos_com_nulo[np.where(posicao_reconhecimento >= 0, posicao_reconhecimento, sem_posicao)]
+    
+    episodios = pd.DataFrame({
+        'local': categorias_local[codigos_local[abertura]],
+        'tipo': tipos[abertura],
+        'status': status_evento[abertura],
+        'grupo': grupos,
+        'inicio': inicio,
+        'reconhecimento': reconhecimento,
+        'fim': fim,
+        'eventos': eventos,
+        'tempo_reconhecimento': reconhecimento - inicio,
+        'duracao': fim - inicio,
+    }, columns=COLUNAS_EPISODIOS)
+    return episodios.sort_values('inicio', kind='stable', ignore_index=True)
+
+def tempos_medios(episodios, por='local'):
+    """
+    Calcula o MTTA (tempo médio até o reconhecimento) e o MTTR (tempo médio até
+    a normalização) por local ou por tipo de dispositivo
+    
+    Episódios sem reconhecimento ficam fora do MTTA e episódios ainda ativos,
+    fora do MTTR.
+    
+    Parâmetros:
+    episodios (DataFrame): Resultado de reconstruir_episodios
+    por (str): 'local' ou 'tipo'
+    
+    Retorna:
+    DataFrame: Uma linha por valor de por [por, episodios, reconhecidos,
+    mtta_minutos, encerrados, mttr_minutos], ordenado por mttr_minutos decrescente
+    """
+    minutos_reconhecimento = episodios['tempo_reconhecimento'].dt.total_seconds() / 60
+    minutos_duracao = episodios['duracao'].dt.total_seconds() / 60
+    grupos = pd.DataFrame({
+        por: episodios[por],
+        'reconhecimento': minutos_reconhecimento,
+        'duracao': minutos_duracao,
+    }).groupby(por, sort=False)
+    
+    tempos = pd.DataFrame({
+        'episodios': grupos.size(),
+        'reconhecidos': grupos['reconhecimento'].count(),
+        'mtta_minutos': grupos['reconhecimento'].mean(),
+        'encerrados': grupos['duracao'].count(),
+        'mttr_minutos': grupos['duracao'].mean(),
+    })
+    return tempos.sort_values('mttr_minutos', ascending=False).reset_index()
+
+class IndiceEpisodios:
+    """
+    Episódios indexados por intervalo [inicio, fim) para consultas por momento ou período
+    
+    Episódios ainda ativos no fim do log são considerados ativos até o último
+    registro do log (inclusive).
+    """
+    
+    def __init__(self, episodios, fim_log):
+        """
+        Parâmetros:
+        episodios (DataFrame): Resultado de reconstruir_episodios
+        fim_log (datetime): Momento do último registro do log
+        """
+        self.fim_log = pd.Timestamp(fim_log)
+        fim = episodios['fim'].fillna(self.fim_log + pd.Timedelta(seconds=1))
+        self.episodios = episodios
+        self.intervalos = pd.IntervalIndex.from_arrays(episodios['inicio'], fim, closed='left')
+    
+    def __len__(self):
+        return len(self.intervalos)
+    
+    def ativos_em(self, momento):
+        """Episódios ativos no momento informado"""
+        return self.episodios[self.intervalos.contains(pd.Timestamp(momento))]
+    
+    def ativos_entre(self, inicio, fim):
+        """Episódios ativos em algum instante do período [inicio, fim]"""
+        periodo = pd.Interval(pd.Timestamp(inicio), pd.Timestamp(fim), closed='both')
+        return self.episodios[self.intervalos.overlaps(periodo)]
@@ -0,0 +1,107 @@
+"""
+Índices dos valores de Local, Tipo de Dispositivo e Status para os filtros globais
+
+Cada coluna é fatorada uma vez por arquivo: os valores distintos ficam
+ordenados, com a quantidade de registros de cada um, e cada registro guarda
+apenas o código do seu valor. A busca dos filtros usa busca binária para os
+valores que começam com o texto digitado e uma busca vetorizada para os que o
+contêm em outra posição; a seleção vira uma máscara sobre os códigos em vez de
+comparações de texto registro a registro.
+"""
+import numpy as np
+import pandas as pd
+
+# Colunas com filtro de seleção múltipla na barra lateral
+COLUNAS_FILTRO = ['Local', 'Tipo de Dispositivo', 'Status']
+
+# Quantidade máxima de valores sugeridos por busca
+LIMITE_SUGESTOES = 50
+
+class IndiceValores:
+    """
+    Valores distintos de uma coluna (ordenados), com contagens e o código de cada registro
+    """
+    
+    def __init__(self, coluna):
+        """
+        Parâmetros:
+        coluna (Series): Valores da coluna, um por registro
+        """
+        codigos, valores = pd.factorize(coluna, sort=True)
+        self.codigos = codigos.astype(np.int32)
+        self.valores = pd.Index(valores)
+        self.contagens = np.bincount(codigos[codigos >= 0], minlength=len(valores))
+        
+        # Busca sem diferenciar maiúsculas: chaves em maiúsculas e a sua ordem
+        self._chaves = np.array([str(valor).upper() for valor in valores], dtype=str)
+        self._ordem = np.argsort(self._chaves, kind='stable')
+        self._chaves_ordenadas = self._chaves[self._ordem]
+        
+        # Valores mais frequentes primeiro, para sugestões sem texto de busca
+        self._mais_frequentes = np.argsort(-self.contagens, kind='stable')
+    
+    def __len__(self):
+        return len(self.valores)
+    
+    def contagem(self, valor):
+        """Quantidade de registros com o valor (0 se não existir)"""
+        posicao = self.valores.get_indexer([valor])[0]
+        return int(self.contagens[posicao]) if posicao >= 0 else 0
+    
+    def buscar(self, texto, limite=LIMITE_SUGESTOES):
+        """
+        Procura os valores que contêm o texto (sem diferenciar maiúsculas)
+        
+        Parâmetros:
+        texto (str): Texto digitado (vazio retorna os valores mais frequentes)
+        limite (int): Quantidade máxima de valores retornados
+        
+        Retorna:
+        list: Valores que começam com o texto e, depois, os que o contêm em
+        outra posição, cada grupo do mais frequente para o menos frequente
+        """
+        texto = texto.strip().upper()
+        if not texto:
+            return self.valores[self._mais_frequentes[:limite]].tolist()
+        
+        # Prefixo: intervalo contíguo das chaves ordenadas
+        inicio = np.searchsorted(self._chaves_ordenadas, texto, side='left')
+        fim = np.searchsorted(self._chaves_ordenadas, texto + '\uffff', side='left')
+        prefixo = self._ordem[inicio:fim]
+        
+        # Demais posições do texto (busca vetorizada sobre todas as chaves)
+        contem = np.flatnonzero(np.char.find(self._chaves, texto) > 0)
+        
+        encontrados = [
+            grupo[np.argsort(-self.contagens[grupo], kind='stable')]
+            for grupo in (prefixo, contem)
+        ]
+        return self.valores[np.concatenate(encontrados)[:limite]].tolist()
+    
+    def mascara(self, selecionados):
+        """
+        Máscara dos registros cujo valor está entre os selecionados
+        
+        Parâmetros:
+        selecionados (list): Valores aceitos
+        
+        Retorna:
+        ndarray: Booleano, um item por registro da coluna indexada
+        """
+        permitidos = np.zeros(len(self.valores) + 1, dtype=bool)
+        posicoes = self.valores.get_indexer(list(selecionados))
+        permitidos[posicoes[posicoes >= 0]] = True
+        # O código -1 (valor ausente) cai na última posição, que nunca é permitida
+        return permitidos[self.codigos]
+
+def criar_indices(df):
+    """
+    Cria os índices das colunas de filtro de um DataFrame do TroubleLog
+    
+    Parâmetros:
+    df (DataFrame): Registros do TroubleLog
+    
+    Retorna:
+    dict: IndiceValores por coluna de COLUNAS_FILTRO
+    """
+    return {coluna: IndiceValores(df[coluna]) for coluna in COLUNAS_FILTRO}
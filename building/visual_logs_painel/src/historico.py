@@ -0,0 +1,273 @@
+"""
+Histórico persistente dos registros do TroubleLog, por painel (central)
+
+Os registros lidos são gravados em um banco SQLite local, separados pelo nome
+do painel. A chave primária (painel, DataHora, ENTRY, local) é a mesma usada
+para descartar repetições entre exportações sobrepostas, então gravar um novo
+arquivo acrescenta apenas os registros que ainda não estavam no histórico. A
+tabela é ordenada pela chave (WITHOUT ROWID), e a leitura de um período
+percorre apenas o trecho correspondente do painel.
+
+Cada registro guarda DataHora em segundos desde 1970 (o mesmo inteiro do
+datetime64[s]; registros sem data válida ficam com o valor do NaT, o menor
+inteiro de 64 bits, e só aparecem na leitura do histórico completo), a ENTRY
+como texto, exatamente como o troublelog a lê (a chave do histórico e a dos
+arquivos enviados continuam iguais), e, para as demais colunas de texto, o
+código do valor em um dicionário (tabela textos). A leitura devolve os textos
+a partir dos códigos com uma indexação do NumPy, sem criar uma string por
+registro no SQLite.
+"""
+import os
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+from troublelog import COLUNAS
+
+# Banco do histórico (pasta data do projeto, independente de onde o app é executado)
+CAMINHO_BANCO = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'historico.db')
+
+PAINEL_PADRAO = "Central"
+
+# Tempo que uma conexão espera por um bloqueio antes de desistir (busy timeout)
+TIMEOUT_BANCO_S = 5.0
+
+# Quantidade de linhas enviadas por executemany e lidas por fetchmany
+TAMANHO_LOTE = 5000
+
+# Quantidade de textos por consulta "IN (...)" (abaixo do limite de parâmetros do SQLite)
+TAMANHO_LOTE_CONSULTA = 500
+
+# Valor de DataHora dos registros sem data válida (representação inteira do NaT)
+SEM_DATA = int(np.datetime64('NaT', 's').view(np.int64))
+
+# Colunas da tabela de registros (na ordem de COLUNAS) e as que são códigos da tabela textos
+COLUNAS_BANCO = ['entrada', 'hora', 'data', 'dia_semana', 'datahora', 'local', 'tipo', 'status']
+COLUNAS_TEXTO = ['Hora', 'Data', 'Dia da Semana', 'Local', 'Tipo de Dispositivo', 'Status']
+
+_bancos_criados = set()
+_bancos_lock = threading.Lock()
+
+def conectar(caminho=None):
+    """
+    Abre o banco do histórico, criando a pasta e as tabelas na primeira vez
+    
+    Parâmetros:
+    caminho (str, opcional): Arquivo do banco (padrão: CAMINHO_BANCO)
+    
+    Retorna:
+    sqlite3.Connection: Conexão em modo WAL (leituras não bloqueiam a gravação)
+    """
+    caminho = os.path.abspath(caminho or CAMINHO_BANCO)
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    conn = sqlite3.connect(caminho, timeout=TIMEOUT_BANCO_S)
+    
+    with _bancos_lock:
+        if caminho not in _bancos_criados:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript('''
+            CREATE TABLE IF NOT EXISTS paineis (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                nome TEXT NOT NULL UNIQUE
+            );
+            CREATE TABLE IF NOT EXISTS textos (
+                id INTEGER PRIMARY KEY,
+                texto TEXT NOT NULL UNIQUE
+            );
+            CREATE TABLE IF NOT EXISTS registros (
+                painel_id INTEGER NOT NULL REFERENCES paineis (id),
+                datahora INTEGER NOT NULL,  -- segundos desde 1970 (SEM_DATA sem data válida)
+                entrada TEXT NOT NULL,      -- como no arquivo (ex.: zeros à esquerda)
+                local INTEGER NOT NULL,     -- códigos da tabela textos
+                hora INTEGER NOT NULL,
+                data INTEGER NOT NULL,
+                dia_semana INTEGER NOT NULL,
+                tipo INTEGER NOT NULL,
+                status INTEGER NOT NULL,
+                PRIMARY KEY (painel_id, datahora, entrada, local)
+            ) WITHOUT ROWID;
+            ''')
+            _bancos_criados.add(caminho)
+    
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+def _painel_id(conn, painel, criar=False):
+    """Identificador do painel (None se não existir e criar for False)"""
+    if criar:
+        conn.execute("INSERT OR IGNORE INTO paineis (nome) VALUES (?)", (painel,))
+    linha = conn.execute("SELECT id FROM paineis WHERE nome = ?", (painel,)).fetchone()
+    return linha[0] if linha else None
+
+def _codificar_textos(conn, df):
+    """
+    Códigos (tabela textos) dos valores das colunas de texto, cadastrando os novos
+    
+    Retorna:
+    dict: Array de códigos, um por registro, para cada coluna de COLUNAS_TEXTO
+    """
+    fatorados = {coluna: pd.factorize(df[coluna]) for coluna in COLUNAS_TEXTO}
+    distintos = sorted(set().union(*(valores for _, valores in fatorados.values())))
+    
+    conn.executemany("INSERT OR IGNORE INTO textos (texto) VALUES (?)", [(texto,) for texto in distintos])
+    codigos_texto = {}
+    for inicio in range(0, len(distintos), TAMANHO_LOTE_CONSULTA):
+        lote = distintos[inicio:inicio + TAMANHO_LOTE_CONSULTA]
+        codigos_texto.update(conn.execute(
+            f"SELECT texto, id FROM textos WHERE texto IN ({', '.join('?' * len(lote))})", lote
+        ))
+    
+    return {
+        coluna: np.array([codigos_texto[valor] for valor in valores], dtype=np.int64)[codigos]
+        for coluna, (codigos, valores) in fatorados.items()
+    }
+
+def _segundos(momento):
+    """Data ou momento em segundos desde 1970"""
+    return (pd.Timestamp(momento) - pd.Timestamp(0)) // pd.Timedelta(seconds=1)
+
+def salvar_registros(painel, df, caminho=None):
+    """
+    Acrescenta ao histórico do painel os registros que ainda não estão nele
+    
+    Parâmetros:
+    painel (str): Nome do painel (central) de origem do log
+    df (DataFrame): Registros do TroubleLog (colunas de troublelog.COLUNAS)
+    caminho (str, opcional): Arquivo do banco
+    
+    Retorna:
+    int: Quantidade de registros novos gravados
+    """
+    if df.empty:
+        return 0
+    
+    datahora = df['DataHora'].to_numpy().astype('datetime64[s]').view(np.int64)
+    
+    conn = conectar(caminho)
+    try:
+        with conn:
+            painel_id = _painel_id(conn, painel, criar=True)
+            textos = _codificar_textos(conn, df)
+            colunas = [datahora.tolist(), df['Entrada'].tolist()] + [textos[coluna].tolist() for coluna in COLUNAS_TEXTO]
+            linhas = [(painel_id,) + linha for linha in zip(*colunas)]
+            
+            antes = conn.total_changes
+            for inicio in range(0, len(linhas), TAMANHO_LOTE):
+                conn.executemany('''
+                INSERT OR IGNORE INTO registros
+                (painel_id, datahora, entrada, hora, data, dia_semana, local, tipo, status)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', linhas[inicio:inicio + TAMANHO_LOTE])
+            return conn.total_changes - antes
+    finally:
+        conn.close()
+
+def listar_paineis(caminho=None):
+    """Nomes dos painéis com histórico, em ordem alfabética"""
+    conn = conectar(caminho)
+    try:
+        return [nome for nome, in conn.execute("SELECT nome FROM paineis ORDER BY nome")]
+    finally:
+        conn.close()
+
+def resumo_painel(painel, caminho=None):
+    """
+    Quantidade de registros e período coberto pelo histórico de um painel
+    
+    Parâmetros:
+    painel (str): Nome do painel
+    caminho (str, opcional): Arquivo do banco
+    
+    Retorna:
+    tuple: (registros, primeiro momento, último momento); os momentos são NaT
+    se o painel não tiver registros com data válida
+    """
+    conn = conectar(caminho)
+    try:
+        painel_id = _painel_id(conn, painel)
+        if painel_id is None:
+            return 0, pd.NaT, pd.NaT
+        registros, = conn.execute("SELECT COUNT(*) FROM registros WHERE painel_id = ?", (painel_id,)).fetchone()
+        # Primeiro e último pela chave primária (sem percorrer os registros)
+        primeiro, = conn.execute(
+            "SELECT MIN(datahora) FROM registros WHERE painel_id = ? AND datahora > ?", (painel_id, SEM_DATA)
+        ).fetchone()
+        ultimo, = conn.execute("SELECT MAX(datahora) FROM registros WHERE painel_id = ?", (painel_id,)).fetchone()
+    finally:
+        conn.close()
+    
+    if primeiro is None:
+        return registros, pd.NaT, pd.NaT
+    return registros, pd.Timestamp(primeiro, unit='s'), pd.Timestamp(ultimo, unit='s')
+
+def carregar_registros(painel, inicio=None, fim=None, caminho=None):
+    """
+    Lê do histórico os registros de um painel em um período
+    
+    Parâmetros:
+    painel (str): Nome do painel
+    inicio, fim (date, opcional): Período (datas inclusive); sem nenhum dos dois,
+    o histórico completo, incluindo os registros sem data válida
+    caminho (str, opcional): Arquivo do banco
+    
+    Retorna:
+    DataFrame: Registros com as colunas de troublelog.COLUNAS, em ordem de
+    DataHora e ENTRY (os sem data primeiro)
+    """
+    condicoes = ["painel_id = (SELECT id FROM paineis WHERE nome = ?)"]
+    parametros = [painel]
+    if inicio is not None or fim is not None:
+        # Com só o fim informado, o limite inferior apenas exclui os registros sem data
+        condicoes.append("datahora >= ?")
+        parametros.append(SEM_DATA + 1 if inicio is None else _segundos(inicio))
+    if fim is not None:
+        condicoes.append("datahora < ?")
+        parametros.append(_segundos(pd.Timestamp(fim) + pd.Timedelta(days=1)))
+    
+    conn = conectar(caminho)
+    try:
+        cursor = conn.execute(f'''
+        SELECT {", ".join(COLUNAS_BANCO)}
+        FROM registros
+        WHERE {" AND ".join(condicoes)}
+        ORDER BY datahora
+        ''', parametros)
+        
+        # Linhas lidas em lotes e transpostas direto para arrays por coluna (a ENTRY
+        # é texto; as demais, inteiros)
+        tipos = [object if coluna == 'Entrada' else np.int64 for coluna in COLUNAS]
+        colunas = [[] for _ in COLUNAS_BANCO]
+        while True:
+            lote = cursor.fetchmany(TAMANHO_LOTE)
+            if not lote:
+                break
+            for coluna, tipo, valores in zip(colunas, tipos, zip(*lote)):
+                coluna.append(np.array(valores, dtype=tipo))
+        
+        dados = {
+            nome: np.concatenate(coluna) if coluna else np.empty(0, dtype=tipo)
+            for nome, tipo, coluna in zip(COLUNAS, tipos, colunas)
+        }
+        
+        # Apenas os textos usados pelos registros lidos
+        usados = np.unique(np.concatenate([dados[coluna] for coluna in COLUNAS_TEXTO])).tolist()
+        textos = np.empty(usados[-1] + 1 if usados else 0, dtype=object)
+        for posicao in range(0, len(usados), TAMANHO_LOTE_CONSULTA):
+            lote = usados[posicao:posicao + TAMANHO_LOTE_CONSULTA]
+            for codigo, texto in conn.execute(
+                f"SELECT id, texto FROM textos WHERE id IN ({', '.join('?' * len(lote))})", lote
+            ):
+                textos[codigo] = texto
+    finally:
+        conn.close()
+    
+    # Códigos de volta para os textos (uma posição por código da tabela textos)
+    for coluna in COLUNAS_TEXTO:
+        dados[coluna] = textos[dados[coluna]]
+    dados['DataHora'] = dados['DataHora'].view('datetime64[s]')
+    
+    # No mesmo segundo, os registros seguem o número da ENTRY (a chave ordena a ENTRY como texto)
+    ordem = np.lexsort((dados['Entrada'].astype(np.int64), dados['DataHora']))
+    return pd.DataFrame({coluna: valores[ordem] for coluna, valores in dados.items()}, columns=COLUNAS)
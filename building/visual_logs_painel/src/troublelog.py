@@ -0,0 +1,417 @@
+"""
+Leitura do TroubleLog exportado pela central de alarme
+
+O arquivo é percorrido linha a linha, sem montar a lista de linhas nem remover
+os cabeçalhos de página com uma substituição sobre o texto inteiro. Cada
+registro ENTRY (e a linha de detalhe com tipo de dispositivo e status, quando
+existir) vai direto para listas por coluna, convertidas em DataFrame no final.
+
+O módulo não depende do Streamlit: o progresso é informado por uma função de
+retorno, e LeituraTroubleLog executa a leitura em uma thread separada para que
+a interface apenas acompanhe o andamento. Vários arquivos (exportações
+sucessivas da mesma central) são lidos em processos paralelos e combinados em
+um histórico único, sem os registros repetidos entre eles.
+
+Uso (a partir da pasta src, para medir o tempo de leitura de um ou mais arquivos):
+    python troublelog.py caminho/TroubleLog.txt [outro/TroubleLog.txt ...]
+"""
+import hashlib
+import io
+import multiprocessing
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Linha de registro: ENTRY <número> <hora> <dia da semana> <data> <local>
+PADRAO_ENTRADA = re.compile(r'ENTRY (\d+)\s+(\d+:\d+:\d+)\s+(\w+) (\d+-\w+-\d+) (.+?)$')
+
+# Linha de detalhe: tipo de dispositivo e status separados por dois ou mais espaços
+PADRAO_DETALHE = re.compile(r'^\s+(.+?)\s{2,}(.+?)$')
+
+# Cabeçalho de página: separador, "Service Port ... Page N", "Report 2 : ..." e separador
+PADRAO_SEPARADOR = re.compile(r'-{80,}\s*$')
+PADRAO_CABECALHO = re.compile(r'Service Port\s+Page \d+|Report 2 : Trouble Historical Log')
+
+# Entradas de reconhecimento na central: o local vira o grupo reconhecido
+RECONHECIMENTOS = {
+    "TROUBLES ACKNOWLEDGED": "TROUBLES",
+    "SUPERVISORIES ACKNOWLEDGED": "SUPERVISORIES",
+}
+
+COLUNAS = [
+    "Entrada", "Hora", "Data", "Dia da Semana", "DataHora",
+    "Local", "Tipo de Dispositivo", "Status"
+]
+
+# Colunas que identificam um registro repetido em exportações sobrepostas
+CHAVE_REGISTRO = ["Entrada", "DataHora", "Local"]
+
+# A cada quantas linhas lidas o progresso é informado
+INTERVALO_PROGRESSO = 1000
+
+# Leituras em segundo plano guardadas por hash do arquivo (as mais recentes)
+MAXIMO_LEITURAS_GUARDADAS = 4
+_leituras = OrderedDict()
+_leituras_lock = threading.Lock()
+
+def _converter_data(dia_semana, data):
+    """Converte 'WED', '15-JAN-25' em ('15-01-2025', datetime64 do dia) ou (data original, NaT)"""
+    try:
+        data_obj = datetime.strptime(f"{dia_semana} {data}", "%a %d-%b-%y")
+        return data_obj.strftime("%d-%m-%Y"), np.datetime64(data_obj, 's')
+    except ValueError:
+        return data, np.datetime64('NaT', 's')
+
+def _segundos_do_dia(horas):
+    """
+    Converte horas 'H:MM:SS' ou 'HH:MM:SS' (lista de str) em durações desde a meia-noite
+    
+    Horas em outro formato ou fora da faixa do dia (ex.: '1:2:3', '123:00:00',
+    '25:00:00') ficam NaT, assim como a DataHora do registro.
+    """
+    # Com o zero à esquerda toda hora válida tem 8 caracteres; o nono (vazio nas
+    # válidas) impede que horas mais longas sejam truncadas e pareçam válidas
+    texto = np.array(horas, dtype='U9')
+    texto = np.where(np.char.str_len(texto) == 7, np.char.add('0', texto), texto).astype('U9')
+    digitos = texto.view(np.uint32).reshape(-1, 9).astype(np.int64) - ord('0')
+    numeros = digitos[:, [0, 1, 3, 4, 6, 7]]
+    valida = (
+        (digitos[:, 8] == -ord('0'))
+        & (digitos[:, [2, 5]] == ord(':') - ord('0')).all(axis=1)
+        & ((numeros >= 0) & (numeros <= 9)).all(axis=1)
+    )
+    
+    hora = digitos[:, 0] * 10 + digitos[:, 1]
+    minutos = digitos[:, 3] * 10 + digitos[:, 4]
+    segundos = digitos[:, 6] * 10 + digitos[:, 7]
+    valida &= (hora < 24) & (minutos < 60) & (segundos < 60)
+    
+    duracao = (hora * 3600 + minutos * 60 + segundos).astype('timedelta64[s]')
+    duracao[~valida] = np.timedelta64('NaT', 's')
+    return duracao
+
+def interpretar_troublelog(linhas, progresso=None):
+    """
+    Interpreta as linhas de um TroubleLog em um DataFrame com um registro por ENTRY
+    
+    Os cabeçalhos de página são descartados conforme aparecem, inclusive quando
+    caem entre uma ENTRY e a sua linha de detalhe. A conversão de data é feita
+    uma vez por data distinta; a data e a hora de cada registro formam a coluna
+    DataHora (datetime64, NaT quando a data do log não é reconhecida).
+    
+    Parâmetros:
+    linhas (iterable): Linhas do arquivo (lista, arquivo aberto ou io.StringIO)
+    progresso (callable, opcional): Chamada com o número de linhas lidas a cada INTERVALO_PROGRESSO linhas
+    
+    Retorna:
+    DataFrame: Registros [Entrada, Hora, Data, Dia da Semana, DataHora, Local,
+    Tipo de Dispositivo, Status]
+    """
+    colunas = {coluna: [] for coluna in COLUNAS}
+    entradas = colunas["Entrada"]
+    horas = colunas["Hora"]
+    datas = colunas["Data"]
+    dias_semana = colunas["Dia da Semana"]
+    locais = colunas["Local"]
+    tipos = colunas["Tipo de Dispositivo"]
+    status = colunas["Status"]
+    
+    # DataHora é montada no final: dia (posição em dias) + hora do registro
+    codigos_dia = []
+    dias = []
+    datas_convertidas = {}
+    entrada_match = PADRAO_ENTRADA.match
+    detalhe_match = PADRAO_DETALHE.match
+    separador_match = PADRAO_SEPARADOR.match
+    cabecalho_match = PADRAO_CABECALHO.match
+    
+    # ENTRY lida cuja linha de detalhe ainda pode vir na próxima linha útil
+    pendente = None
+    no_cabecalho = False
+    
+    def registrar(registro, tipo_dispositivo="", status_registro=""):
+        entry_num, hora, dia_semana, data, local = registro
+        
+        # Tratamento especial para entradas com "ACKNOWLEDGED"
+        if "ACKNOWLEDGED" in local:
+            for reconhecimento, grupo in RECONHECIMENTOS.items():
+                if reconhecimento in local and "AT MAIN PANEL" in local:
+                    local = grupo
+                    status_registro = "ACKNOWLEDGED"
+                    tipo_dispositivo = "AT MAIN PANEL"
+        
+        chave_data = (dia_semana, data)
+        convertida = datas_convertidas.get(chave_data)
+        if convertida is None:
+            texto, dia = _converter_data(dia_semana, data)
+            convertida = datas_convertidas[chave_data] = (texto, len(dias))
+            dias.append(dia)
+        
+        entradas.append(entry_num)
+        horas.append(hora)
+        datas.append(convertida[0])
+        codigos_dia.append(convertida[1])
+        dias_semana.append(dia_semana)
+        locais.append(local)
+        tipos.append(tipo_dispositivo)
+        status.append(status_registro)
+    
+    for numero_linha, linha in enumerate(linhas, 1):
+        if progresso is not None and numero_linha % INTERVALO_PROGRESSO == 0:
+            progresso(numero_linha)
+        
+        linha = linha.rstrip('\n')
+        if not linha.strip():
+            continue
+        
+        # Cabeçalho de página: o separador abre e fecha o bloco
+        if linha[0] == '-' and separador_match(linha):
+            no_cabecalho = not no_cabecalho
+            continue
+        if no_cabecalho:
+            if cabecalho_match(linha):
+                continue
+            no_cabecalho = False
+        
+        if linha.startswith("ENTRY"):
+            if pendente is not None:
+                registrar(pendente)
+                pendente = None
+            encontrado = entrada_match(linha)
+            if encontrado:
+                entry_num, hora, dia_semana, data, local = encontrado.groups()
+                pendente = (entry_num, hora, dia_semana, data, local.strip())
+            continue
+        
+        if pendente is not None:
+            # A linha seguinte a uma ENTRY pode trazer o tipo de dispositivo e o status
+            detalhe = detalhe_match(linha)
+            if detalhe:
+                registrar(pendente, detalhe.group(1).strip(), detalhe.group(2).strip())
+            else:
+                registrar(pendente)
+            pendente = None
+    
+    if pendente is not None:
+        registrar(pendente)
+    
+    colunas["DataHora"] = (
+        np.array(dias, dtype='datetime64[s]')[np.array(codigos_dia, dtype=np.intp)]
+        + _segundos_do_dia(horas)
+    )
+    return pd.DataFrame(colunas, columns=COLUNAS)
+
+def ler_troublelog(conteudo, progresso=None):
+    """
+    Interpreta o texto completo de um TroubleLog
+    
+    Parâmetros:
+    conteudo (str): Conteúdo do arquivo decodificado
+    progresso (callable, opcional): Ver interpretar_troublelog
+    
+    Retorna:
+    DataFrame: Registros do TroubleLog (ver interpretar_troublelog)
+    """
+    return interpretar_troublelog(io.StringIO(conteudo), progresso)
+
+def _ler_arquivo(dados):
+    """Decodifica e interpreta um arquivo (executada nos processos de leitura)"""
+    return ler_troublelog(dados.decode("utf-8", errors="replace"))
+
+def combinar_troublelogs(registros):
+    """
+    Junta os registros de vários TroubleLogs em um histórico contínuo
+    
+    Os arquivos são encadeados na ordem do seu primeiro registro com data (os
+    sem data por último), mantendo a ordem interna de cada um, e as entradas
+    repetidas entre exportações sobrepostas (mesmo número de ENTRY, DataHora e
+    local) ficam apenas na primeira ocorrência.
+    
+    Parâmetros:
+    registros (list): DataFrames de ler_troublelog, um por arquivo
+    
+    Retorna:
+    DataFrame: Registros combinados, sem repetições
+    """
+    if len(registros) == 1:
+        return registros[0]
+    
+    def primeiro_momento(df):
+        momentos = df['DataHora'].dropna()
+        return (0, momentos.iloc[0]) if len(momentos) else (1, pd.Timestamp.min)
+    
+    combinado = pd.concat(sorted(registros, key=primeiro_momento), ignore_index=True)
+    # duplicated usa uma tabela hash das chaves: uma passada sobre os registros
+    return combinado[~combinado.duplicated(subset=CHAVE_REGISTRO)].reset_index(drop=True)
+
+def detectar_lacunas(entradas):
+    """
+    Encontra os intervalos de números de ENTRY ausentes
+    
+    As entradas são percorridas na ordem do arquivo. Quando o número cai (o
+    contador da central reiniciou ou deu a volta, ou outro log foi concatenado)
+    começa um novo segmento, e as lacunas são procuradas apenas entre entradas
+    consecutivas do mesmo segmento. Números anteriores à primeira entrada de
+    cada segmento não são considerados ausentes.
+    
+    Parâmetros:
+    entradas (array-like): Números das ENTRY na ordem do arquivo (int ou str)
+    
+    Retorna:
+    DataFrame: Uma linha por intervalo [segmento, inicio, fim, ausentes]
+    """
+    numeros = pd.Series(entradas).astype(np.int64).to_numpy()
+    diferencas = np.diff(numeros)
+    
+    # Cada queda no número inicia um novo segmento
+    segmento = np.concatenate(([0], np.cumsum(diferencas < 0)))
+    lacuna = np.flatnonzero(diferencas > 1)
+    
+    inicio = numeros[lacuna] + 1
+    fim = numeros[lacuna + 1] - 1
+    return pd.DataFrame({
+        'segmento': segmento[lacuna],
+        'inicio': inicio,
+        'fim': fim,
+        'ausentes': fim - inicio + 1,
+    })
+
+class LeituraTroubleLog:
+    """
+    Leitura de um ou mais TroubleLogs em uma thread separada
+    
+    O andamento (linhas_lidas de total_linhas, somadas entre os arquivos) pode
+    ser consultado por outra thread enquanto a leitura acontece. Com mais de um
+    arquivo e mais de um processador, cada arquivo é lido em um processo (o
+    andamento avança a cada arquivo concluído) e o resultado é o histórico
+    combinado (ver combinar_troublelogs). Use iniciar_leitura para reaproveitar a
+    leitura de arquivos que já foram (ou estão sendo) lidos.
+    """
+    
+    def __init__(self, arquivos, chave=None):
+        """
+        Parâmetros:
+        arquivos (list): Conteúdo de cada arquivo em bytes (decodificado como UTF-8 na leitura)
+        chave (str, opcional): Identificação dos arquivos (hash usado por iniciar_leitura)
+        """
+        self.chave = chave
+        self.linhas_por_arquivo = [dados.count(b'\n') + 1 for dados in arquivos]
+        self.total_linhas = sum(self.linhas_por_arquivo)
+        self.linhas_lidas = 0
+        self.registros_repetidos = 0
+        self.resultado = None
+        self.erro = None
+        self._concluida = threading.Event()
+        self._thread = threading.Thread(target=self._executar, args=(arquivos,), daemon=True)
+        self._thread.start()
+    
+    def _executar(self, arquivos):
+        try:
+            if min(len(arquivos), os.cpu_count() or 1) > 1:
+                registros = self._ler_em_processos(arquivos)
+            else:
+                registros = self._ler_em_sequencia(arquivos)
+            self.resultado = combinar_troublelogs(registros)
+            self.registros_repetidos = sum(len(df) for df in registros) - len(self.resultado)
+            self.linhas_lidas = self.total_linhas
+        except Exception as e:
+            self.erro = e
+        finally:
+            self._concluida.set()
+    
+    def _ler_em_sequencia(self, arquivos):
+        registros = []
+        for dados, linhas in zip(arquivos, self.linhas_por_arquivo):
+            lidas_antes = self.linhas_lidas
+            conteudo = dados.decode("utf-8", errors="replace")
+            registros.append(ler_troublelog(conteudo, progresso=lambda n: self._atualizar(lidas_antes + n)))
+            self.linhas_lidas = lidas_antes + linhas
+        return registros
+    
+    def _ler_em_processos(self, arquivos):
+        # spawn: o processo filho não herda as threads (e travas) do servidor
+        contexto = multiprocessing.get_context("spawn")
+        processos = min(len(arquivos), os.cpu_count())
+        registros = [None] * len(arquivos)
+        with ProcessPoolExecutor(max_workers=processos, mp_context=contexto) as executor:
+            futuros = {executor.submit(_ler_arquivo, dados): i for i, dados in enumerate(arquivos)}
+            for futuro in as_completed(futuros):
+                i = futuros[futuro]
+                registros[i] = futuro.result()
+                self.linhas_lidas += self.linhas_por_arquivo[i]
+        return registros
+    
+    def _atualizar(self, linhas_lidas):
+        self.linhas_lidas = linhas_lidas
+    
+    @property
+    def concluida(self):
+        return self._concluida.is_set()
+    
+    @property
+    def progresso(self):
+        """Fração das linhas já lidas (0 a 1)"""
+        return min(self.linhas_lidas / self.total_linhas, 1.0)
+    
+    def aguardar(self, tempo_limite=None):
+        """Espera a leitura terminar (no máximo tempo_limite segundos); retorna True se terminou"""
+        return self._concluida.wait(tempo_limite)
+    
+    def obter_dataframe(self):
+        """
+        Espera o fim da leitura e retorna uma cópia do resultado
+        
+        A cópia evita que quem chama altere o DataFrame guardado. Se a leitura
+        falhou, a exceção original é lançada.
+        """
+        self.aguardar()
+        if self.erro is not None:
+            raise self.erro
+        return self.resultado.copy()
+
+def iniciar_leitura(arquivos):
+    """
+    Inicia a leitura em segundo plano de um ou mais TroubleLogs, ou reaproveita uma existente
+    
+    Os mesmos arquivos (mesmos hashes SHA-1, na mesma ordem) devolvem a leitura
+    já concluída ou ainda em andamento, então uma nova execução da página não
+    recomeça a leitura. Leituras que falharam são refeitas.
+    
+    Parâmetros:
+    arquivos (bytes ou list): Conteúdo de um arquivo, ou lista com o conteúdo de cada arquivo
+    
+    Retorna:
+    LeituraTroubleLog: Leitura em andamento ou concluída
+    """
+    if isinstance(arquivos, bytes):
+        arquivos = [arquivos]
+    chaves = [hashlib.sha1(dados).hexdigest() for dados in arquivos]
+    chave = chaves[0] if len(chaves) == 1 else hashlib.sha1("+".join(chaves).encode()).hexdigest()
+    with _leituras_lock:
+        leitura = _leituras.get(chave)
+        if leitura is None or leitura.erro is not None:
+            leitura = _leituras[chave] = LeituraTroubleLog(arquivos, chave)
+        _leituras.move_to_end(chave)
+        while len(_leituras) > MAXIMO_LEITURAS_GUARDADAS:
+            _leituras.popitem(last=False)
+    return leitura
+
+if __name__ == "__main__":
+    arquivos = []
+    for caminho in sys.argv[1:]:
+        with open(caminho, "rb") as arquivo:
+            arquivos.append(arquivo.read())
+    
+    inicio = time.perf_counter()
+    leitura = LeituraTroubleLog(arquivos)
+    df = leitura.obter_dataframe()
+    print(f"{len(df)} registros ({leitura.registros_repetidos} repetidos descartados) "
+          f"em {time.perf_counter() - inicio:.2f} s")